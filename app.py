@@ -5,14 +5,14 @@ Scopus Journal Readiness Analyzer
 
 import os
 import re
+import copy
 import time
 import json
 import logging
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
 from urllib.parse import urljoin, urlparse
 import requests
-from bs4 import BeautifulSoup
 
 # Optional/Heavy deps (guarded)
 HAVE_SELENIUM = False
@@ -39,10 +39,50 @@ try:
 except Exception:
 	pass
 
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, Response, render_template, request, jsonify, stream_with_context
 from flask_cors import CORS
 from dotenv import load_dotenv
 
+from config import Config
+from http_client import HTTPClient, FetchedPage, get_http_client, DEFAULT_USER_AGENT
+from http_cache import HTTPCache
+from site_crawler import SiteCrawler
+from browser_pool import BrowserPool, create_chrome_driver, get_browser_pool
+from render_policy import RenderPolicy, RENDER_FIRST, KEY_FIELDS
+from html_parsers import parse_features, resolve_backend
+from page_features import (
+	PageFeatures, TITLE_SELECTORS, DESCRIPTION_SELECTORS,
+	EDITORIAL_SELECTORS, PEER_REVIEW_KEYWORDS, FREQUENCY_KEYWORDS, OPEN_ACCESS_INDICATORS
+)
+from keyword_matcher import KeywordHits, KeywordMatcher
+from result_cache import ResultCache, canonical_url
+from single_flight import LeaseStore, SingleFlight
+from jobs import JobRunner, JobQueueFull, FINISHED, DONE, FAILED
+from batch_analyzer import BatchAnalyzer
+from scopus_api import ScopusEnhancer
+from scopus_enrichment import ScopusEnrichment
+
+# Селектори, чиято поява означава, че рендерираната страница е готова
+RENDER_READY_SELECTORS = ['.editorial-board', '.editors', '.editorial-team', '.journal-title']
+
+# Речници за оценяването - компилират се веднъж и всеки текст се сканира с един проход
+PROFESSIONAL_TITLES = ['professor', 'dr.', 'phd', 'md', 'director']
+INTERNATIONAL_AFFILIATIONS = ['university', 'college', 'institute', 'hospital']
+INTERNATIONAL_INDICATORS = ['university', 'college', 'institute', 'professor', 'dr.', 'phd']
+INTERNATIONAL_KEYWORDS = ['international', 'global', 'worldwide', 'multinational']
+PEER_REVIEW_SCORE_KEYWORDS = [
+	'peer review', 'double blind', 'single blind', 'open review',
+	'referee', 'reviewer', 'review process', 'editorial review'
+]
+REVIEW_TIMEFRAMES = ['weeks', 'days', 'months']
+# Праговете на общата оценка за нивата на готовност (от най-високото)
+READINESS_LEVELS = [(80, "Високо готов"), (60, "Средно готов"), (40, "Ниско готов")]
+NOT_READY = "Не е готов"
+
+BOARD_MEMBER_MATCHER = KeywordMatcher(PROFESSIONAL_TITLES + INTERNATIONAL_AFFILIATIONS + INTERNATIONAL_INDICATORS)
+DESCRIPTION_MATCHER = KeywordMatcher(INTERNATIONAL_KEYWORDS)
+PEER_REVIEW_SCORE_MATCHER = KeywordMatcher(PEER_REVIEW_SCORE_KEYWORDS + REVIEW_TIMEFRAMES)
+
 # Зареждане на environment variables
 load_dotenv()
 
@@ -60,7 +100,22 @@ logger = logging.getLogger(__name__)
 class ScopusJournalAnalyzer:
 	"""Основен клас за анализ на готовността на списания за Scopus"""
 	
-	def __init__(self):
+	def __init__(self, http_client: Optional[HTTPClient] = None, page_cache: Optional[HTTPCache] = None,
+				 browser_pool: Optional[BrowserPool] = None, render_policy: Optional[RenderPolicy] = None,
+				 parser_backend: Optional[str] = None):
+		# Споделен pool от keep-alive връзки между всички анализи в процеса
+		self.http = http_client or get_http_client()
+		# Условни заявки към вече изтеглени страници
+		if page_cache is None and Config.HTTP_CACHE_ENABLED:
+			page_cache = HTTPCache()
+		self.page_cache = page_cache
+		# Обхождане на "Editorial Board", "About", "Peer Review" и др. страници
+		self.crawler = SiteCrawler(self.fetch_page) if Config.CRAWL_ENABLED else None
+		self._browser_pool = browser_pool
+		self._render_policy = render_policy
+		# selectolax/lxml ако са инсталирани, иначе html.parser
+		self.parser_backend = resolve_backend(parser_backend)
+		
 		self.scopus_criteria = {
 			'content_quality': 0.25,
 			'editorial_standards': 0.20,
@@ -86,26 +141,27 @@ class ScopusJournalAnalyzer:
 		if not HAVE_SELENIUM:
 			raise RuntimeError("Selenium не е наличен на текущия хостинг. Анализът ще продължи само с requests.")
 		
-		chrome_options = Options()
-		chrome_options.add_argument('--headless')
-		chrome_options.add_argument('--no-sandbox')
-		chrome_options.add_argument('--disable-dev-shm-usage')
-		chrome_options.add_argument('--disable-gpu')
-		chrome_options.add_argument('--window-size=1920,1080')
-		chrome_options.add_argument('--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36')
-		
 		try:
-			driver = webdriver.Chrome(options=chrome_options)
-			return driver
+			return create_chrome_driver()
 		except Exception as e:
 			logger.error(f"Грешка при настройване на WebDriver: {e}")
 			raise
 	
-	def extract_journal_data(self, url: str) -> Dict:
-		"""Извлича данни от URL на списание"""
-		logger.info(f"Започвам анализ на списание: {url}")
-		
-		journal_data = {
+	@property
+	def browser_pool(self) -> BrowserPool:
+		"""Пулът с топли браузъри (по един на worker процес)"""
+		return self._browser_pool or get_browser_pool()
+	
+	@property
+	def render_policy(self) -> RenderPolicy:
+		"""Историята по домейн дали рендерирането помага (създава се при нужда)"""
+		if self._render_policy is None:
+			self._render_policy = RenderPolicy()
+		return self._render_policy
+	
+	def _empty_journal_data(self, url: str) -> Dict:
+		"""Празна структура за резултатите от анализа"""
+		return {
 			'url': url,
 			'title': '',
 			'description': '',
@@ -124,31 +180,148 @@ class ScopusJournalAnalyzer:
 			'international_scope_score': 0,
 			'analysis_timestamp': datetime.now().isoformat()
 		}
+	
+	def fetch_page(self, url: str, timeout: Optional[float] = None) -> FetchedPage:
+		"""Изтегля HTML съдържанието на страницата (през HTTP кеша, ако е включен).
+		
+		timeout ограничава свързването, всяко четене и изтеглянето на тялото
+		(по-кратко от HTTP timeout-ите и PAGE_DOWNLOAD_TIMEOUT, ако е зададен).
+		"""
+		headers = {'User-Agent': DEFAULT_USER_AGENT}
+		entry = self.page_cache.get(url) if self.page_cache else None
+		
+		# Пресен запис - без мрежова заявка
+		if entry and entry.is_fresh():
+			return FetchedPage(url, entry.body, headers=entry.headers, cache_status='fresh')
+		if entry:
+			headers.update(entry.conditional_headers())
+		
+		# stream=True: тялото се чете на части след проверка на заглавията
+		if timeout is None:
+			response = self.http.get(url, headers=headers, stream=True)
+		else:
+			response = self.http.get(url, headers=headers, stream=True,
+									 timeout=tuple(min(limit, timeout) for limit in self.http.timeout))
+		try:
+			if entry and response.status_code == 304:
+				entry = self.page_cache.refresh(entry, response.headers)
+				return FetchedPage(url, entry.body, headers=entry.headers, cache_status='revalidated')
+			
+			response.raise_for_status()
+			self._check_content_type(response)
+			content, truncated = self._read_body(response, timeout)
+		finally:
+			response.close()
+		
+		if truncated:
+			logger.warning(f"Страницата {url} е отрязана до {len(content)} байта")
+		elif self.page_cache and response.status_code == 200:
+			self.page_cache.store(url, response.headers, content)
+		
+		return FetchedPage(
+			url, content,
+			status=response.status_code,
+			headers=response.headers,
+			cache_status='miss' if self.page_cache else None,
+			truncated=truncated
+		)
+	
+	def _check_content_type(self, response):
+		"""Отказва не-HTML отговори преди да е прочетено тялото"""
+		content_type = response.headers.get('content-type', '')
+		mime_type = content_type.split(';')[0].strip().lower()
+		if mime_type and mime_type not in Config.ALLOWED_CONTENT_TYPES:
+			raise ValueError(f"Неподдържан тип съдържание: {mime_type}")
+	
+	def _read_body(self, response, timeout: Optional[float] = None) -> Tuple[bytes, bool]:
+		"""Чете тялото до MAX_PAGE_BYTES / PAGE_DOWNLOAD_TIMEOUT; връща (съдържание, отрязано)"""
+		limit = Config.MAX_PAGE_BYTES
+		download_timeout = Config.PAGE_DOWNLOAD_TIMEOUT if timeout is None else min(timeout, Config.PAGE_DOWNLOAD_TIMEOUT)
+		deadline = time.monotonic() + download_timeout
+		chunks = []
+		received = 0
+		
+		for chunk in response.iter_content(chunk_size=Config.PAGE_CHUNK_SIZE):
+			if not chunk:
+				continue
+			chunks.append(chunk)
+			received += len(chunk)
+			# Прекъсваме веднага щом лимитът е надхвърлен - безкрайните потоци
+			# и много големите страници не се буферират изцяло
+			if received > limit:
+				return b''.join(chunks)[:limit], True
+			if time.monotonic() > deadline:
+				return b''.join(chunks), True
+		
+		return b''.join(chunks), False
+	
+	def render_page(self, url: str) -> FetchedPage:
+		"""Зарежда страницата в браузър от пула"""
+		rendered_html = self.browser_pool.render(url, selectors=RENDER_READY_SELECTORS)
+		return FetchedPage(url, rendered_html.encode('utf-8'), rendered=True)
+	
+	def load_page(self, url: str) -> FetchedPage:
+		"""Статично изтегляне или директно рендериране за хостове, които винаги изискват JavaScript"""
+		if HAVE_SELENIUM and self.render_policy.host_mode(url) == RENDER_FIRST:
+			try:
+				return self.render_page(url)
+			except Exception as e:
+				logger.warning(f"Рендерирането на {url} не успя, продължавам с requests: {e}")
+		return self.fetch_page(url)
+	
+	def extract_journal_data(self, url: str, progress: Optional[Callable] = None) -> Dict:
+		"""Извлича данни от URL на списание.
+		
+		progress(stage, journal_data или None) се извиква при всеки етап;
+		частичните данни трябва да се сериализират/копират веднага.
+		"""
+		logger.info(f"Започвам анализ на списание: {url}")
+		self._report(progress, 'fetching')
 		
 		try:
 			# Първо опитваме с requests
-			response = requests.get(url, timeout=30, headers={
-				'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-			})
-			response.raise_for_status()
-			
-			soup = BeautifulSoup(response.content, 'html.parser')
+			page = self.load_page(url)
+		except Exception as e:
+			logger.error(f"Грешка при извличане на данни от {url}: {e}")
+			journal_data = self._empty_journal_data(url)
+			journal_data['error'] = str(e)
+			return journal_data
+		self._report(progress, 'fetched')
+		
+		return self.analyze_page(url, page, progress)
+	
+	def _report(self, progress: Optional[Callable], stage: str, journal_data: Optional[Dict] = None):
+		"""Съобщава етапа на анализа; грешка в callback-а не спира анализа"""
+		if progress is None:
+			return
+		try:
+			progress(stage, journal_data)
+		except Exception as e:
+			logger.warning(f"Грешка при съобщаване на етап '{stage}': {e}")
+	
+	def analyze_page(self, url: str, page: FetchedPage, progress: Optional[Callable] = None) -> Dict:
+		"""Анализира вече изтеглено HTML съдържание"""
+		journal_data = self._empty_journal_data(url)
+		journal_data['fetch_info'] = page.info()
+		
+		try:
+			# Извличане на основни данни (едно обхождане на документа)
+			self._report(progress, 'extracting')
+			page_data, features = self._extract_page_data(page.content, url)
+			journal_data.update(page_data)
+			self._report(progress, 'extracted', journal_data)
 			
-			# Извличане на основни данни
-			journal_data.update(self._extract_basic_info(soup, url))
-			journal_data.update(self._extract_editorial_info(soup))
-			journal_data.update(self._extract_technical_info(soup))
+			# Редакционният съвет и политиките обикновено са на отделни страници
+			if self.crawler:
+				self._report(progress, 'crawling')
+				self._merge_related_pages(journal_data, features, url)
+				self._report(progress, 'crawled', journal_data)
 			
-			# Ако имаме нужда от JavaScript, използваме Selenium (само ако е наличен)
-			if HAVE_SELENIUM and self._needs_selenium(soup):
-				driver = self.setup_selenium_driver()
-				try:
-					driver.get(url)
-					time.sleep(3)
-					selenium_soup = BeautifulSoup(driver.page_source, 'html.parser')
-					journal_data.update(self._extract_dynamic_content(selenium_soup))
-				finally:
-					driver.quit()
+			# Браузър само ако статичното извличане е оставило ключови полета празни
+			if HAVE_SELENIUM and not page.rendered and self.render_policy.should_render(url, journal_data):
+				self._report(progress, 'rendering')
+				self._escalate_render(url, journal_data)
+				self._report(progress, 'rendered', journal_data)
 			
 			# Анализ на качеството
 			journal_data.update(self._analyze_content_quality(journal_data))
@@ -161,98 +334,125 @@ class ScopusJournalAnalyzer:
 		
 		return journal_data
 	
-	def _extract_basic_info(self, soup: BeautifulSoup, url: str) -> Dict:
+	def _merge_related_pages(self, journal_data: Dict, features: PageFeatures, url: str):
+		"""Обхожда свързаните страници и добавя извлеченото от тях към journal_data"""
+		crawled_pages = []
+		
+		for result in self.crawler.crawl(features.links, url):
+			page_info = {'section': result['section'], 'url': result['url']}
+			if 'error' in result:
+				page_info['error'] = result['error']
+				crawled_pages.append(page_info)
+				continue
+			
+			page = result['page']
+			page_data, page_features = self._extract_page_data(page.content, page.url)
+			
+			# Страница, посветена на съвета, често няма .editorial-board обвивка
+			if result['section'] == 'editorial_board' and not page_data['editorial_board']:
+				page_data['editorial_board'] = self._extract_board_page_members(page_features)
+			
+			self._merge_page_data(journal_data, page_data)
+			page_info['bytes'] = len(page.content)
+			crawled_pages.append(page_info)
+		
+		journal_data['crawled_pages'] = crawled_pages
+	
+	def _merge_page_data(self, journal_data: Dict, page_data: Dict):
+		"""Слива данните от вторична страница; заглавието остава от началната"""
+		board = journal_data.get('editorial_board', [])
+		for member in page_data.get('editorial_board', []):
+			if member not in board and len(board) < Config.MAX_EDITORIAL_BOARD_SIZE:
+				board.append(member)
+		journal_data['editorial_board'] = board
+		
+		peer_review_info = page_data.get('peer_review_info', '')
+		if peer_review_info and peer_review_info not in journal_data.get('peer_review_info', ''):
+			journal_data['peer_review_info'] = (journal_data.get('peer_review_info', '') + ' ' + peer_review_info).strip()
+		
+		for field in ('description', 'issn', 'doi_prefix', 'publication_frequency', 'languages'):
+			if not journal_data.get(field) and page_data.get(field):
+				journal_data[field] = page_data[field]
+		
+		journal_data['open_access'] = journal_data.get('open_access', False) or page_data.get('open_access', False)
+	
+	def _extract_board_page_members(self, features: PageFeatures) -> List[str]:
+		"""Извлича имена от цяла страница на редакционния съвет"""
+		members = []
+		for member_text in features.board_page_members:
+			if len(member_text.split()) >= 2 and len(member_text) <= 200 and member_text not in members:
+				members.append(member_text)
+		return members[:Config.MAX_EDITORIAL_BOARD_SIZE]
+	
+	def _extract_basic_info(self, features: PageFeatures, url: str) -> Dict:
 		"""Извлича основните данни за списанието"""
 		data = {}
 		
-		# Заглавие
-		title_selectors = ['h1', '.journal-title', '.page-title', 'title']
-		for selector in title_selectors:
-			title_elem = soup.select_one(selector)
-			if title_elem and title_elem.get_text(strip=True):
-				data['title'] = title_elem.get_text(strip=True)
+		# Заглавие - първият селектор с непразен текст
+		for selector in TITLE_SELECTORS:
+			if features.title_candidates.get(selector):
+				data['title'] = features.title_candidates[selector]
 				break
 		
 		# Описание
-		desc_selectors = ['.description', '.about', '.journal-description', 'meta[name="description"]']
-		for selector in desc_selectors:
-			desc_elem = soup.select_one(selector)
-			if desc_elem:
-				if desc_elem.name == 'meta':
-					data['description'] = desc_elem.get('content', '')
-				else:
-					data['description'] = desc_elem.get_text(strip=True)
+		for selector in DESCRIPTION_SELECTORS:
+			if selector in features.description_candidates:
+				data['description'] = features.description_candidates[selector]
 				if data['description']:
 					break
 		
 		# ISSN
 		issn_pattern = r'ISSN[:\s]*(\d{4}-\d{3}[\dX])'
-		text_content = soup.get_text()
-		issn_match = re.search(issn_pattern, text_content, re.IGNORECASE)
+		issn_match = re.search(issn_pattern, features.text, re.IGNORECASE)
 		if issn_match:
 			data['issn'] = issn_match.group(1)
 		
 		# DOI prefix
 		doi_pattern = r'10\.\d{4,}'
-		doi_match = re.search(doi_pattern, text_content)
+		doi_match = re.search(doi_pattern, features.text)
 		if doi_match:
 			data['doi_prefix'] = doi_match.group(0)
 		
 		return data
 	
-	def _extract_editorial_info(self, soup: BeautifulSoup) -> Dict:
+	def _extract_editorial_info(self, features: PageFeatures) -> Dict:
 		"""Извлича информация за редакционния съвет"""
 		data = {}
 		
 		# Редакционен съвет
-		editorial_selectors = [
-			'.editorial-board', '.editors', '.editorial-team',
-			'.advisory-board', '.review-board'
-		]
-		
 		editorial_members = []
-		for selector in editorial_selectors:
-			board_section = soup.select_one(selector)
-			if board_section:
-				members = board_section.find_all(['li', 'p', 'div'], string=re.compile(r'[A-Z][a-z]+ [A-Z][a-z]+'))
-				for member in members:
-					member_text = member.get_text(strip=True)
-					if len(member_text.split()) >= 2:  # Име и фамилия
-						editorial_members.append(member_text)
+		for selector in EDITORIAL_SELECTORS:
+			for member_text in features.board_sections.get(selector, []):
+				if len(member_text.split()) >= 2:  # Име и фамилия
+					editorial_members.append(member_text)
 		
-		data['editorial_board'] = list(set(editorial_members))  # Премахваме дубликати
+		data['editorial_board'] = list(dict.fromkeys(editorial_members))  # Премахваме дубликати
 		
 		# Peer review информация
-		peer_review_keywords = ['peer review', 'referee', 'review process', 'double blind']
 		peer_review_text = ''
-		
-		for keyword in peer_review_keywords:
-			elements = soup.find_all(string=re.compile(keyword, re.IGNORECASE))
-			for element in elements:
-				parent = element.parent
-				if parent:
-					peer_review_text += parent.get_text(strip=True) + ' '
+		for keyword in PEER_REVIEW_KEYWORDS:
+			for snippet in features.peer_review_snippets[keyword]:
+				peer_review_text += snippet + ' '
 		
 		data['peer_review_info'] = peer_review_text.strip()
 		
 		return data
 	
-	def _extract_technical_info(self, soup: BeautifulSoup) -> Dict:
+	def _extract_technical_info(self, features: PageFeatures) -> Dict:
 		"""Извлича техническа информация"""
 		data = {}
 		
-		# Честота на публикуване
-		frequency_keywords = ['monthly', 'quarterly', 'biannual', 'annual', 'weekly', 'daily']
-		text_content = soup.get_text().lower()
+		# Честотата и Open Access идват от едно сканиране на текста
+		hits = features.keyword_hits
+		text_content = features.text_lower
 		
-		for freq in frequency_keywords:
-			if freq in text_content:
-				data['publication_frequency'] = freq
-				break
+		# Честота на публикуване
+		frequency = hits.first(FREQUENCY_KEYWORDS)
+		if frequency:
+			data['publication_frequency'] = frequency
 		
 		# Open Access
-		oa_indicators = ['open access', 'creative commons', 'cc by', 'free access']
-		data['open_access'] = any(indicator in text_content for indicator in oa_indicators)
+		data['open_access'] = hits.any(OPEN_ACCESS_INDICATORS)
 		
 		# Езици
 		lang_pattern = r'language[s]?:[\s]*([A-Za-z\s,]+)'
@@ -263,27 +463,34 @@ class ScopusJournalAnalyzer:
 		
 		return data
 	
-	def _needs_selenium(self, soup: BeautifulSoup) -> bool:
-		"""Проверява дали е нужен Selenium за динамично съдържание"""
-		if not HAVE_SELENIUM:
-			return False
-		# Проверяваме за JavaScript frameworks или динамично съдържание
-		scripts = soup.find_all('script')
-		for script in scripts:
-			if script.string:
-				if any(framework in script.string.lower() for framework in ['react', 'angular', 'vue', 'ajax']):
-					return True
-		# Проверяваме за елементи, които се зареждат динамично
-		dynamic_selectors = ['.lazy-load', '[data-src]', '.dynamic-content']
-		for selector in dynamic_selectors:
-			if soup.select(selector):
-				return True
-		return False
-	
-	def _extract_dynamic_content(self, soup: BeautifulSoup) -> Dict:
-		"""Извлича динамично съдържание с Selenium"""
+	def _extract_page_data(self, content: bytes, url: str) -> Tuple[Dict, PageFeatures]:
+		"""Всички извличания от една страница върху едно обхождане на документа"""
+		features = parse_features(content, self.parser_backend)
 		data = {}
-		# Допълнителни данни, които могат да се зареждат динамично
+		data.update(self._extract_basic_info(features, url))
+		data.update(self._extract_editorial_info(features))
+		data.update(self._extract_technical_info(features))
+		return data, features
+	
+	def _escalate_render(self, url: str, journal_data: Dict):
+		"""Рендерира страницата, слива новите данни и запомня дали е помогнало"""
+		before = {field: journal_data.get(field) for field in KEY_FIELDS}
+		before['editorial_board'] = list(journal_data.get('editorial_board', []))
+		
+		try:
+			rendered = self.render_page(url)
+		except Exception as e:
+			logger.warning(f"Неуспешно рендериране на {url}: {e}")
+			return
+		
+		self._merge_page_data(journal_data, self._extract_dynamic_content(rendered.content, url))
+		helpful = self.render_policy.record_outcome(url, before, journal_data)
+		journal_data['fetch_info']['rendered'] = True
+		logger.info(f"Рендериране на {url}: {'добави данни' if helpful else 'без нови данни'}")
+	
+	def _extract_dynamic_content(self, content: bytes, url: str) -> Dict:
+		"""Извлича данните от рендерираната с браузър страница"""
+		data, _ = self._extract_page_data(content, url)
 		return data
 	
 	def _analyze_content_quality(self, journal_data: Dict) -> Dict:
@@ -321,6 +528,10 @@ class ScopusJournalAnalyzer:
 			'content_quality_factors': factors
 		}
 	
+	def _board_member_hits(self, journal_data: Dict) -> List[KeywordHits]:
+		"""Титли и афилиации за всеки член на съвета (едно сканиране на член)"""
+		return [BOARD_MEMBER_MATCHER.scan(member, positions=False) for member in journal_data.get('editorial_board', [])]
+	
 	def _analyze_international_scope(self, journal_data: Dict) -> Dict:
 		"""Анализира международния обхват на списанието"""
 		score = 0
@@ -336,13 +547,8 @@ class ScopusJournalAnalyzer:
 			factors.append("Английски език е включен")
 		
 		# Проверка за международни автори в редакционния съвет
-		editorial_board = journal_data.get('editorial_board', [])
-		international_indicators = ['university', 'college', 'institute', 'professor', 'dr.', 'phd']
-		international_members = 0
-		
-		for member in editorial_board:
-			if any(indicator in member.lower() for indicator in international_indicators):
-				international_members += 1
+		member_hits = self._board_member_hits(journal_data)
+		international_members = sum(1 for hits in member_hits if hits.any(INTERNATIONAL_INDICATORS))
 		
 		if international_members > 0:
 			score += min(international_members * 5, 40)
@@ -354,9 +560,8 @@ class ScopusJournalAnalyzer:
 			factors.append("Open Access списание")
 		
 		# Проверка за международни ключови думи в описанието
-		description = journal_data.get('description', '').lower()
-		international_keywords = ['international', 'global', 'worldwide', 'multinational']
-		if any(keyword in description for keyword in international_keywords):
+		description_hits = DESCRIPTION_MATCHER.scan(journal_data.get('description', ''), positions=False)
+		if description_hits.any(INTERNATIONAL_KEYWORDS):
 			score += 10
 			factors.append("Международен фокус в описанието")
 		
@@ -400,61 +605,60 @@ class ScopusJournalAnalyzer:
 	def calculate_scopus_readiness(self, journal_data: Dict) -> Dict:
 		"""Изчислява общата готовност за Scopus"""
 		
-		# Вземаме оценките
-		content_quality = journal_data.get('content_quality_score', 0)
-		international_scope = journal_data.get('international_scope_score', 0)
-		accessibility = journal_data.get('accessibility_score', 0)
-		
-		# Изчисляваме допълнителни оценки
-		editorial_standards = self._calculate_editorial_standards(journal_data)
-		peer_review_process = self._calculate_peer_review_score(journal_data)
-		technical_standards = self._calculate_technical_standards(journal_data)
-		
-		# Обща оценка с тегла
-		total_score = (
-			content_quality * self.scopus_criteria['content_quality'] +
-			editorial_standards * self.scopus_criteria['editorial_standards'] +
-			peer_review_process * self.scopus_criteria['peer_review_process'] +
-			international_scope * self.scopus_criteria['international_scope'] +
-			technical_standards * self.scopus_criteria['technical_standards'] +
-			accessibility * self.scopus_criteria['accessibility']
-		)
-		
-		# Определяме готовността
-		if total_score >= 80:
-			readiness_level = "Високо готов"
-		elif total_score >= 60:
-			readiness_level = "Средно готов"
-		elif total_score >= 40:
-			readiness_level = "Ниско готов"
-		else:
-			readiness_level = "Не е готов"
+		detailed_scores = self._detailed_scores(journal_data)
+		total_score = self._weighted_total(detailed_scores)
 		
 		# Препоръки за подобрение
-		recommendations = self._generate_recommendations(journal_data, {
-			'content_quality': content_quality,
-			'editorial_standards': editorial_standards,
-			'peer_review_process': peer_review_process,
-			'international_scope': international_scope,
-			'technical_standards': technical_standards,
-			'accessibility': accessibility
-		})
+		recommendations = self._generate_recommendations(journal_data, detailed_scores)
 		
 		return {
 			'total_score': round(total_score, 2),
-			'readiness_level': readiness_level,
-			'detailed_scores': {
-				'content_quality': content_quality,
-				'editorial_standards': editorial_standards,
-				'peer_review_process': peer_review_process,
-				'international_scope': international_scope,
-				'technical_standards': technical_standards,
-				'accessibility': accessibility
-			},
+			'readiness_level': self._readiness_level(total_score),
+			'detailed_scores': detailed_scores,
 			'recommendations': recommendations,
 			'analysis_date': datetime.now().isoformat()
 		}
 	
+	def partial_scores(self, journal_data: Dict) -> Dict:
+		"""Оценката на данните, извлечени досега (за етапите на незавършен анализ).
+		
+		Анализите на качеството се изпълняват върху копие, а journal_data не се променя.
+		"""
+		current = dict(journal_data)
+		current.update(self._analyze_content_quality(current))
+		current.update(self._analyze_international_scope(current))
+		current.update(self._analyze_accessibility(current))
+		
+		detailed_scores = self._detailed_scores(current)
+		total_score = self._weighted_total(detailed_scores)
+		return {
+			'total_score': round(total_score, 2),
+			'readiness_level': self._readiness_level(total_score),
+			'detailed_scores': detailed_scores
+		}
+	
+	def _detailed_scores(self, journal_data: Dict) -> Dict:
+		"""Оценките по шестте критерия"""
+		return {
+			'content_quality': journal_data.get('content_quality_score', 0),
+			'editorial_standards': self._calculate_editorial_standards(journal_data),
+			'peer_review_process': self._calculate_peer_review_score(journal_data),
+			'international_scope': journal_data.get('international_scope_score', 0),
+			'technical_standards': self._calculate_technical_standards(journal_data),
+			'accessibility': journal_data.get('accessibility_score', 0)
+		}
+	
+	def _weighted_total(self, detailed_scores: Dict) -> float:
+		"""Обща оценка с тегла"""
+		return sum(score * self.scopus_criteria[criterion] for criterion, score in detailed_scores.items())
+	
+	@staticmethod
+	def _readiness_level(total_score: float) -> str:
+		for threshold, level in READINESS_LEVELS:
+			if total_score >= threshold:
+				return level
+		return NOT_READY
+	
 	def _calculate_editorial_standards(self, journal_data: Dict) -> int:
 		"""Изчислява оценката за редакционни стандарти"""
 		score = 0
@@ -468,24 +672,17 @@ class ScopusJournalAnalyzer:
 		elif len(editorial_board) > 0:
 			score += 15
 		
-		# Професионални титли в редакционния съвет
-		professional_titles = ['professor', 'dr.', 'phd', 'md', 'director']
-		professional_members = 0
+		# Титлите и афилиациите на всеки член се търсят с едно сканиране
+		member_hits = self._board_member_hits(journal_data)
 		
-		for member in editorial_board:
-			if any(title in member.lower() for title in professional_titles):
-				professional_members += 1
+		# Професионални титли в редакционния съвет
+		professional_members = sum(1 for hits in member_hits if hits.any(PROFESSIONAL_TITLES))
 		
 		if professional_members > 0:
 			score += min(professional_members * 3, 30)
 		
 		# Международно представителство
-		international_affiliations = ['university', 'college', 'institute', 'hospital']
-		international_members = 0
-		
-		for member in editorial_board:
-			if any(affiliation in member.lower() for affiliation in international_affiliations):
-				international_members += 1
+		international_members = sum(1 for hits in member_hits if hits.any(INTERNATIONAL_AFFILIATIONS))
 		
 		if international_members > 0:
 			score += min(international_members * 2, 30)
@@ -496,27 +693,22 @@ class ScopusJournalAnalyzer:
 		"""Изчислява оценката за peer review процес"""
 		score = 0
 		
-		peer_review_info = journal_data.get('peer_review_info', '').lower()
+		hits = PEER_REVIEW_SCORE_MATCHER.scan(journal_data.get('peer_review_info', ''), positions=False)
 		
 		# Ключови думи за peer review
-		peer_review_keywords = [
-			'peer review', 'double blind', 'single blind', 'open review',
-			'referee', 'reviewer', 'review process', 'editorial review'
-		]
-		
-		found_keywords = sum(1 for keyword in peer_review_keywords if keyword in peer_review_info)
+		found_keywords = len(hits.found(PEER_REVIEW_SCORE_KEYWORDS))
 		score += found_keywords * 15
 		
 		# Проверка за специфични процеси
-		if 'double blind' in peer_review_info:
+		if 'double blind' in hits:
 			score += 20
-		elif 'single blind' in peer_review_info:
+		elif 'single blind' in hits:
 			score += 15
-		elif 'open review' in peer_review_info:
+		elif 'open review' in hits:
 			score += 10
 		
 		# Проверка за времеви рамки
-		if any(timeframe in peer_review_info for timeframe in ['weeks', 'days', 'months']):
+		if hits.any(REVIEW_TIMEFRAMES):
 			score += 10
 		
 		return min(score, 100)
@@ -583,6 +775,138 @@ app = Flask(__name__)
 CORS(app)
 
 analyzer = ScopusJournalAnalyzer()
+# Готовите анализи се преизползват между заявките и worker-ите
+result_cache = ResultCache() if Config.RESULT_CACHE_ENABLED else None
+# Едновременните заявки за един URL чакат първата; между worker-ите - през кеша
+single_flight = SingleFlight(LeaseStore() if result_cache is not None else None)
+# Статус на индексиране в Scopus - от локалния Source List или от API (ако има ключ)
+scopus_enhancer = ScopusEnhancer() if Config.SCOPUS_ENRICH_ENABLED else None
+
+# Браузърите се стартират във фонов режим, за да не бавят първия анализ
+if HAVE_SELENIUM and Config.BROWSER_POOL_PREWARM:
+	get_browser_pool().warm_up_async()
+
+def run_analysis(journal_url: str, progress: Optional[Callable] = None) -> Dict:
+	"""Извличане, Scopus проверка и оценка - {'journal_data', 'readiness_analysis'} или {'error'}"""
+	# Scopus проверката започва, щом първата страница даде заглавие или ISSN,
+	# и върви успоредно с обхождането и рендерирането
+	enrichment = None
+	if scopus_enhancer is not None and scopus_enhancer.available:
+		enrichment = ScopusEnrichment(scopus_enhancer)
+		journal_data = analyzer.extract_journal_data(journal_url, enrichment.progress(progress))
+	else:
+		journal_data = analyzer.extract_journal_data(journal_url, progress)
+	
+	if 'error' in journal_data:
+		# Неуспешното извличане не бива да заема място в pool-а на проверките
+		if enrichment is not None:
+			enrichment.cancel()
+		return {'error': journal_data['error']}
+	
+	if enrichment is not None and enrichment.finish(journal_data) is not None:
+		analyzer._report(progress, 'scopus_checked', journal_data)
+	
+	# Изчисляване на готовността за Scopus
+	analyzer._report(progress, 'scoring')
+	readiness_analysis = analyzer.calculate_scopus_readiness(journal_data)
+	analyzer._report(progress, 'scored', journal_data)
+	
+	return {
+		'journal_data': journal_data,
+		'readiness_analysis': readiness_analysis
+	}
+
+def _cached_result(key: str) -> Optional[Dict]:
+	"""Резултат от кеша с 'cache': {'hit': True, 'age'} или None"""
+	if result_cache is None:
+		return None
+	try:
+		cached = result_cache.get(key)
+	except Exception as e:
+		logger.warning(f"Недостъпен кеш на резултатите: {e}")
+		return None
+	if cached is None:
+		return None
+	result, age = cached
+	result['cache'] = {'hit': True, 'age': round(age, 1), 'coalesced': False}
+	return result
+
+def _analyze_and_store(journal_url: str, key: str, progress: Optional[Callable] = None) -> Dict:
+	result = run_analysis(journal_url, progress)
+	
+	# Грешките не се кешират - следващият опит може да успее
+	if result_cache is not None and 'error' not in result:
+		try:
+			result_cache.put(key, result)
+		except Exception as e:
+			logger.warning(f"Неуспешен запис в кеша на резултатите: {e}")
+	
+	result['cache'] = {'hit': False, 'age': 0, 'coalesced': False}
+	return result
+
+def cached_analysis(journal_url: str, progress: Optional[Callable] = None) -> Dict:
+	"""run_analysis през кеша и single-flight; добавя 'cache': {'hit', 'age', 'coalesced'}"""
+	key = canonical_url(journal_url)
+	
+	result = _cached_result(key)
+	if result is not None:
+		return result
+	
+	# Дублираните заявки получават етапите на общия анализ
+	result, shared = single_flight.do_with_progress(
+		key, lambda report: _analyze_and_store(journal_url, key, report),
+		lookup=lambda: _cached_result(key), progress=progress
+	)
+	if shared:
+		# Резултатът е общ с друга заявка - копие, за да не се променя от две нишки
+		result = copy.deepcopy(result)
+		result['cache']['coalesced'] = True
+	return result
+
+# Полетата от journal_data, които интерфейсът показва още преди края на анализа
+STAGE_EVENT_FIELDS = ('title', 'issn', 'doi_prefix', 'open_access', 'languages',
+	'publication_frequency', 'editorial_board', 'scopus_indexing_status')
+
+def _stage_event(stage: str, journal_data: Optional[Dict]) -> Dict:
+	"""Данните на SSE събитието за етап: досегашните полета и частичната оценка"""
+	if not journal_data:
+		return {}
+	return {
+		'journal_data': {field: journal_data.get(field) for field in STAGE_EVENT_FIELDS},
+		'readiness_analysis': analyzer.partial_scores(journal_data)
+	}
+
+# Дългите анализи вървят във фонови нишки с ограничен брой (по worker)
+job_runner = JobRunner(cached_analysis, describe=_stage_event)
+
+def _request_url() -> Optional[str]:
+	"""URL-ът от JSON тялото, с https:// ако липсва схема"""
+	data = request.get_json(silent=True) or {}
+	journal_url = (data.get('url') or '').strip()
+	if not journal_url:
+		return None
+	
+	# Валидация на URL
+	if not journal_url.startswith(('http://', 'https://')):
+		journal_url = 'https://' + journal_url
+	return journal_url
+
+def _job_accepted(job: Dict):
+	"""202 отговор с адреса за проследяване на задачата"""
+	return jsonify({
+		'job_id': job['job_id'],
+		'status': job['status'],
+		'stage': job.get('stage'),
+		'status_url': f"/jobs/{job['job_id']}",
+		'events_url': f"/jobs/{job['job_id']}/events"
+	}), 202
+
+def _sse(event: str, data: Dict, event_id: int = None) -> str:
+	"""Едно Server-Sent Events съобщение"""
+	lines = [f'id: {event_id}'] if event_id is not None else []
+	lines.append(f'event: {event}')
+	lines.append(f'data: {json.dumps(data, ensure_ascii=False)}')
+	return '\n'.join(lines) + '\n\n'
 
 @app.route('/')
 def index():
@@ -593,37 +917,144 @@ def index():
 def analyze_journal():
 	"""API endpoint за анализ на списание"""
 	try:
-		data = request.get_json()
-		journal_url = data.get('url')
-		
+		journal_url = _request_url()
 		if not journal_url:
 			return jsonify({'error': 'URL е задължителен'}), 400
 		
-		# Валидация на URL
-		if not journal_url.startswith(('http://', 'https://')):
-			journal_url = 'https://' + journal_url
-		
-		# Анализ на списанието
-		journal_data = analyzer.extract_journal_data(journal_url)
+		# Готов резултат от кеша - без фонова задача
+		cached = _cached_result(canonical_url(journal_url))
+		if cached is not None:
+			return jsonify(cached)
 		
-		if 'error' in journal_data:
-			return jsonify({'error': journal_data['error']}), 500
+		# Анализът върви като задача; чакаме го най-много ANALYZE_SYNC_TIMEOUT секунди
+		job_id = job_runner.submit(journal_url)
+		job = job_runner.wait(job_id, Config.ANALYZE_SYNC_TIMEOUT)
 		
-		# Изчисляване на готовността за Scopus
-		readiness_analysis = analyzer.calculate_scopus_readiness(journal_data)
-		
-		# Комбиниране на резултатите
-		result = {
-			'journal_data': journal_data,
-			'readiness_analysis': readiness_analysis
-		}
+		if job['status'] == DONE:
+			return jsonify(job['result'])
+		if job['status'] in FINISHED:
+			return jsonify({'error': job.get('error', 'Неуспешен анализ')}), 500
 		
-		return jsonify(result)
+		# Бавно списание - клиентът продължава с GET /jobs/<id>
+		return _job_accepted(job)
 		
+	except JobQueueFull as e:
+		return jsonify({'error': str(e)}), 503
 	except Exception as e:
 		logger.error(f"Грешка при анализ: {e}")
 		return jsonify({'error': str(e)}), 500
 
+@app.route('/analyze/batch', methods=['POST'])
+def analyze_batch():
+	"""Анализира списък от URL адреси и връща по един JSON ред (NDJSON) за всяко завършило списание"""
+	data = request.get_json(silent=True) or {}
+	urls = data.get('urls')
+	
+	if not isinstance(urls, list) or not urls:
+		return jsonify({'error': 'Очаква се непразен списък "urls"'}), 400
+	if len(urls) > Config.BATCH_MAX_URLS:
+		return jsonify({'error': f'Най-много {Config.BATCH_MAX_URLS} URL адреса в една заявка'}), 413
+	
+	journal_urls = []
+	for url in urls:
+		url = str(url).strip()
+		if url and not url.startswith(('http://', 'https://')):
+			url = 'https://' + url
+		if url:
+			journal_urls.append(url)
+	
+	batch = BatchAnalyzer(analyzer, max_concurrency=Config.BATCH_STREAM_CONCURRENCY)
+	
+	def generate():
+		for result in batch.stream(journal_urls):
+			yield json.dumps(result, ensure_ascii=False) + '\n'
+	
+	return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+@app.route('/jobs', methods=['POST'])
+def submit_job():
+	"""Стартира анализ във фонов режим и връща id на задачата веднага"""
+	journal_url = _request_url()
+	if not journal_url:
+		return jsonify({'error': 'URL е задължителен'}), 400
+	
+	try:
+		job_id = job_runner.submit(journal_url)
+	except JobQueueFull as e:
+		return jsonify({'error': str(e)}), 503
+	
+	return _job_accepted(job_runner.get(job_id))
+
+@app.route('/jobs/<job_id>')
+def get_job(job_id):
+	"""Състоянието на задача: етап, частичен или окончателен резултат, грешка"""
+	job = job_runner.get(job_id)
+	if job is None:
+		return jsonify({'error': 'Няма такава задача'}), 404
+	return jsonify(job)
+
+@app.route('/jobs/<job_id>/events')
+def job_events(job_id):
+	"""Етапите на задачата като Server-Sent Events; накрая 'done' с резултата или 'error'.
+	
+	Събитията се четат от общото хранилище, така че потокът работи от всеки
+	worker. При повторно свързване EventSource изпраща Last-Event-ID и
+	потокът продължава от следващия етап.
+	"""
+	if job_runner.get(job_id) is None:
+		return jsonify({'error': 'Няма такава задача'}), 404
+	try:
+		last_id = int(request.headers.get('Last-Event-ID', 0))
+	except ValueError:
+		last_id = 0
+	
+	def generate():
+		nonlocal last_id
+		started = time.monotonic()
+		last_sent = started
+		while True:
+			# Крайно състояние без крайно събитие (неуспешен запис) също завършва потока
+			try:
+				job = job_runner.get(job_id) or {}
+				events = job_runner.store.events(job_id, last_id)
+			except Exception as e:
+				logger.warning(f"Недостъпно хранилище на задачите: {e}")
+				job, events = {}, []
+			for event in events:
+				last_id = event['id']
+				stage = event['stage']
+				if stage == DONE:
+					job = job_runner.get(job_id) or {}
+					yield _sse('done', dict(event, result=job.get('result')), last_id)
+					return
+				if stage in FINISHED:
+					yield _sse('error', event, last_id)
+					return
+				yield _sse('stage', event, last_id)
+				last_sent = time.monotonic()
+			
+			if job.get('status') == DONE:
+				yield _sse('done', {'stage': DONE, 'result': job.get('result')})
+				return
+			if job.get('status') in FINISHED:
+				yield _sse('error', {'stage': FAILED, 'error': job.get('error', 'Неуспешен анализ')})
+				return
+			
+			now = time.monotonic()
+			if now - started >= Config.JOB_EVENTS_TIMEOUT:
+				yield _sse('error', {'error': 'Изтече времето за проследяване на анализа'})
+				return
+			if now - last_sent >= Config.JOB_EVENTS_HEARTBEAT:
+				# Коментар - поддържа връзката през proxy-та без да е събитие
+				yield ': keep-alive\n\n'
+				last_sent = now
+			time.sleep(Config.JOB_EVENTS_POLL_INTERVAL)
+	
+	response = Response(stream_with_context(generate()), mimetype='text/event-stream')
+	response.headers['Cache-Control'] = 'no-cache'
+	response.headers['X-Accel-Buffering'] = 'no'
+	return response
+
 @app.route('/health')
 def health_check():
 	"""Health check endpoint"""
@@ -0,0 +1,163 @@
+"""
+Asyncio двигател за групов анализ на списания
+"""
+
+import time
+import queue
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Dict, Iterable, Iterator, List, Optional
+from urllib.parse import urlparse
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+
+class BatchAnalyzer:
+    """Анализира много списания едновременно с глобален и per-host лимит.
+
+    Мрежовите заявки и парсването се изпълняват в thread pool (HTTP слоят е
+    блокиращ), а event loop-ът само разпределя слотовете и връща резултатите
+    по реда на завършване. Слотът на хоста се държи и по време на
+    analyze_page, защото обхождането и рендерирането също са заявки към него.
+    """
+
+    def __init__(self, analyzer=None, max_concurrency: int = None,
+                 per_host_limit: int = None):
+        if analyzer is None:
+            from app import ScopusJournalAnalyzer
+            analyzer = ScopusJournalAnalyzer()
+        self.analyzer = analyzer
+        self.max_concurrency = max_concurrency or Config.BATCH_MAX_CONCURRENCY
+        self.per_host_limit = per_host_limit or Config.BATCH_PER_HOST_LIMIT
+
+    @staticmethod
+    def _host_key(url: str) -> str:
+        return urlparse(url).netloc.lower()
+
+    async def _analyze_one(self, url: str, executor: ThreadPoolExecutor,
+                           global_slots: asyncio.Semaphore,
+                           host_slots: Dict[str, asyncio.Semaphore]) -> Dict:
+        """Изтегля, анализира и оценява едно списание"""
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        result = {'url': url}
+
+        host = self._host_key(url)
+        if host not in host_slots:
+            host_slots[host] = asyncio.Semaphore(self.per_host_limit)
+
+        try:
+            async with global_slots:
+                async with host_slots[host]:
+                    page = await loop.run_in_executor(executor, self.analyzer.load_page, url)
+                    journal_data = await loop.run_in_executor(
+                        executor, self.analyzer.analyze_page, url, page
+                    )
+
+                if 'error' in journal_data:
+                    result['error'] = journal_data['error']
+                else:
+                    result['journal_data'] = journal_data
+                    result['readiness_analysis'] = self.analyzer.calculate_scopus_readiness(journal_data)
+        except Exception as e:
+            logger.error(f"Грешка при групов анализ на {url}: {e}")
+            result['error'] = str(e)
+
+        result['elapsed'] = round(time.perf_counter() - started, 3)
+        return result
+
+    async def iter_results(self, urls: Iterable[str]) -> AsyncIterator[Dict]:
+        """Връща резултатите по реда на завършване.
+
+        URL адресите се четат мързеливо: в опашката има най-много
+        4 * max_concurrency задачи, така че паметта не расте с размера на групата.
+        """
+        global_slots = asyncio.Semaphore(self.max_concurrency)
+        host_slots: Dict[str, asyncio.Semaphore] = {}
+        max_pending = self.max_concurrency * 4
+        url_iter = iter(urls)
+        pending = set()
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrency,
+                                thread_name_prefix='batch-analyzer') as executor:
+            def top_up():
+                for url in url_iter:
+                    pending.add(asyncio.ensure_future(
+                        self._analyze_one(url, executor, global_slots, host_slots)
+                    ))
+                    if len(pending) >= max_pending:
+                        break
+
+            top_up()
+            try:
+                while pending:
+                    done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        pending.discard(task)
+                        yield task.result()
+                    top_up()
+            finally:
+                for task in pending:
+                    task.cancel()
+
+    async def analyze_all(self, urls: Iterable[str]) -> List[Dict]:
+        """Събира всички резултати (по реда на завършване)"""
+        return [result async for result in self.iter_results(urls)]
+
+    def run(self, urls: Iterable[str]) -> List[Dict]:
+        """Синхронна обвивка за скриптове и demo.py"""
+        return asyncio.run(self.analyze_all(urls))
+
+    def stream(self, urls: Iterable[str]) -> Iterator[Dict]:
+        """Синхронен генератор върху iter_results (за поточни HTTP отговори).
+
+        Event loop-ът работи в отделна нишка, а резултатите минават през
+        опашка с max_concurrency места - ако клиентът чете бавно, анализът
+        изчаква вместо да трупа резултати в паметта. При затваряне на
+        генератора (прекъсната връзка) незапочналите анализи се отменят.
+        """
+        results = queue.Queue(maxsize=self.max_concurrency)
+        stop = threading.Event()
+        finished = object()
+
+        def deliver(item) -> bool:
+            while not stop.is_set():
+                try:
+                    results.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        async def produce():
+            results_iter = self.iter_results(urls)
+            try:
+                async for result in results_iter:
+                    # В отделна нишка, за да не спира event loop-а, докато опашката е пълна
+                    if not await asyncio.to_thread(deliver, result):
+                        break
+            finally:
+                await results_iter.aclose()
+
+        def run_loop():
+            try:
+                asyncio.run(produce())
+            except Exception as e:
+                logger.error(f"Грешка в поточния групов анализ: {e}")
+            finally:
+                deliver(finished)
+
+        producer = threading.Thread(target=run_loop, daemon=True, name='batch-stream')
+        producer.start()
+        try:
+            while True:
+                item = results.get()
+                if item is finished:
+                    break
+                yield item
+        finally:
+            stop.set()
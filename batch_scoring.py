@@ -0,0 +1,200 @@
+"""
+Векторизирана (NumPy) оценка на готовността за Scopus за много списания наведнъж
+"""
+
+from typing import Dict, Iterable, List, Optional
+
+# NumPy е по избор - без него остава само calculate_scopus_readiness
+HAVE_NUMPY = False
+try:
+    import numpy as np
+    HAVE_NUMPY = True
+except ImportError:
+    np = None
+
+from app import (
+    ScopusJournalAnalyzer, INTERNATIONAL_AFFILIATIONS, INTERNATIONAL_INDICATORS, INTERNATIONAL_KEYWORDS,
+    PROFESSIONAL_TITLES, PEER_REVIEW_SCORE_KEYWORDS, REVIEW_TIMEFRAMES, READINESS_LEVELS, NOT_READY,
+    BOARD_MEMBER_MATCHER, DESCRIPTION_MATCHER, PEER_REVIEW_SCORE_MATCHER
+)
+
+# Колоните на матрицата с признаци - по една стойност на списание
+FEATURES = (
+    'peer_review_info', 'board_size', 'professional_members', 'affiliation_members',
+    'international_members', 'issn', 'doi_prefix', 'description_length', 'description_international',
+    'title_length', 'languages', 'english', 'open_access', 'https', 'mobile', 'regular_frequency',
+    'review_keywords', 'double_blind', 'single_blind', 'open_review', 'review_timeframe',
+    # Вече изчислените от analyze_page оценки; NaN, ако липсват
+    'content_quality_score', 'international_scope_score', 'accessibility_score',
+)
+COLUMN = {name: index for index, name in enumerate(FEATURES)}
+
+# Редът на критериите в матрицата с оценки (като в _detailed_scores)
+CRITERIA = ('content_quality', 'editorial_standards', 'peer_review_process',
+            'international_scope', 'technical_standards', 'accessibility')
+
+MOBILE_INDICATORS = ['mobile', 'responsive', 'm.']
+REGULAR_FREQUENCIES = ['monthly', 'quarterly']
+
+
+def _stored(journal_data: Dict, field: str) -> float:
+    value = journal_data.get(field)
+    return float('nan') if value is None else float(value)
+
+
+def feature_row(journal_data: Dict) -> List[float]:
+    """Признаците на едно списание в реда на FEATURES.
+
+    Текстовете се сканират веднъж тук; всичко след това е аритметика
+    върху матрицата.
+    """
+    board = journal_data.get('editorial_board', [])
+    member_hits = [BOARD_MEMBER_MATCHER.scan(member, positions=False) for member in board]
+    description = journal_data.get('description') or ''
+    title = journal_data.get('title') or ''
+    languages = journal_data.get('languages', [])
+    url = journal_data.get('url') or ''
+    review_hits = PEER_REVIEW_SCORE_MATCHER.scan(journal_data.get('peer_review_info') or '', positions=False)
+
+    return [
+        bool(journal_data.get('peer_review_info')),
+        len(board),
+        sum(1 for hits in member_hits if hits.any(PROFESSIONAL_TITLES)),
+        sum(1 for hits in member_hits if hits.any(INTERNATIONAL_AFFILIATIONS)),
+        sum(1 for hits in member_hits if hits.any(INTERNATIONAL_INDICATORS)),
+        bool(journal_data.get('issn')),
+        bool(journal_data.get('doi_prefix')),
+        len(description),
+        DESCRIPTION_MATCHER.scan(description, positions=False).any(INTERNATIONAL_KEYWORDS),
+        len(title),
+        len(languages),
+        'english' in [lang.lower() for lang in languages],
+        bool(journal_data.get('open_access')),
+        bool(url) and url.startswith('https'),
+        any(indicator in url.lower() for indicator in MOBILE_INDICATORS),
+        journal_data.get('publication_frequency', '') in REGULAR_FREQUENCIES,
+        len(review_hits.found(PEER_REVIEW_SCORE_KEYWORDS)),
+        'double blind' in review_hits,
+        'single blind' in review_hits,
+        'open review' in review_hits,
+        review_hits.any(REVIEW_TIMEFRAMES),
+        _stored(journal_data, 'content_quality_score'),
+        _stored(journal_data, 'international_scope_score'),
+        _stored(journal_data, 'accessibility_score'),
+    ]
+
+
+def feature_matrix(journals: Iterable[Dict]) -> 'np.ndarray':
+    """Матрица (списания x FEATURES) от journal_data речниците"""
+    _require_numpy()
+    rows = [feature_row(journal_data) for journal_data in journals]
+    return np.array(rows, dtype=np.float64).reshape(len(rows), len(FEATURES))
+
+
+def _require_numpy():
+    if not HAVE_NUMPY:
+        raise RuntimeError('Груповата оценка изисква NumPy (pip install numpy)')
+
+
+def _capped(score: 'np.ndarray', cap: float = 100) -> 'np.ndarray':
+    return np.minimum(score, cap)
+
+
+def sub_scores(features: 'np.ndarray') -> 'np.ndarray':
+    """Оценките по шестте критерия (списания x CRITERIA), както при скаларния път.
+
+    Оценките за качество, международен обхват и достъпност се вземат от
+    journal_data, ако analyze_page е изчислил и трите (като
+    calculate_scopus_readiness). Ако липсва поне една, и трите се изчисляват
+    от признаците (като partial_scores) - всеки ред съвпада изцяло с едната
+    от двете функции.
+    """
+    _require_numpy()
+    f = {name: features[:, index] for name, index in COLUMN.items()}
+    board = f['board_size']
+    description_length = f['description_length']
+
+    content_quality = _capped(
+        30 * f['peer_review_info'] + 25 * (board > 0) + 20 * f['issn'] + 15 * f['doi_prefix']
+        + 10 * (description_length > 100)
+    )
+    editorial = _capped(
+        np.select([board >= 10, board >= 5, board > 0], [40, 25, 15], 0)
+        + _capped(f['professional_members'] * 3, 30)
+        + _capped(f['affiliation_members'] * 2, 30)
+    )
+    peer_review = _capped(
+        f['review_keywords'] * 15
+        + np.select([f['double_blind'] > 0, f['single_blind'] > 0, f['open_review'] > 0], [20, 15, 10], 0)
+        + 10 * f['review_timeframe']
+    )
+    international = _capped(
+        np.select([f['languages'] > 1, f['english'] > 0], [30, 20], 0)
+        + _capped(f['international_members'] * 5, 40)
+        + 20 * f['open_access'] + 10 * f['description_international']
+    )
+    technical = _capped(
+        25 * f['issn'] + 25 * f['doi_prefix'] + 20 * f['https']
+        + 15 * (f['title_length'] > 10) + 15 * (description_length > 50)
+    )
+    accessibility = _capped(
+        50 * f['open_access'] + 20 * f['https'] + 15 * f['mobile'] + 15 * f['regular_frequency']
+    )
+
+    stored = {name: f[f'{name}_score'] for name in ('content_quality', 'international_scope', 'accessibility')}
+    missing = np.isnan(stored['content_quality']) | np.isnan(stored['international_scope']) \
+        | np.isnan(stored['accessibility'])
+    columns = [
+        np.where(missing, content_quality, stored['content_quality']),
+        editorial,
+        peer_review,
+        np.where(missing, international, stored['international_scope']),
+        technical,
+        np.where(missing, accessibility, stored['accessibility']),
+    ]
+    return np.column_stack(columns) if len(features) else np.zeros((0, len(CRITERIA)))
+
+
+class BatchScorer:
+    """Оценява много списания наведнъж с теглата на анализатора (scopus_criteria).
+
+    Резултатът за всяко списание е този на calculate_scopus_readiness (без
+    препоръките), ако journal_data има трите *_score полета от analyze_page,
+    и този на partial_scores, ако ги няма (вж. sub_scores).
+
+    Признаците се извличат веднъж (feature_matrix) и могат да се пазят;
+    преоценката с нови тегла е само score_features върху готовата матрица.
+    """
+
+    def __init__(self, analyzer: Optional[ScopusJournalAnalyzer] = None, criteria: Dict[str, float] = None):
+        _require_numpy()
+        criteria = criteria or (analyzer or ScopusJournalAnalyzer()).scopus_criteria
+        self.weights = np.array([criteria[criterion] for criterion in CRITERIA], dtype=np.float64)
+
+    def score_features(self, features: 'np.ndarray') -> Dict[str, 'np.ndarray']:
+        """{'detailed_scores': (n x 6), 'total_score': (n), 'readiness_level': (n)}"""
+        scores = sub_scores(features)
+        # Сумиране по колони в реда на критериите - същите закръгляния като при sum() в _weighted_total
+        total = np.zeros(len(scores))
+        for index in range(len(CRITERIA)):
+            total = total + scores[:, index] * self.weights[index]
+
+        levels = np.select([total >= threshold for threshold, _ in READINESS_LEVELS],
+                           [level for _, level in READINESS_LEVELS], NOT_READY)
+        return {'detailed_scores': scores, 'total_score': total, 'readiness_level': levels}
+
+    def score(self, journals: Iterable[Dict]) -> Dict[str, 'np.ndarray']:
+        return self.score_features(feature_matrix(journals))
+
+    def results(self, journals: Iterable[Dict]) -> List[Dict]:
+        """Оценките като речници във формата на partial_scores (без препоръки)"""
+        scored = self.score(journals)
+        return [
+            {
+                'total_score': round(float(total), 2),
+                'readiness_level': str(level),
+                'detailed_scores': {criterion: float(score) for criterion, score in zip(CRITERIA, scores)},
+            }
+            for total, level, scores in zip(scored['total_score'], scored['readiness_level'],
+                                            scored['detailed_scores'])
+        ]
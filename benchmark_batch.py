@@ -0,0 +1,99 @@
+"""
+Бенчмарк: последователен срещу асинхронен групов анализ
+Използва локален stub сървър с изкуствено забавяне, без външна мрежа
+"""
+
+import sys
+import time
+import logging
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from app import ScopusJournalAnalyzer
+from batch_analyzer import BatchAnalyzer
+
+SAMPLE_PAGE = b"""<!DOCTYPE html>
+<html><head><title>Journal of Benchmark Studies</title>
+<meta name="description" content="An international peer-reviewed open access journal."></head>
+<body>
+<h1>Journal of Benchmark Studies</h1>
+<p>ISSN: 1234-5678. DOI: 10.12345/jbs. Published quarterly. Language: English</p>
+<div class="editorial-board">
+<li>Prof. John Smith, University of Cambridge</li>
+<li>Dr. Jane Doe, Harvard University</li>
+</div>
+<p>All manuscripts undergo double blind peer review within 4 weeks.</p>
+</body></html>"""
+
+
+def make_handler(latency: float):
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            time.sleep(latency)
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(SAMPLE_PAGE)))
+            self.end_headers()
+            self.wfile.write(SAMPLE_PAGE)
+
+        def log_message(self, format, *args):
+            pass
+
+    return StubHandler
+
+
+def start_stub_hosts(count: int, latency: float):
+    """Стартира count сървъра на различни портове (= различни хостове)"""
+    servers = []
+    for _ in range(count):
+        server = ThreadingHTTPServer(('127.0.0.1', 0), make_handler(latency))
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+    return servers
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--journals', type=int, default=200)
+    parser.add_argument('--hosts', type=int, default=8)
+    parser.add_argument('--latency', type=float, default=0.1, help='секунди на заявка')
+    parser.add_argument('--concurrency', type=int, default=64)
+    parser.add_argument('--per-host', type=int, default=4)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    servers = start_stub_hosts(args.hosts, args.latency)
+    urls = [
+        f'http://127.0.0.1:{servers[i % len(servers)].server_address[1]}/journal/{i}'
+        for i in range(args.journals)
+    ]
+    analyzer = ScopusJournalAnalyzer()
+
+    started = time.perf_counter()
+    for url in urls:
+        journal_data = analyzer.extract_journal_data(url)
+        analyzer.calculate_scopus_readiness(journal_data)
+    sequential = time.perf_counter() - started
+
+    batch = BatchAnalyzer(analyzer, max_concurrency=args.concurrency, per_host_limit=args.per_host)
+    started = time.perf_counter()
+    results = batch.run(urls)
+    concurrent = time.perf_counter() - started
+
+    failed = sum(1 for r in results if 'error' in r)
+    print(f"Списания: {args.journals}, хостове: {args.hosts}, забавяне: {args.latency}s")
+    print(f"Последователно: {sequential:7.2f}s  ({args.journals / sequential:7.1f} списания/s)")
+    print(f"Асинхронно:     {concurrent:7.2f}s  ({args.journals / concurrent:7.1f} списания/s)")
+    print(f"Ускорение: x{sequential / concurrent:.1f}, грешки: {failed}")
+
+    for server in servers:
+        server.shutdown()
+    return 0 if failed == 0 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
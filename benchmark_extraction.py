@@ -0,0 +1,159 @@
+"""
+Бенчмарк: многократно обхождане на документа срещу еднократно (page_features)
+и сравнение на наличните HTML парсери. Измерва парсване + извличане за една страница
+"""
+
+import re
+import sys
+import time
+import logging
+import argparse
+
+from bs4 import BeautifulSoup
+
+from app import ScopusJournalAnalyzer
+from html_parsers import available_backends
+
+SAMPLE_PAGE = """<!DOCTYPE html>
+<html><head><title>Journal of Benchmark Studies</title>
+<meta name="description" content="An international peer-reviewed open access journal.">
+<script>window.dataLayer = []; // peer review widget</script></head>
+<body>
+<nav><ul><li><a href="/about">About the Journal</a></li>
+<li><a href="/editorial-board">Editorial Board</a></li></ul></nav>
+<h1>Journal of Benchmark Studies</h1>
+<div class="about">Published quarterly since 1998. Languages: English, Bulgarian</div>
+<p>ISSN: 1234-5678. DOI: 10.12345/jbs.</p>
+<div class="editorial-board"><ul>
+<li>Prof. John Smith, University of Cambridge</li>
+<li>Dr. Jane Doe, Harvard University</li>
+<li>Prof. Ivan Petrov, Sofia University</li>
+</ul></div>
+<div class="editors"><p>Maria Ivanova</p><p>Georgi Dimitrov</p></div>
+<p>All manuscripts undergo double blind peer review; each referee follows our review process.</p>
+<footer>Creative Commons CC BY 4.0</footer>
+</body></html>"""
+
+
+def build_large_page(items: int = 400) -> str:
+    """Голяма страница: архив със статии около примерното съдържание"""
+    articles = ''.join(
+        f'<article class="item"><h3><a href="/articles/{i}">Article {i} on Research Methods</a></h3>'
+        f'<p>Authors: Anna Petrova, Peter Jones. Received after peer review in {i % 12 + 1} weeks.</p>'
+        f'<p>Keywords: methods, statistics, review, data <span>DOI: 10.{1000 + i}/x{i}</span></p></article>'
+        for i in range(items)
+    )
+    return SAMPLE_PAGE.replace('<footer>', f'<section class="archive">{articles}</section><footer>')
+
+
+def legacy_extract(soup: BeautifulSoup, url: str) -> dict:
+    """Предишното извличане: отделен get_text()/select_one()/find_all() за всеки сигнал"""
+    data = {}
+
+    for selector in ['h1', '.journal-title', '.page-title', 'title']:
+        title_elem = soup.select_one(selector)
+        if title_elem and title_elem.get_text(strip=True):
+            data['title'] = title_elem.get_text(strip=True)
+            break
+
+    for selector in ['.description', '.about', '.journal-description', 'meta[name="description"]']:
+        desc_elem = soup.select_one(selector)
+        if desc_elem:
+            if desc_elem.name == 'meta':
+                data['description'] = desc_elem.get('content', '')
+            else:
+                data['description'] = desc_elem.get_text(strip=True)
+            if data['description']:
+                break
+
+    text_content = soup.get_text()
+    issn_match = re.search(r'ISSN[:\s]*(\d{4}-\d{3}[\dX])', text_content, re.IGNORECASE)
+    if issn_match:
+        data['issn'] = issn_match.group(1)
+    doi_match = re.search(r'10\.\d{4,}', text_content)
+    if doi_match:
+        data['doi_prefix'] = doi_match.group(0)
+
+    editorial_members = []
+    for selector in ['.editorial-board', '.editors', '.editorial-team', '.advisory-board', '.review-board']:
+        board_section = soup.select_one(selector)
+        if board_section:
+            members = board_section.find_all(['li', 'p', 'div'], string=re.compile(r'[A-Z][a-z]+ [A-Z][a-z]+'))
+            for member in members:
+                member_text = member.get_text(strip=True)
+                if len(member_text.split()) >= 2:
+                    editorial_members.append(member_text)
+    data['editorial_board'] = list(dict.fromkeys(editorial_members))
+
+    peer_review_text = ''
+    for keyword in ['peer review', 'referee', 'review process', 'double blind']:
+        for element in soup.find_all(string=re.compile(keyword, re.IGNORECASE)):
+            if element.parent:
+                peer_review_text += element.parent.get_text(strip=True) + ' '
+    data['peer_review_info'] = peer_review_text.strip()
+
+    text_content = soup.get_text().lower()
+    for freq in ['monthly', 'quarterly', 'biannual', 'annual', 'weekly', 'daily']:
+        if freq in text_content:
+            data['publication_frequency'] = freq
+            break
+    data['open_access'] = any(i in text_content for i in ['open access', 'creative commons', 'cc by', 'free access'])
+    lang_match = re.search(r'language[s]?:[\s]*([A-Za-z\s,]+)', text_content, re.IGNORECASE)
+    if lang_match:
+        data['languages'] = [lang.strip() for lang in lang_match.group(1).split(',')]
+
+    # Връзките за обхождането на сайта - още едно търсене
+    data['links'] = [
+        (a['href'], ' '.join(a.get_text(' ', strip=True).lower().split()))
+        for a in soup.find_all('a', href=True)
+    ]
+    return data
+
+
+def single_pass_extract(analyzer: ScopusJournalAnalyzer, html: bytes, url: str) -> dict:
+    data, features = analyzer._extract_page_data(html, url)
+    data['links'] = features.links
+    return data
+
+
+def measure(func, html: bytes, repeat: int) -> float:
+    """Средно време (ms) за парсване + извличане"""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func(html)
+    return (time.perf_counter() - started) * 1000 / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--items', type=int, default=400, help='статии в голямата страница')
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    url = 'https://example.com/journal'
+    analyzers = {backend: ScopusJournalAnalyzer(parser_backend=backend) for backend in available_backends()}
+    pages = {'малка': SAMPLE_PAGE.encode('utf-8'), 'голяма': build_large_page(args.items).encode('utf-8')}
+
+    for name, html in pages.items():
+        parse_ms = measure(lambda content: BeautifulSoup(content, 'html.parser'), html, args.repeat)
+        legacy_ms = measure(lambda content: legacy_extract(BeautifulSoup(content, 'html.parser'), url),
+                            html, args.repeat)
+        single_ms = measure(lambda content: single_pass_extract(analyzers['html.parser'], content, url),
+                            html, args.repeat)
+        print(f"Страница '{name}' ({len(html) // 1024} KB):")
+        print(f"  само парсване:       {parse_ms:8.2f} ms")
+        print(f"  многократно обхождане: {legacy_ms:8.2f} ms")
+        print(f"  еднократно обхождане:  {single_ms:8.2f} ms")
+        print(f"  намаление: {100 * (1 - single_ms / legacy_ms):.0f}% общо, "
+              f"{100 * (1 - (single_ms - parse_ms) / (legacy_ms - parse_ms)):.0f}% от извличането")
+        for backend, analyzer in analyzers.items():
+            if backend == 'html.parser':
+                continue
+            backend_ms = measure(lambda content: single_pass_extract(analyzer, content, url), html, args.repeat)
+            print(f"  {backend + ':':22} {backend_ms:8.2f} ms ({single_ms / backend_ms:.1f}x спрямо html.parser)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
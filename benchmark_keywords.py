@@ -0,0 +1,146 @@
+"""
+Бенчмарк: KeywordMatcher (str.find по дума) срещу еднократен проход по текста -
+общ регулярен израз и Aho-Corasick - върху речниците и текстовете на приложението
+"""
+
+import re
+import sys
+import time
+import logging
+import argparse
+from collections import deque
+from typing import Callable, Dict, Iterable, List, Tuple
+
+from bs4 import BeautifulSoup
+
+from app import (
+    PROFESSIONAL_TITLES, INTERNATIONAL_AFFILIATIONS, INTERNATIONAL_INDICATORS, INTERNATIONAL_KEYWORDS,
+    PEER_REVIEW_SCORE_KEYWORDS, REVIEW_TIMEFRAMES
+)
+from page_features import FREQUENCY_KEYWORDS, OPEN_ACCESS_INDICATORS, PEER_REVIEW_KEYWORDS
+from keyword_matcher import KeywordMatcher
+from benchmark_extraction import build_large_page
+from benchmark_scoring import BOARD_MEMBERS, REVIEW_TEXTS, DESCRIPTIONS
+
+
+class RegexScanner:
+    """Един проход с (?=(дума1|дума2|...)): по-дългите думи първи, по-късите
+    думи, които са тяхно начало, се добавят на същата позиция"""
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords = tuple(dict.fromkeys(keyword.lower() for keyword in keywords if keyword))
+        longest_first = sorted(self.keywords, key=len, reverse=True)
+        self.pattern = re.compile('(?=(' + '|'.join(map(re.escape, longest_first)) + '))')
+        self.prefixes = {keyword: [other for other in self.keywords if other != keyword and keyword.startswith(other)]
+                         for keyword in self.keywords}
+
+    def scan(self, text: str) -> Dict[str, List[int]]:
+        offsets: Dict[str, List[int]] = {}
+        for match in self.pattern.finditer(text.lower()):
+            keyword, position = match.group(1), match.start()
+            for found in [keyword] + self.prefixes[keyword]:
+                offsets.setdefault(found, []).append(position)
+        return offsets
+
+
+class AhoCorasickScanner:
+    """Aho-Corasick автомат - един проход по символите на текста"""
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords = tuple(dict.fromkeys(keyword.lower() for keyword in keywords if keyword))
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.output: List[List[str]] = [[]]
+        for keyword in self.keywords:
+            state = 0
+            for char in keyword:
+                if char not in self.goto[state]:
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append([])
+                    self.goto[state][char] = len(self.goto) - 1
+                state = self.goto[state][char]
+            self.output[state].append(keyword)
+
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self.goto[state].items():
+                queue.append(child)
+                if state:
+                    fallback = self.fail[state]
+                    while fallback and char not in self.goto[fallback]:
+                        fallback = self.fail[fallback]
+                    self.fail[child] = self.goto[fallback].get(char, 0)
+                self.output[child] = self.output[child] + self.output[self.fail[child]]
+
+    def scan(self, text: str) -> Dict[str, List[int]]:
+        offsets: Dict[str, List[int]] = {}
+        goto, fail, output = self.goto, self.fail, self.output
+        state = 0
+        for index, char in enumerate(text.lower()):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for keyword in output[state]:
+                offsets.setdefault(keyword, []).append(index - len(keyword) + 1)
+        return {keyword: sorted(positions) for keyword, positions in offsets.items()}
+
+
+def page_texts() -> List[str]:
+    """Текстът на страници с архив от 5 и 30 статии"""
+    return [BeautifulSoup(build_large_page(items), 'html.parser').get_text(' ') for items in (5, 30)]
+
+
+def workloads() -> List[Tuple[str, List[str], List[str]]]:
+    """(име, речник, текстове) - както ги сканира приложението"""
+    return [
+        ('редакционен съвет', PROFESSIONAL_TITLES + INTERNATIONAL_AFFILIATIONS + INTERNATIONAL_INDICATORS,
+         BOARD_MEMBERS),
+        ('peer review оценка', PEER_REVIEW_SCORE_KEYWORDS + REVIEW_TIMEFRAMES, REVIEW_TEXTS),
+        ('описание', INTERNATIONAL_KEYWORDS, DESCRIPTIONS),
+        ('текст на страницата', FREQUENCY_KEYWORDS + OPEN_ACCESS_INDICATORS, page_texts()),
+        ('peer review в страницата', PEER_REVIEW_KEYWORDS, page_texts()),
+    ]
+
+
+def measure(scan: Callable[[str], object], texts: List[str], repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for text in texts:
+            scan(text)
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=2000)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    mismatches = 0
+    for name, keywords, texts in workloads():
+        matcher = KeywordMatcher(keywords)
+        scanners = {
+            'str.find по дума': lambda text: matcher.scan(text),
+            'str.find, само наличие': lambda text: matcher.scan(text, positions=False),
+            'общ регулярен израз': RegexScanner(keywords).scan,
+            'Aho-Corasick': AhoCorasickScanner(keywords).scan,
+        }
+        for text in texts:
+            expected = matcher.scan(text).offsets
+            mismatches += sum(1 for label in ('общ регулярен израз', 'Aho-Corasick')
+                              if scanners[label](text) != expected)
+
+        # Дългите страници - с по-малко повторения
+        repeat = args.repeat if max(map(len, texts)) < 1000 else max(1, args.repeat // 50)
+        print(f"{name} ({len(keywords)} думи, {len(texts)} текста x {repeat}):")
+        for label, scan in scanners.items():
+            print(f"  {label:24} {measure(scan, texts, repeat) * 1000:8.1f} ms")
+
+    print(f"Разминавания с KeywordMatcher: {mismatches}")
+    return 0 if mismatches == 0 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,99 @@
+"""
+Бенчмарк: calculate_scopus_readiness за всяко списание срещу векторизираната BatchScorer
+Използва синтетични извлечени данни, без мрежа
+"""
+
+import sys
+import time
+import random
+import logging
+import argparse
+from typing import Dict, List
+
+from app import ScopusJournalAnalyzer
+
+BOARD_MEMBERS = [
+    'Prof. John Smith, University of Cambridge', 'Dr. Jane Doe, Harvard University',
+    'Maria Ivanova, Institute of Mathematics', 'Peter Brown', 'Dr. Li Wei, PhD, Tsinghua University',
+    'Anna Petrova, Sofia University', 'Director of Research, National Hospital', 'Editorial Assistant',
+]
+REVIEW_TEXTS = [
+    '', 'All manuscripts undergo double blind peer review within 4 weeks.',
+    'Single blind review by at least two referees.', 'We practise open review.',
+    'Each submission is assessed by a reviewer; the review process takes about two months.',
+]
+DESCRIPTIONS = [
+    '', 'A journal.', 'An international peer-reviewed open access journal publishing original research '
+    'in all areas of applied mathematics and computer science.',
+    'A national journal for regional studies with a global readership and multinational authorship, '
+    'publishing articles, reviews and short communications.',
+]
+LANGUAGES = [[], ['English'], ['Bulgarian'], ['English', 'Bulgarian'], ['english', 'German', 'French']]
+URLS = ['https://journal.example/', 'http://journal.example/', 'https://m.journal.example/', '']
+FREQUENCIES = ['', 'monthly', 'quarterly', 'annual']
+TITLES = ['', 'JMS', 'Journal of Benchmark Studies']
+
+
+def sample_journals(count: int, seed: int = 1) -> List[Dict]:
+    """Синтетични journal_data речници с различни комбинации от признаци"""
+    rng = random.Random(seed)
+    journals = []
+    for _ in range(count):
+        journals.append({
+            'url': rng.choice(URLS),
+            'title': rng.choice(TITLES),
+            'issn': rng.choice(['', '1234-5678']),
+            'doi_prefix': rng.choice(['', '10.12345']),
+            'description': rng.choice(DESCRIPTIONS),
+            'languages': rng.choice(LANGUAGES),
+            'open_access': rng.random() < 0.5,
+            'publication_frequency': rng.choice(FREQUENCIES),
+            'peer_review_info': rng.choice(REVIEW_TEXTS),
+            'editorial_board': rng.sample(BOARD_MEMBERS * 2, rng.randint(0, 14)),
+        })
+    return journals
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--journals', type=int, default=50000)
+    args = parser.parse_args()
+
+    from batch_scoring import HAVE_NUMPY, BatchScorer, feature_matrix
+    if not HAVE_NUMPY:
+        print("NumPy не е инсталиран (pip install numpy)")
+        return 1
+
+    logging.disable(logging.INFO)
+    analyzer = ScopusJournalAnalyzer()
+    journals = sample_journals(args.journals)
+    for journal_data in journals:
+        journal_data.update(analyzer._analyze_content_quality(journal_data))
+        journal_data.update(analyzer._analyze_international_scope(journal_data))
+        journal_data.update(analyzer._analyze_accessibility(journal_data))
+
+    started = time.perf_counter()
+    scalar = [analyzer.calculate_scopus_readiness(journal_data) for journal_data in journals]
+    sequential = time.perf_counter() - started
+
+    scorer = BatchScorer(analyzer)
+    started = time.perf_counter()
+    features = feature_matrix(journals)
+    extraction = time.perf_counter() - started
+
+    started = time.perf_counter()
+    scored = scorer.score_features(features)
+    vectorized = time.perf_counter() - started
+
+    mismatches = sum(1 for expected, total in zip(scalar, scored['total_score'])
+                     if expected['total_score'] != round(float(total), 2))
+    print(f"Списания: {args.journals}")
+    print(f"calculate_scopus_readiness: {sequential:7.2f}s")
+    print(f"Матрица с признаци:         {extraction:7.2f}s  (веднъж)")
+    print(f"Векторизирана оценка:       {vectorized:7.3f}s  (при всяка смяна на теглата)")
+    print(f"Преоценка: x{sequential / vectorized:.0f} по-бързо, разминавания: {mismatches}")
+    return 0 if mismatches == 0 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
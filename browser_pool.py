@@ -0,0 +1,289 @@
+"""
+Пул от предварително стартирани headless Chrome браузъри
+"""
+
+import os
+import time
+import atexit
+import logging
+import threading
+from collections import deque
+from contextlib import contextmanager
+from typing import Callable, List, Optional
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+HAVE_SELENIUM = False
+try:
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+    HAVE_SELENIUM = True
+except ImportError:
+    pass
+
+HAVE_PSUTIL = False
+try:
+    import psutil
+    HAVE_PSUTIL = True
+except ImportError:
+    pass
+
+READY_STATE_SCRIPT = "return document.readyState"
+ELEMENT_COUNT_SCRIPT = "return document.getElementsByTagName('*').length"
+SELECTORS_PRESENT_SCRIPT = (
+    "return arguments[0].some(function (s) { return document.querySelector(s) !== null; })"
+)
+JS_HEAP_SCRIPT = "return (window.performance && performance.memory) ? performance.memory.usedJSHeapSize : null"
+
+
+def create_chrome_driver():
+    """Стартира headless Chrome с настройките на приложението"""
+    if not HAVE_SELENIUM:
+        raise RuntimeError("Selenium не е наличен на текущия хостинг. Анализът ще продължи само с requests.")
+
+    chrome_options = Options()
+    chrome_options.add_argument('--headless')
+    chrome_options.add_argument('--no-sandbox')
+    chrome_options.add_argument('--disable-dev-shm-usage')
+    chrome_options.add_argument('--disable-gpu')
+    chrome_options.add_argument('--window-size=1920,1080')
+    chrome_options.add_argument('--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36')
+
+    driver = webdriver.Chrome(options=chrome_options)
+    driver.set_page_load_timeout(Config.BROWSER_PAGE_LOAD_TIMEOUT)
+    return driver
+
+
+def _wait_for(predicate: Callable[[], bool], timeout: float, interval: float = 0.1) -> bool:
+    """Проверява predicate до timeout секунди"""
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            if predicate():
+                return True
+        except Exception:
+            pass
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(interval)
+
+
+def wait_until_ready(driver, selectors: List[str] = None, timeout: float = None) -> str:
+    """Изчаква страницата вместо фиксиран time.sleep.
+
+    Първо document.readyState == 'complete', след това някой от selectors да
+    се появи или DOM-ът да спре да расте (броят елементи е еднакъв две
+    последователни проверки). Връща причината за готовност.
+    """
+    timeout = Config.BROWSER_READY_TIMEOUT if timeout is None else timeout
+    deadline = time.monotonic() + timeout
+
+    if not _wait_for(lambda: driver.execute_script(READY_STATE_SCRIPT) == 'complete', timeout):
+        return 'timeout'
+
+    state = {'count': -1, 'stable': 0}
+
+    def ready() -> bool:
+        if selectors and driver.execute_script(SELECTORS_PRESENT_SCRIPT, selectors):
+            state['reason'] = 'selectors'
+            return True
+        count = driver.execute_script(ELEMENT_COUNT_SCRIPT)
+        state['stable'] = state['stable'] + 1 if count == state['count'] else 0
+        state['count'] = count
+        if state['stable'] >= 2:
+            state['reason'] = 'dom-stable'
+            return True
+        return False
+
+    remaining = max(deadline - time.monotonic(), 0)
+    if _wait_for(ready, remaining, interval=Config.BROWSER_STABLE_INTERVAL):
+        return state['reason']
+    return 'timeout'
+
+
+class BrowserPool:
+    """Ограничен пул от браузъри, които се отдават под наем за един анализ.
+
+    Браузърът се рестартира след max_pages страници или при надхвърлена
+    памет, а преди всяко отдаване се прави health check.
+    """
+
+    def __init__(self, size: int = None, max_pages: int = None, max_memory_mb: float = None,
+                 acquire_timeout: float = None, driver_factory: Callable = None):
+        self.size = size or Config.BROWSER_POOL_SIZE
+        self.max_pages = max_pages or Config.BROWSER_MAX_PAGES
+        self.max_memory_mb = max_memory_mb or Config.BROWSER_MAX_MEMORY_MB
+        self.acquire_timeout = Config.BROWSER_ACQUIRE_TIMEOUT if acquire_timeout is None else acquire_timeout
+        self.driver_factory = driver_factory or create_chrome_driver
+
+        self._idle = deque()
+        self._pages = {}
+        self._total = 0
+        self._closed = False
+        self._condition = threading.Condition()
+
+    def _start_driver(self):
+        driver = self.driver_factory()
+        with self._condition:
+            self._pages[id(driver)] = 0
+        return driver
+
+    def _discard(self, driver):
+        """Спира браузъра и освобождава мястото му в пула"""
+        try:
+            driver.quit()
+        except Exception as e:
+            logger.warning(f"Грешка при спиране на браузър: {e}")
+        with self._condition:
+            self._pages.pop(id(driver), None)
+            self._total -= 1
+            self._condition.notify()
+
+    def _is_healthy(self, driver) -> bool:
+        try:
+            return driver.execute_script("return 1") == 1
+        except Exception:
+            return False
+
+    def _memory_mb(self, driver) -> Optional[float]:
+        """RSS на браузъра (с psutil) или размера на JS heap-а"""
+        if HAVE_PSUTIL:
+            try:
+                process = psutil.Process(driver.service.process.pid)
+                processes = [process] + process.children(recursive=True)
+                return sum(p.memory_info().rss for p in processes) / (1024 * 1024)
+            except Exception:
+                pass
+        try:
+            used = driver.execute_script(JS_HEAP_SCRIPT)
+            return used / (1024 * 1024) if used else None
+        except Exception:
+            return None
+
+    def _needs_recycle(self, driver) -> bool:
+        if self._pages.get(id(driver), 0) >= self.max_pages:
+            return True
+        memory = self._memory_mb(driver)
+        return memory is not None and memory > self.max_memory_mb
+
+    def warm_up(self, count: int = None):
+        """Стартира браузъри предварително (до размера на пула)"""
+        count = self.size if count is None else min(count, self.size)
+        while True:
+            with self._condition:
+                if self._closed or self._total >= count:
+                    return
+                self._total += 1
+            try:
+                driver = self._start_driver()
+            except Exception as e:
+                logger.error(f"Грешка при стартиране на браузър: {e}")
+                with self._condition:
+                    self._total -= 1
+                return
+            with self._condition:
+                self._idle.append(driver)
+                self._condition.notify()
+
+    def warm_up_async(self, count: int = None):
+        threading.Thread(target=self.warm_up, args=(count,), daemon=True,
+                         name='browser-pool-warmup').start()
+
+    def _acquire(self):
+        deadline = time.monotonic() + self.acquire_timeout
+        while True:
+            with self._condition:
+                while not self._idle and self._total >= self.size:
+                    remaining = deadline - time.monotonic()
+                    if self._closed or remaining <= 0:
+                        raise TimeoutError("Няма свободен браузър в пула")
+                    self._condition.wait(remaining)
+                if self._closed:
+                    raise RuntimeError("Пулът с браузъри е затворен")
+                driver = self._idle.popleft() if self._idle else None
+                if driver is None:
+                    self._total += 1
+
+            if driver is None:
+                try:
+                    return self._start_driver()
+                except Exception:
+                    with self._condition:
+                        self._total -= 1
+                        self._condition.notify()
+                    raise
+
+            if self._is_healthy(driver):
+                return driver
+            logger.warning("Браузърът не отговаря - рестартирам го")
+            self._discard(driver)
+
+    def _release(self, driver, broken: bool = False):
+        with self._condition:
+            self._pages[id(driver)] = self._pages.get(id(driver), 0) + 1
+
+        if broken or self._closed or self._needs_recycle(driver):
+            self._discard(driver)
+            if not self._closed:
+                # Поддържаме пула "топъл" без да бавим текущата заявка
+                self.warm_up_async()
+            return
+
+        try:
+            driver.delete_all_cookies()
+        except Exception:
+            pass
+        with self._condition:
+            self._idle.append(driver)
+            self._condition.notify()
+
+    @contextmanager
+    def lease(self):
+        """Отдава браузър за времето на with блока"""
+        driver = self._acquire()
+        broken = False
+        try:
+            yield driver
+        except Exception:
+            broken = not self._is_healthy(driver)
+            raise
+        finally:
+            self._release(driver, broken)
+
+    def render(self, url: str, selectors: List[str] = None, timeout: float = None) -> str:
+        """Зарежда URL и връща HTML-а след като страницата е готова"""
+        with self.lease() as driver:
+            driver.get(url)
+            reason = wait_until_ready(driver, selectors, timeout)
+            logger.debug(f"{url} е готова ({reason})")
+            return driver.page_source
+
+    def close(self):
+        """Спира всички свободни браузъри; заетите се спират при връщане"""
+        with self._condition:
+            self._closed = True
+            drivers = list(self._idle)
+            self._idle.clear()
+            self._condition.notify_all()
+        for driver in drivers:
+            self._discard(driver)
+
+
+_default_pool = None
+_default_pool_pid = None
+_default_pool_lock = threading.Lock()
+
+
+def get_browser_pool() -> BrowserPool:
+    """Пулът на текущия worker процес (създава се след fork)"""
+    global _default_pool, _default_pool_pid
+
+    pid = os.getpid()
+    with _default_pool_lock:
+        if _default_pool is None or _default_pool_pid != pid:
+            _default_pool = BrowserPool()
+            _default_pool_pid = pid
+            atexit.register(_default_pool.close)
+        return _default_pool
@@ -12,8 +12,49 @@ class Config:
     """Основна конфигурация"""
 
     # Scopus API настройки
-    SCOPUS_API_KEY = os.getenv('SCOPUS_API_KEY', '')
+    # Няколко ключа (SCOPUS_API_KEYS=ключ1,ключ2) се ползват като набор с обща квота
+    SCOPUS_API_KEYS = [key.strip() for key in os.getenv('SCOPUS_API_KEYS', os.getenv('SCOPUS_API_KEY', '')).split(',')
+                       if key.strip()]
+    SCOPUS_API_KEY = os.getenv('SCOPUS_API_KEY', '') or (SCOPUS_API_KEYS[0] if SCOPUS_API_KEYS else '')
+    # Квотата и паузите на ключовете се помнят между рестартите; пауза след 429 без Retry-After
+    SCOPUS_KEYS_DB = os.getenv('SCOPUS_KEYS_DB', 'scopus_keys.sqlite3')
+    SCOPUS_KEY_COOLDOWN = float(os.getenv('SCOPUS_KEY_COOLDOWN', '60'))
     SCOPUS_BASE_URL = 'https://api.elsevier.com/content/search/scopus'
+    # Заявки в секунда (и натрупване) на ключ в рамките на един процес
+    SCOPUS_REQUESTS_PER_SECOND = float(os.getenv('SCOPUS_REQUESTS_PER_SECOND', '3'))
+    SCOPUS_BURST = float(os.getenv('SCOPUS_BURST', '3'))
+    # Под този дял от квотата заявките се разпределят равномерно до подновяването ѝ
+    SCOPUS_QUOTA_RESERVE = float(os.getenv('SCOPUS_QUOTA_RESERVE', '0.2'))
+    # Най-дълго чакане на изчерпана квота или Retry-After, преди заявката да се откаже
+    SCOPUS_MAX_QUOTA_WAIT = float(os.getenv('SCOPUS_MAX_QUOTA_WAIT', '60'))
+    SCOPUS_MAX_RETRIES = int(os.getenv('SCOPUS_MAX_RETRIES', '4'))
+    SCOPUS_BACKOFF_BASE = float(os.getenv('SCOPUS_BACKOFF_BASE', '0.5'))
+    SCOPUS_BACKOFF_MAX = float(os.getenv('SCOPUS_BACKOFF_MAX', '30'))
+    # Локален индекс на Scopus Source List (python scopus_sources.py <файл>)
+    SCOPUS_SOURCES_DB = os.getenv('SCOPUS_SOURCES_DB', 'scopus_sources.sqlite3')
+    # Най-ниско сходство на заглавията (0..1), при което кандидат се приема за същото списание
+    SCOPUS_TITLE_MIN_CONFIDENCE = float(os.getenv('SCOPUS_TITLE_MIN_CONFIDENCE', '0.7'))
+    # Резултати на страница и групови заявки ISSN(a) OR ISSN(b) ... (по брой ISSN и дължина)
+    SCOPUS_PAGE_SIZE = int(os.getenv('SCOPUS_PAGE_SIZE', '25'))
+    SCOPUS_BULK_CHUNK_SIZE = int(os.getenv('SCOPUS_BULK_CHUNK_SIZE', '50'))
+    SCOPUS_MAX_QUERY_LENGTH = int(os.getenv('SCOPUS_MAX_QUERY_LENGTH', '1500'))
+    SCOPUS_BULK_MAX_PAGES = int(os.getenv('SCOPUS_BULK_MAX_PAGES', '8'))
+    # Постоянен кеш на Scopus отговорите - TTL в секунди по endpoint
+    SCOPUS_CACHE_ENABLED = os.getenv('SCOPUS_CACHE_ENABLED', 'True').lower() == 'true'
+    SCOPUS_CACHE_DB = os.getenv('SCOPUS_CACHE_DB', 'scopus_cache.sqlite3')
+    SCOPUS_CACHE_MAX_ENTRIES = int(os.getenv('SCOPUS_CACHE_MAX_ENTRIES', '20000'))
+    SCOPUS_CACHE_TTLS = {
+        'search': float(os.getenv('SCOPUS_CACHE_SEARCH_TTL', str(7 * 24 * 3600))),
+        'metrics': float(os.getenv('SCOPUS_CACHE_METRICS_TTL', str(30 * 24 * 3600))),
+        'indexing_status': float(os.getenv('SCOPUS_CACHE_STATUS_TTL', str(7 * 24 * 3600))),
+    }
+    SCOPUS_CACHE_DEFAULT_TTL = float(os.getenv('SCOPUS_CACHE_DEFAULT_TTL', str(24 * 3600)))
+    # 'Не е намерено' се помни по-кратко - списанието може да бъде индексирано
+    SCOPUS_CACHE_NEGATIVE_TTL = float(os.getenv('SCOPUS_CACHE_NEGATIVE_TTL', str(24 * 3600)))
+    # Scopus проверка в /analyze и /jobs - успоредно с обхождането; най-дълго чакане след него
+    SCOPUS_ENRICH_ENABLED = os.getenv('SCOPUS_ENRICH_ENABLED', 'True').lower() == 'true'
+    SCOPUS_ENRICH_TIMEOUT = float(os.getenv('SCOPUS_ENRICH_TIMEOUT', '20'))
+    SCOPUS_ENRICH_WORKERS = int(os.getenv('SCOPUS_ENRICH_WORKERS', '4'))
 
     # Flask настройки
     SECRET_KEY = os.getenv('SECRET_KEY', 'dev-secret-key-change-in-production')
@@ -22,6 +63,10 @@ class Config:
     # Chrome Driver настройки
     CHROME_DRIVER_PATH = os.getenv('CHROME_DRIVER_PATH', '')
 
+    # Локални данни (SQLite хранилища, споделени между worker-ите)
+    DATA_DIR = os.getenv('DATA_DIR', '.data')
+    SQLITE_BUSY_TIMEOUT = 10
+
     # Logging настройки
     LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
     LOG_FILE = os.getenv('LOG_FILE', 'scopus_analyzer.log')
@@ -31,6 +76,81 @@ class Config:
     SELENIUM_WAIT_TIME = 3
     MAX_EDITORIAL_BOARD_SIZE = 50
 
+    # HTTP транспорт (connection pooling и keep-alive)
+    HTTP_POOL_CONNECTIONS = int(os.getenv('HTTP_POOL_CONNECTIONS', '32'))
+    HTTP_POOL_MAXSIZE = int(os.getenv('HTTP_POOL_MAXSIZE', '8'))
+    HTTP_POOL_BLOCK = os.getenv('HTTP_POOL_BLOCK', 'False').lower() == 'true'
+    HTTP_CONNECT_TIMEOUT = float(os.getenv('HTTP_CONNECT_TIMEOUT', '5'))
+    HTTP_READ_TIMEOUT = float(os.getenv('HTTP_READ_TIMEOUT', str(REQUEST_TIMEOUT)))
+
+    # Изтегляне на страници: лимит на размера и приемани типове съдържание
+    MAX_PAGE_BYTES = int(os.getenv('MAX_PAGE_BYTES', str(2 * 1024 * 1024)))
+    PAGE_CHUNK_SIZE = 64 * 1024
+    PAGE_DOWNLOAD_TIMEOUT = float(os.getenv('PAGE_DOWNLOAD_TIMEOUT', '20'))
+    ALLOWED_CONTENT_TYPES = ('text/html', 'application/xhtml+xml', 'text/plain')
+
+    # HTML парсер: auto, selectolax, lxml или html.parser
+    HTML_PARSER = os.getenv('HTML_PARSER', 'auto').lower()
+
+    # HTTP кеш за страниците на списанията (ETag / Last-Modified)
+    HTTP_CACHE_ENABLED = os.getenv('HTTP_CACHE_ENABLED', 'True').lower() == 'true'
+    HTTP_CACHE_DIR = os.getenv('HTTP_CACHE_DIR', '.http_cache')
+    # Секунди свежест, когато сървърът не изпраща Cache-Control/Expires
+    HTTP_CACHE_DEFAULT_TTL = float(os.getenv('HTTP_CACHE_DEFAULT_TTL', '0'))
+
+    # Обхождане на свързани страници (редакционен съвет, рецензиране и др.)
+    CRAWL_ENABLED = os.getenv('CRAWL_ENABLED', 'True').lower() == 'true'
+    CRAWL_MAX_PAGES = int(os.getenv('CRAWL_MAX_PAGES', '4'))
+    CRAWL_TIME_BUDGET = float(os.getenv('CRAWL_TIME_BUDGET', '15'))
+    CRAWL_MAX_WORKERS = int(os.getenv('CRAWL_MAX_WORKERS', '3'))
+
+    # Пул от headless Chrome браузъри (за всеки gunicorn worker)
+    BROWSER_POOL_SIZE = int(os.getenv('BROWSER_POOL_SIZE', '2'))
+    BROWSER_POOL_PREWARM = os.getenv('BROWSER_POOL_PREWARM', 'True').lower() == 'true'
+    BROWSER_MAX_PAGES = int(os.getenv('BROWSER_MAX_PAGES', '50'))
+    BROWSER_MAX_MEMORY_MB = float(os.getenv('BROWSER_MAX_MEMORY_MB', '700'))
+    BROWSER_ACQUIRE_TIMEOUT = float(os.getenv('BROWSER_ACQUIRE_TIMEOUT', '30'))
+    BROWSER_PAGE_LOAD_TIMEOUT = float(os.getenv('BROWSER_PAGE_LOAD_TIMEOUT', '30'))
+    BROWSER_READY_TIMEOUT = float(os.getenv('BROWSER_READY_TIMEOUT', '10'))
+    BROWSER_STABLE_INTERVAL = 0.25
+
+    # Памет по домейн дали JavaScript рендерирането добавя данни
+    RENDER_POLICY_DB = os.getenv('RENDER_POLICY_DB', 'render_policy.sqlite3')
+    RENDER_POLICY_MIN_SAMPLES = int(os.getenv('RENDER_POLICY_MIN_SAMPLES', '2'))
+    RENDER_POLICY_TTL = float(os.getenv('RENDER_POLICY_TTL', str(7 * 24 * 3600)))
+
+    # Кеш на готовите анализи (/analyze), общ за worker-ите
+    RESULT_CACHE_ENABLED = os.getenv('RESULT_CACHE_ENABLED', 'True').lower() == 'true'
+    RESULT_CACHE_DB = os.getenv('RESULT_CACHE_DB', 'result_cache.sqlite3')
+    RESULT_CACHE_TTL = float(os.getenv('RESULT_CACHE_TTL', '3600'))
+    RESULT_CACHE_MAX_ENTRIES = int(os.getenv('RESULT_CACHE_MAX_ENTRIES', '1000'))
+
+    # Обединяване на едновременните анализи на един URL (в процеса и между worker-ите)
+    SINGLE_FLIGHT_DB = os.getenv('SINGLE_FLIGHT_DB', 'leases.sqlite3')
+    # По-дълго от --timeout на gunicorn, за да не изтече lease на работещ анализ
+    SINGLE_FLIGHT_LEASE_TTL = float(os.getenv('SINGLE_FLIGHT_LEASE_TTL', '150'))
+    SINGLE_FLIGHT_WAIT_TIMEOUT = float(os.getenv('SINGLE_FLIGHT_WAIT_TIMEOUT', '150'))
+    SINGLE_FLIGHT_POLL_INTERVAL = 0.5
+
+    # Фонови задачи (POST /jobs) и синхронният /analyze върху тях
+    JOB_DB = os.getenv('JOB_DB', 'jobs.sqlite3')
+    JOB_MAX_WORKERS = int(os.getenv('JOB_MAX_WORKERS', '2'))
+    JOB_QUEUE_LIMIT = int(os.getenv('JOB_QUEUE_LIMIT', '20'))
+    JOB_RETENTION = float(os.getenv('JOB_RETENTION', str(24 * 3600)))
+    # Толкова чака /analyze, след което връща 202 и адреса на задачата
+    ANALYZE_SYNC_TIMEOUT = float(os.getenv('ANALYZE_SYNC_TIMEOUT', '25'))
+    # GET /jobs/<id>/events: проверка за нови етапи, keep-alive коментар и най-дълъг поток
+    JOB_EVENTS_POLL_INTERVAL = float(os.getenv('JOB_EVENTS_POLL_INTERVAL', '0.3'))
+    JOB_EVENTS_HEARTBEAT = float(os.getenv('JOB_EVENTS_HEARTBEAT', '15'))
+    JOB_EVENTS_TIMEOUT = float(os.getenv('JOB_EVENTS_TIMEOUT', '300'))
+
+    # Групов анализ
+    BATCH_MAX_CONCURRENCY = int(os.getenv('BATCH_MAX_CONCURRENCY', '64'))
+    BATCH_PER_HOST_LIMIT = int(os.getenv('BATCH_PER_HOST_LIMIT', '4'))
+    # POST /analyze/batch - по-малък паралелизъм, защото върви в web worker
+    BATCH_STREAM_CONCURRENCY = int(os.getenv('BATCH_STREAM_CONCURRENCY', '8'))
+    BATCH_MAX_URLS = int(os.getenv('BATCH_MAX_URLS', '500'))
+
     # Scopus критерии тегла
     SCOPUS_CRITERIA_WEIGHTS = {
         'content_quality': 0.25,
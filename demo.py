@@ -6,6 +6,8 @@
 import json
 from app import ScopusJournalAnalyzer
 from scopus_api import ScopusEnhancer
+from scopus_enrichment import ScopusEnrichment
+from batch_analyzer import BatchAnalyzer
 
 def demo_analysis():
     """Демонстрация на анализа на списание"""
@@ -45,24 +47,26 @@ def demo_analysis():
         print(f"\nАнализирам: {selected_url}")
         print("Моля изчакайте...")
         
-        # Извършваме анализа
-        journal_data = analyzer.extract_journal_data(selected_url)
+        # Извършваме анализа - Scopus проверката започва, щом е известно заглавието,
+        # и върви успоредно с обхождането на страниците
+        enrichment = ScopusEnrichment(enhancer)
+        journal_data = analyzer.extract_journal_data(selected_url, enrichment.progress())
         
         if 'error' in journal_data:
             print(f"Грешка при анализ: {journal_data['error']}")
             return
         
         # Подобряваме анализа с Scopus данни
-        enhanced_data = enhancer.enhance_journal_analysis(journal_data)
+        enrichment.finish(journal_data)
         
         # Изчисляваме готовността
-        readiness_analysis = analyzer.calculate_scopus_readiness(enhanced_data)
+        readiness_analysis = analyzer.calculate_scopus_readiness(journal_data)
         
         # Показваме резултатите
-        display_results(enhanced_data, readiness_analysis)
+        display_results(journal_data, readiness_analysis)
         
         # Запазваме резултатите
-        save_results(enhanced_data, readiness_analysis, selected_url)
+        save_results(journal_data, readiness_analysis, selected_url)
         
     except KeyboardInterrupt:
         print("\nАнализът е прекъснат от потребителя")
@@ -182,27 +186,27 @@ def demo_batch_analysis():
         "https://www.cell.com/cell/"
     ]
     
-    analyzer = ScopusJournalAnalyzer()
+    batch = BatchAnalyzer(ScopusJournalAnalyzer())
     results = []
     
-    for i, url in enumerate(urls, 1):
-        print(f"\nАнализирам {i}/{len(urls)}: {url}")
+    print(f"\nАнализирам {len(urls)} списания паралелно...")
+    
+    # Резултатите пристигат по реда на завършване
+    for i, outcome in enumerate(batch.run(urls), 1):
+        url = outcome['url']
+        if 'error' in outcome:
+            print(f"✗ {i}/{len(urls)} {url} - Грешка: {outcome['error']}")
+            continue
         
-        try:
-            journal_data = analyzer.extract_journal_data(url)
-            if 'error' not in journal_data:
-                readiness_analysis = analyzer.calculate_scopus_readiness(journal_data)
-                results.append({
-                    'url': url,
-                    'title': journal_data.get('title', 'Не е намерено'),
-                    'score': readiness_analysis['total_score'],
-                    'level': readiness_analysis['readiness_level']
-                })
-                print(f"✓ Завършен - Оценка: {readiness_analysis['total_score']:.1f}%")
-            else:
-                print(f"✗ Грешка: {journal_data['error']}")
-        except Exception as e:
-            print(f"✗ Грешка: {e}")
+        journal_data = outcome['journal_data']
+        readiness_analysis = outcome['readiness_analysis']
+        results.append({
+            'url': url,
+            'title': journal_data.get('title', 'Не е намерено'),
+            'score': readiness_analysis['total_score'],
+            'level': readiness_analysis['readiness_level']
+        })
+        print(f"✓ {i}/{len(urls)} {url} - Оценка: {readiness_analysis['total_score']:.1f}% ({outcome['elapsed']:.1f}s)")
     
     # Показваме обобщените резултати
     if results:
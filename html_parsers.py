@@ -0,0 +1,187 @@
+"""
+HTML парсери за извличането: selectolax (lexbor), lxml или вградения html.parser
+"""
+
+import logging
+from typing import List, Optional, Union
+
+from bs4 import BeautifulSoup, UnicodeDammit
+
+from config import Config
+from page_features import (
+    PageFeatures, collect_features, TITLE_SELECTORS, DESCRIPTION_SELECTORS,
+    EDITORIAL_SELECTORS, MEMBER_PATTERN, BOARD_PAGE_NAME_PATTERN, MEMBER_TAGS, CHROME_TAGS,
+    keyword_parents
+)
+
+logger = logging.getLogger(__name__)
+
+HAVE_SELECTOLAX = False
+try:
+    from selectolax.lexbor import LexborHTMLParser
+    HAVE_SELECTOLAX = True
+except ImportError:
+    pass
+
+HAVE_LXML = False
+try:
+    import lxml  # noqa: F401 - нужен е само като builder за BeautifulSoup
+    HAVE_LXML = True
+except ImportError:
+    pass
+
+# По ред на предпочитание при HTML_PARSER=auto
+PARSER_BACKENDS = ('selectolax', 'lxml', 'html.parser')
+
+# Текстът в тези тагове не е част от get_text() на страницата (както в bs4)
+STRING_CONTAINERS = frozenset(['script', 'style', 'template', 'rt', 'rp'])
+BOARD_PAGE_SELECTOR = 'li, p, td, h3, h4'
+
+
+def available_backends() -> List[str]:
+    """Инсталираните парсери по ред на предпочитание"""
+    installed = {'selectolax': HAVE_SELECTOLAX, 'lxml': HAVE_LXML, 'html.parser': True}
+    return [name for name in PARSER_BACKENDS if installed[name]]
+
+
+def resolve_backend(name: str = None) -> str:
+    """Парсерът за името от конфигурацията; при липсващ - html.parser"""
+    name = (name or Config.HTML_PARSER or 'auto').lower()
+    available = available_backends()
+    if name == 'auto':
+        return available[0]
+    if name not in available:
+        logger.warning(f"HTML парсерът '{name}' не е наличен - използвам html.parser")
+        return 'html.parser'
+    return name
+
+
+def parse_features(content: Union[bytes, str], backend: str = None) -> PageFeatures:
+    """Парсва страницата с избрания парсер и събира PageFeatures"""
+    backend = backend or resolve_backend()
+    if backend == 'selectolax':
+        return collect_lexbor_features(LexborHTMLParser(_decode(content)))
+    return collect_features(BeautifulSoup(content, backend))
+
+
+def _decode(content: Union[bytes, str]) -> str:
+    """Байтове към текст; кодирането се разпознава като в BeautifulSoup"""
+    if isinstance(content, str):
+        return content
+    try:
+        return content.decode('utf-8')
+    except UnicodeDecodeError:
+        return UnicodeDammit(content, is_html=True).unicode_markup or content.decode('utf-8', 'replace')
+
+
+def _lexbor_string(node) -> Optional[str]:
+    """Аналог на Tag.string: текстът на единственото (вложено) дете"""
+    while True:
+        child = node.child
+        if child is None or child.next is not None:
+            return None
+        if child.tag == '-text':
+            return child.text_content
+        if child.tag == '-comment':
+            return child.comment_content
+        node = child
+
+
+def _lexbor_text(node, separator: str = '', strip: bool = False) -> str:
+    """Аналог на Tag.get_text() - без коментарите и съдържанието на <script>/<style>"""
+    in_container = node.tag in STRING_CONTAINERS
+    parts = []
+    for child in node.traverse(include_text=True):
+        if child.tag != '-text' or (child.parent.tag in STRING_CONTAINERS) != in_container:
+            continue
+        text = child.text_content
+        if strip:
+            text = text.strip()
+            if not text:
+                continue
+        parts.append(text)
+    return separator.join(parts)
+
+
+def _in_chrome(node) -> bool:
+    parent = node.parent
+    while parent is not None:
+        if parent.tag in CHROME_TAGS:
+            return True
+        parent = parent.parent
+    return False
+
+
+def collect_lexbor_features(tree) -> PageFeatures:
+    """PageFeatures от lexbor дърво - същата семантика като collect_features.
+
+    Селекторите се изпълняват от CSS машината на lexbor, а в Python се
+    обхождат само текстовите възли (за текста и peer review ключовите думи).
+    """
+    features = PageFeatures()
+    root = tree.root
+    if root is None:
+        return features
+
+    text_parts = []
+    strings = []
+    string_nodes = []
+    for node in root.traverse(include_text=True):
+        tag = node.tag
+        if tag == '-text':
+            value = node.text_content
+            if node.parent.tag not in STRING_CONTAINERS:
+                text_parts.append(value)
+        elif tag == '-comment':
+            value = node.comment_content or ''
+        else:
+            continue
+        strings.append(value)
+        string_nodes.append(node)
+    features.text = ''.join(text_parts)
+    peer_review_parents = keyword_parents(strings, lambda index: string_nodes[index].parent)
+
+    for selector in TITLE_SELECTORS:
+        element = tree.css_first(selector)
+        if element is not None:
+            features.title_candidates[selector] = _lexbor_text(element, strip=True)
+    for selector in DESCRIPTION_SELECTORS:
+        element = tree.css_first(selector)
+        if element is not None:
+            if element.tag == 'meta':
+                features.description_candidates[selector] = element.attributes.get('content') or ''
+            else:
+                features.description_candidates[selector] = _lexbor_text(element, strip=True)
+
+    for selector in EDITORIAL_SELECTORS:
+        section = tree.css_first(selector)
+        if section is None:
+            continue
+        members = []
+        for node in section.traverse():
+            if node.tag in MEMBER_TAGS and node.mem_id != section.mem_id:
+                string = _lexbor_string(node)
+                if string is not None and MEMBER_PATTERN.search(string):
+                    members.append(_lexbor_text(node, strip=True))
+        features.board_sections[selector] = members
+
+    parent_texts = {}
+    for keyword, parents in peer_review_parents.items():
+        for parent in parents:
+            if parent.mem_id not in parent_texts:
+                parent_texts[parent.mem_id] = _lexbor_text(parent, strip=True)
+            features.peer_review_snippets[keyword].append(parent_texts[parent.mem_id])
+
+    # Контейнерът е първият <main>, иначе първият <article>, иначе целият документ
+    container = tree.css_first('main') or tree.css_first('article') or root
+    for node in container.css(BOARD_PAGE_SELECTOR):
+        string = _lexbor_string(node)
+        if string is not None and BOARD_PAGE_NAME_PATTERN.search(string) and not _in_chrome(node):
+            features.board_page_members.append(_lexbor_text(node, strip=True))
+
+    for link in root.css('a[href]'):
+        href = link.attributes.get('href')
+        if href:
+            features.links.append((href, ' '.join(_lexbor_text(link, ' ', strip=True).lower().split())))
+
+    return features
@@ -0,0 +1,168 @@
+"""
+Персистентен HTTP кеш с условни заявки (ETag / Last-Modified)
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Заглавия, които пазим заедно с тялото на отговора
+STORED_HEADERS = ('etag', 'last-modified', 'cache-control', 'expires', 'date', 'age', 'content-type')
+
+
+def _parse_http_date(value: str) -> Optional[float]:
+    """Превръща HTTP дата в Unix timestamp"""
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+def _cache_control(headers: Dict) -> Dict[str, Optional[str]]:
+    """Разбива Cache-Control на директиви"""
+    directives = {}
+    for part in headers.get('cache-control', '').split(','):
+        name, _, value = part.strip().partition('=')
+        if name:
+            directives[name.lower()] = value.strip('"') or None
+    return directives
+
+
+class CacheEntry:
+    """Запис в кеша: валидатори, заглавия и тяло"""
+
+    def __init__(self, url: str, headers: Dict, body: bytes, stored_at: float, fresh_until: float):
+        self.url = url
+        self.headers = headers
+        self.body = body
+        self.stored_at = stored_at
+        self.fresh_until = fresh_until
+
+    def is_fresh(self, now: float = None) -> bool:
+        return (now or time.time()) < self.fresh_until
+
+    def conditional_headers(self) -> Dict[str, str]:
+        """If-None-Match / If-Modified-Since за повторна валидация"""
+        headers = {}
+        if self.headers.get('etag'):
+            headers['If-None-Match'] = self.headers['etag']
+        if self.headers.get('last-modified'):
+            headers['If-Modified-Since'] = self.headers['last-modified']
+        return headers
+
+
+class HTTPCache:
+    """Файлов кеш за HTML страници, споделен между worker процесите.
+
+    Всеки URL има два файла (<sha256>.json с метаданни и <sha256>.body), които
+    се записват атомарно чрез os.replace.
+    """
+
+    def __init__(self, cache_dir: str = None, default_ttl: float = None):
+        self.cache_dir = cache_dir or Config.HTTP_CACHE_DIR
+        self.default_ttl = Config.HTTP_CACHE_DEFAULT_TTL if default_ttl is None else default_ttl
+
+    def _paths(self, url: str):
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        base = os.path.join(self.cache_dir, key[:2], key)
+        return base + '.json', base + '.body'
+
+    def freshness_lifetime(self, headers: Dict, now: float) -> Optional[float]:
+        """Колко секунди отговорът е пресен; None ако не трябва да се пази"""
+        directives = _cache_control(headers)
+        if 'no-store' in directives:
+            return None
+        if 'no-cache' in directives:
+            return 0
+
+        if directives.get('max-age') is not None:
+            try:
+                age = float(headers.get('age') or 0)
+                return max(float(directives['max-age']) - age, 0)
+            except ValueError:
+                return 0
+
+        expires = _parse_http_date(headers.get('expires', ''))
+        if expires is not None:
+            date = _parse_http_date(headers.get('date', '')) or now
+            return max(expires - date, 0)
+
+        return self.default_ttl
+
+    def get(self, url: str) -> Optional[CacheEntry]:
+        """Зарежда запис от диска"""
+        meta_path, body_path = self._paths(url)
+        try:
+            with open(meta_path, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            with open(body_path, 'rb') as f:
+                body = f.read()
+        except (OSError, ValueError):
+            return None
+
+        if meta.get('url') != url:
+            return None
+        return CacheEntry(url, meta['headers'], body, meta['stored_at'], meta['fresh_until'])
+
+    def store(self, url: str, headers, body: bytes) -> Optional[CacheEntry]:
+        """Запазва успешен (200) отговор, ако заглавията го позволяват"""
+        headers = {name: headers[name] for name in STORED_HEADERS if headers.get(name)}
+        now = time.time()
+        lifetime = self.freshness_lifetime(headers, now)
+        if lifetime is None:
+            return None
+        # Без свежест и без валидатори записът е безполезен
+        if not lifetime and not ('etag' in headers or 'last-modified' in headers):
+            return None
+
+        entry = CacheEntry(url, headers, body, now, now + lifetime)
+        try:
+            self._write(entry, write_body=True)
+        except OSError as e:
+            logger.warning(f"Неуспешен запис в HTTP кеша за {url}: {e}")
+        return entry
+
+    def refresh(self, entry: CacheEntry, headers) -> CacheEntry:
+        """Обновява записа след 304 Not Modified"""
+        merged = dict(entry.headers)
+        merged.update({name: headers[name] for name in STORED_HEADERS if headers.get(name)})
+        now = time.time()
+        lifetime = self.freshness_lifetime(merged, now)
+
+        entry.headers = merged
+        entry.stored_at = now
+        entry.fresh_until = now + (lifetime or 0)
+        try:
+            self._write(entry, write_body=False)
+        except OSError as e:
+            logger.warning(f"Неуспешно обновяване на HTTP кеша за {entry.url}: {e}")
+        return entry
+
+    def _write(self, entry: CacheEntry, write_body: bool):
+        meta_path, body_path = self._paths(entry.url)
+        os.makedirs(os.path.dirname(meta_path), exist_ok=True)
+        suffix = f'.{os.getpid()}.{threading.get_ident()}.tmp'
+
+        if write_body:
+            with open(body_path + suffix, 'wb') as f:
+                f.write(entry.body)
+            os.replace(body_path + suffix, body_path)
+
+        meta = {
+            'url': entry.url,
+            'headers': entry.headers,
+            'stored_at': entry.stored_at,
+            'fresh_until': entry.fresh_until
+        }
+        with open(meta_path + suffix, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(meta_path + suffix, meta_path)
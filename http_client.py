@@ -0,0 +1,118 @@
+"""
+Споделен HTTP транспорт с connection pooling и keep-alive
+"""
+
+import os
+import logging
+import threading
+from typing import Dict, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+
+
+class FetchedPage:
+    """Изтеглена HTML страница и информация как е получена"""
+
+    def __init__(self, url: str, content: bytes, status: int = 200,
+                 headers: Dict = None, cache_status: str = None, truncated: bool = False,
+                 rendered: bool = False):
+        self.url = url
+        self.content = content
+        self.status = status
+        self.headers = headers or {}
+        # None (без кеш), 'miss', 'fresh' (без заявка) или 'revalidated' (304)
+        self.cache_status = cache_status
+        # True ако изтеглянето е прекъснато заради лимит на размера/времето
+        self.truncated = truncated
+        # True ако HTML-ът е получен от браузър (след изпълнен JavaScript)
+        self.rendered = rendered
+
+    def info(self) -> Dict:
+        """Кратко резюме за journal_data"""
+        return {
+            'status': self.status,
+            'cache': self.cache_status,
+            'bytes': len(self.content),
+            'truncated': self.truncated,
+            'rendered': self.rendered
+        }
+
+
+class HTTPClient:
+    """Thread-safe HTTP клиент с отделен connection pool за всеки хост"""
+
+    def __init__(self, pool_connections: int = None, pool_maxsize: int = None,
+                 pool_block: bool = None, connect_timeout: float = None,
+                 read_timeout: float = None, headers: Dict = None):
+        self.pool_connections = pool_connections or Config.HTTP_POOL_CONNECTIONS
+        self.pool_maxsize = pool_maxsize or Config.HTTP_POOL_MAXSIZE
+        self.pool_block = Config.HTTP_POOL_BLOCK if pool_block is None else pool_block
+        self.connect_timeout = connect_timeout or Config.HTTP_CONNECT_TIMEOUT
+        self.read_timeout = read_timeout or Config.HTTP_READ_TIMEOUT
+        self.session = self._build_session(headers)
+
+    def _build_session(self, headers: Optional[Dict]) -> requests.Session:
+        """Създава сесия, чийто adapter пази keep-alive връзки по хост"""
+        session = requests.Session()
+        # urllib3 PoolManager държи по един pool за хост (pool_connections)
+        # и до pool_maxsize отворени връзки във всеки от тях
+        adapter = HTTPAdapter(
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+            pool_block=self.pool_block
+        )
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        if headers:
+            session.headers.update(headers)
+        return session
+
+    @property
+    def timeout(self) -> Tuple[float, float]:
+        """(connect, read) timeout по подразбиране"""
+        return (self.connect_timeout, self.read_timeout)
+
+    def request(self, method: str, url: str, **kwargs) -> requests.Response:
+        """Изпраща заявка през споделените връзки"""
+        kwargs.setdefault('timeout', self.timeout)
+        return self.session.request(method, url, **kwargs)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """GET заявка"""
+        return self.request('GET', url, **kwargs)
+
+    def close(self):
+        """Затваря всички отворени връзки"""
+        self.session.close()
+
+
+_default_client = None
+_default_client_pid = None
+_default_client_lock = threading.Lock()
+
+
+def get_http_client() -> HTTPClient:
+    """Връща споделения за процеса HTTP клиент.
+
+    Клиентът се създава отново след fork (напр. gunicorn --preload), за да
+    не се делят сокети между worker процесите.
+    """
+    global _default_client, _default_client_pid
+
+    pid = os.getpid()
+    if _default_client is not None and _default_client_pid == pid:
+        return _default_client
+
+    with _default_client_lock:
+        if _default_client is None or _default_client_pid != pid:
+            _default_client = HTTPClient()
+            _default_client_pid = pid
+            logger.debug(f"Създаден HTTP клиент за процес {pid}")
+        return _default_client
@@ -0,0 +1,263 @@
+"""
+Фонови задачи за анализ: POST /jobs връща id веднага, GET /jobs/<id> - състоянието,
+GET /jobs/<id>/events - етапите като Server-Sent Events
+"""
+
+import json
+import time
+import uuid
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+from config import Config
+from sqlite_store import SQLiteStore, data_path
+
+logger = logging.getLogger(__name__)
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'error'
+FINISHED = (DONE, FAILED)
+
+# progress(stage, частичен резултат или None)
+ProgressCallback = Callable[[str, Optional[Dict]], None]
+# describe(stage, частичен резултат или None) -> допълнителни полета на събитието
+EventDescriber = Callable[[str, Optional[Dict]], Dict]
+
+
+class JobQueueFull(Exception):
+    """Опашката със задачи на този worker е пълна"""
+
+
+class JobStore(SQLiteStore):
+    """Задачите и резултатите им - общи за worker-ите, за да работи GET от всеки"""
+
+    SCHEMA = '''
+        CREATE TABLE IF NOT EXISTS jobs (
+            id TEXT PRIMARY KEY,
+            url TEXT NOT NULL,
+            status TEXT NOT NULL,
+            stage TEXT,
+            result TEXT,
+            partial INTEGER NOT NULL DEFAULT 0,
+            error TEXT,
+            created_at REAL NOT NULL,
+            updated_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_jobs_updated ON jobs (updated_at);
+        CREATE TABLE IF NOT EXISTS job_events (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            job_id TEXT NOT NULL,
+            stage TEXT NOT NULL,
+            data TEXT NOT NULL,
+            created_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_job_events_job ON job_events (job_id, id);
+    '''
+
+    def __init__(self, path: str = None):
+        super().__init__(path or data_path(Config.JOB_DB))
+
+    def create(self, job_id: str, url: str):
+        now = time.time()
+        with self.transaction() as conn:
+            conn.execute(
+                'INSERT INTO jobs (id, url, status, created_at, updated_at) VALUES (?, ?, ?, ?, ?)',
+                (job_id, url, QUEUED, now, now)
+            )
+
+    def update(self, job_id: str, status: str = None, stage: str = None, result: Dict = None,
+               partial: bool = False, error: str = None):
+        """Обновява само подадените полета"""
+        fields = {'updated_at': time.time()}
+        if status is not None:
+            fields['status'] = status
+        if stage is not None:
+            fields['stage'] = stage
+        if result is not None:
+            fields['result'] = json.dumps(result, ensure_ascii=False)
+            fields['partial'] = int(partial)
+        if error is not None:
+            fields['error'] = error
+        assignments = ', '.join(f'{name} = ?' for name in fields)
+        with self.transaction() as conn:
+            conn.execute(f'UPDATE jobs SET {assignments} WHERE id = ?', (*fields.values(), job_id))
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        with self.transaction() as conn:
+            row = conn.execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        if row is None:
+            return None
+        job = {
+            'job_id': row['id'],
+            'url': row['url'],
+            'status': row['status'],
+            'stage': row['stage'],
+            'created_at': row['created_at'],
+            'updated_at': row['updated_at'],
+        }
+        if row['result'] is not None:
+            job['result'] = json.loads(row['result'])
+            job['partial'] = bool(row['partial'])
+        if row['error'] is not None:
+            job['error'] = row['error']
+        return job
+
+    def add_event(self, job_id: str, stage: str, data: Dict = None):
+        """Добавя етап към историята на задачата (за GET /jobs/<id>/events)"""
+        with self.transaction() as conn:
+            conn.execute(
+                'INSERT INTO job_events (job_id, stage, data, created_at) VALUES (?, ?, ?, ?)',
+                (job_id, stage, json.dumps(data or {}, ensure_ascii=False), time.time())
+            )
+
+    def events(self, job_id: str, after: int = 0) -> List[Dict]:
+        """Етапите с id след after, по реда на записване"""
+        with self.transaction() as conn:
+            rows = conn.execute(
+                'SELECT id, stage, data FROM job_events WHERE job_id = ? AND id > ? ORDER BY id',
+                (job_id, after)
+            ).fetchall()
+        return [{'id': row['id'], 'stage': row['stage'], **json.loads(row['data'])} for row in rows]
+
+    def purge(self, older_than: float):
+        """Изтрива задачите, необновявани повече от older_than секунди"""
+        with self.transaction() as conn:
+            conn.execute('DELETE FROM jobs WHERE updated_at < ?', (time.time() - older_than,))
+            conn.execute('DELETE FROM job_events WHERE job_id NOT IN (SELECT id FROM jobs)')
+
+
+class JobRunner:
+    """Изпълнява задачите на ограничен брой нишки в текущия worker.
+
+    execute(url, progress) връща резултата; резултат с ключ 'error' се
+    записва като неуспешна задача. Междинните етапи и частичните данни
+    идват през progress и се виждат веднага в GET /jobs/<id> във формата на
+    крайния резултат ({'journal_data', 'readiness_analysis': None}). Всеки етап
+    се записва и като събитие с времената си (elapsed - от началото на
+    задачата, duration - от предишния етап) и полетата от describe.
+
+    Ако крайното състояние не може да се запише, то се пази в паметта на
+    worker-а и get/wait го връщат вместо 'running' от хранилището.
+    """
+
+    def __init__(self, execute: Callable[[str, ProgressCallback], Dict], store: JobStore = None,
+                 max_workers: int = None, queue_limit: int = None, describe: EventDescriber = None):
+        self.execute = execute
+        self.store = store or JobStore()
+        self.describe = describe
+        self.max_workers = max_workers or Config.JOB_MAX_WORKERS
+        self.queue_limit = queue_limit or Config.JOB_QUEUE_LIMIT
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='analysis-job')
+        self._futures: Dict[str, Future] = {}
+        # job_id -> (крайните полета, незаписани в хранилището; кога)
+        self._unrecorded: Dict[str, Tuple[Dict, float]] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, url: str) -> str:
+        """Записва задачата и я поставя в опашката; връща id-то ѝ"""
+        with self._lock:
+            self._futures = {job_id: f for job_id, f in self._futures.items() if not f.done()}
+            expired = time.time() - Config.JOB_RETENTION
+            self._unrecorded = {job_id: entry for job_id, entry in self._unrecorded.items() if entry[1] > expired}
+            if len(self._futures) >= self.queue_limit:
+                raise JobQueueFull("Твърде много анализи в момента - опитайте отново след малко")
+            job_id = uuid.uuid4().hex
+            self.store.create(job_id, url)
+            self._futures[job_id] = self._executor.submit(self._run, job_id, url)
+
+        try:
+            self.store.purge(Config.JOB_RETENTION)
+        except Exception as e:
+            logger.warning(f"Неуспешно изчистване на старите задачи: {e}")
+        return job_id
+
+    def _run(self, job_id: str, url: str):
+        started = time.monotonic()
+        last_event = [started]
+
+        def record(stage: str, data: Dict = None):
+            now = time.monotonic()
+            event = {'elapsed': round(now - started, 3), 'duration': round(now - last_event[0], 3)}
+            event.update(data or {})
+            last_event[0] = now
+            try:
+                self.store.add_event(job_id, stage, event)
+            except Exception as e:
+                logger.warning(f"Неуспешен запис на етап '{stage}' на задача {job_id}: {e}")
+
+        def progress(stage: str, journal_data: Optional[Dict] = None):
+            partial_result = None
+            if journal_data is not None:
+                partial_result = {'journal_data': journal_data, 'readiness_analysis': None}
+            try:
+                self.store.update(job_id, stage=stage, result=partial_result, partial=True)
+            except Exception as e:
+                logger.warning(f"Неуспешен запис на прогреса на задача {job_id}: {e}")
+            details = None
+            if self.describe is not None:
+                try:
+                    details = self.describe(stage, journal_data)
+                except Exception as e:
+                    logger.warning(f"Грешка при описание на етап '{stage}' на задача {job_id}: {e}")
+            record(stage, details)
+
+        try:
+            # И грешка при записа на статуса завършва задачата като неуспешна
+            self.store.update(job_id, status=RUNNING)
+            result = self.execute(url, progress)
+        except Exception as e:
+            logger.error(f"Грешка в задача {job_id} ({url}): {e}")
+            result = {'error': str(e)}
+
+        if 'error' in result:
+            self._finish(job_id, status=FAILED, error=str(result['error']))
+            record(FAILED, {'error': str(result['error'])})
+        else:
+            self._finish(job_id, status=DONE, stage=DONE, result=result, partial=False)
+            record(DONE)
+
+    def _finish(self, job_id: str, **fields):
+        """Записва крайното състояние; при грешка го пази в паметта (вж. get)"""
+        try:
+            self.store.update(job_id, **fields)
+        except Exception as e:
+            logger.error(f"Неуспешен запис на крайното състояние на задача {job_id}: {e}")
+            with self._lock:
+                self._unrecorded[job_id] = (fields, time.time())
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        """Състоянието от хранилището; незаписаното крайно състояние е с предимство"""
+        with self._lock:
+            entry = self._unrecorded.get(job_id)
+        if entry is None:
+            return self.store.get(job_id)
+
+        try:
+            job = self.store.get(job_id)
+        except Exception as e:
+            logger.warning(f"Недостъпно хранилище на задачите: {e}")
+            job = None
+        fields = entry[0]
+        job = dict(job or {'job_id': job_id}, status=fields['status'])
+        for name in ('stage', 'error', 'result', 'partial'):
+            if name in fields:
+                job[name] = fields[name]
+        return job
+
+    def wait(self, job_id: str, timeout: float) -> Optional[Dict]:
+        """Изчаква задача от този worker до timeout секунди; връща състоянието ѝ"""
+        with self._lock:
+            future = self._futures.get(job_id)
+        if future is not None:
+            try:
+                future.result(timeout)
+            except Exception:
+                pass
+        return self.get(job_id)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,79 @@
+"""
+Търсене на речници от ключови думи с общ резултат за извличането и оценяването
+"""
+
+from typing import Dict, Iterable, List, Optional
+
+
+class KeywordHits:
+    """Резултатът от едно сканиране: позициите на всяка намерена ключова дума"""
+
+    def __init__(self, offsets: Dict[str, List[int]]):
+        self.offsets = offsets
+
+    def __contains__(self, keyword: str) -> bool:
+        return keyword in self.offsets
+
+    def count(self, keyword: str) -> int:
+        """Броят съвпадения (най-много 1 при scan(..., positions=False))"""
+        return len(self.offsets.get(keyword, ()))
+
+    def found(self, keywords: Iterable[str]) -> List[str]:
+        """Намерените думи в реда на keywords"""
+        return [keyword for keyword in keywords if keyword in self.offsets]
+
+    def any(self, keywords: Iterable[str]) -> bool:
+        return any(keyword in self.offsets for keyword in keywords)
+
+    def first(self, keywords: Iterable[str]) -> Optional[str]:
+        """Първата намерена дума по реда в keywords (не по позиция в текста)"""
+        for keyword in keywords:
+            if keyword in self.offsets:
+                return keyword
+        return None
+
+
+class KeywordMatcher:
+    """Речник от ключови думи, подготвен веднъж; scan() търси думите една по една в текста.
+
+    Семантиката е същата като `keyword in text.lower()` за всяка дума, а
+    припокриващите се съвпадения ('annual' в 'biannual', 'review' в
+    'peer review') също се отчитат. Позициите са в text.lower().
+
+    Всяка дума се търси с отделен цикъл от str.find (C търсене по подниз) -
+    текстът се обхожда по веднъж за дума, а не с един общ проход. При речниците
+    в приложението (до ~20 думи) това е по-бързо и от общ регулярен израз, и
+    от Aho-Corasick на Python - вж. benchmark_keywords.py.
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords = tuple(dict.fromkeys(keyword.lower() for keyword in keywords if keyword))
+
+    def scan(self, text: str, lowered: bool = False, positions: bool = True) -> KeywordHits:
+        """Позициите на всички ключови думи в текста.
+
+        lowered=True, ако текстът вече е с малки букви (напр. PageFeatures.text_lower).
+        positions=False, ако е нужно само дали думите ги има: търсенето на всяка
+        дума спира при първото съвпадение.
+        """
+        offsets: Dict[str, List[int]] = {}
+        if not text:
+            return KeywordHits(offsets)
+        if not lowered:
+            text = text.lower()
+
+        find = text.find
+        for keyword in self.keywords:
+            position = find(keyword)
+            if position == -1:
+                continue
+            if not positions:
+                offsets[keyword] = [position]
+                continue
+            found = []
+            while position != -1:
+                found.append(position)
+                # От следващия символ, за да се броят и припокриващите се съвпадения
+                position = find(keyword, position + 1)
+            offsets[keyword] = found
+        return KeywordHits(offsets)
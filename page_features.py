@@ -0,0 +1,241 @@
+"""
+Еднократно обхождане на HTML документа, което събира всички сигнали за извличане
+"""
+
+import re
+from bisect import bisect_right
+from itertools import accumulate
+from typing import Callable, Dict, List, Optional, Tuple
+
+from bs4 import BeautifulSoup
+from bs4.element import NavigableString
+
+from keyword_matcher import KeywordHits, KeywordMatcher
+
+TITLE_SELECTORS = ['h1', '.journal-title', '.page-title', 'title']
+DESCRIPTION_SELECTORS = ['.description', '.about', '.journal-description', 'meta[name="description"]']
+EDITORIAL_SELECTORS = [
+    '.editorial-board', '.editors', '.editorial-team',
+    '.advisory-board', '.review-board'
+]
+PEER_REVIEW_KEYWORDS = ['peer review', 'referee', 'review process', 'double blind']
+FREQUENCY_KEYWORDS = ['monthly', 'quarterly', 'biannual', 'annual', 'weekly', 'daily']
+OPEN_ACCESS_INDICATORS = ['open access', 'creative commons', 'cc by', 'free access']
+
+PEER_REVIEW_MATCHER = KeywordMatcher(PEER_REVIEW_KEYWORDS)
+# Всички речници, които се търсят в текста на страницата
+PAGE_TEXT_MATCHER = KeywordMatcher(FREQUENCY_KEYWORDS + OPEN_ACCESS_INDICATORS)
+
+MEMBER_PATTERN = re.compile(r'[A-Z][a-z]+ [A-Z][a-z]+')
+# На страница, посветена на съвета, приемаме и кирилски имена
+BOARD_PAGE_NAME_PATTERN = re.compile(r'[A-ZА-Я][a-zа-я]+ [A-ZА-Я][a-zа-я]+')
+
+MEMBER_TAGS = frozenset(['li', 'p', 'div'])
+BOARD_PAGE_TAGS = frozenset(['li', 'p', 'td', 'h3', 'h4'])
+CHROME_TAGS = frozenset(['nav', 'header', 'footer'])
+
+
+def _selector_keys(name: str, classes, attrs: Dict) -> List[str]:
+    """Кои от простите селектори (таг, .клас, meta[name]) съвпадат с елемента"""
+    keys = [name]
+    if classes:
+        if isinstance(classes, str):
+            classes = classes.split()
+        keys.extend('.' + cls for cls in classes)
+    if name == 'meta' and attrs.get('name') == 'description':
+        keys.append('meta[name="description"]')
+    return keys
+
+
+class PageFeatures:
+    """Суровите сигнали от една страница, независими от HTML парсера.
+
+    - title_candidates / description_candidates: текстът на първия елемент за
+      всеки селектор (ако има такъв)
+    - board_sections: членовете, намерени в първата секция за всеки селектор
+    - peer_review_snippets: текстовете на родителите на всеки низ с ключова дума
+    - board_page_members: имена за страница, посветена изцяло на съвета
+    - links: (href, текст) за всяка връзка
+    """
+
+    def __init__(self):
+        self.title_candidates: Dict[str, str] = {}
+        self.description_candidates: Dict[str, str] = {}
+        self.board_sections: Dict[str, List[str]] = {}
+        self.peer_review_snippets: Dict[str, List[str]] = {kw: [] for kw in PEER_REVIEW_KEYWORDS}
+        self.board_page_members: List[str] = []
+        self.links: List[Tuple[str, str]] = []
+        self.text = ''
+        self._text_lower: Optional[str] = None
+        self._keyword_hits: Optional[KeywordHits] = None
+
+    @property
+    def text_lower(self) -> str:
+        if self._text_lower is None:
+            self._text_lower = self.text.lower()
+        return self._text_lower
+
+    @property
+    def keyword_hits(self) -> KeywordHits:
+        """PAGE_TEXT_MATCHER върху текста - сканира се веднъж за всички извличания"""
+        if self._keyword_hits is None:
+            self._keyword_hits = PAGE_TEXT_MATCHER.scan(self.text_lower, lowered=True, positions=False)
+        return self._keyword_hits
+
+
+def keyword_parents(strings: List[str], parent_of: Callable[[int], object]) -> Dict[str, List]:
+    """Родителите на низовете с peer review ключова дума (като find_all(string=...)).
+
+    Низовете се сканират заедно, разделени с нулев символ, а позицията на всяко
+    съвпадение се съпоставя с низа, в който е.
+    """
+    joined = '\x00'.join(strings)
+    text = joined.lower()
+    if len(text) == len(joined):
+        lengths = map(len, strings)
+    else:
+        # lower() е променил дължината (напр. 'İ') - позициите се смятат по низ
+        lowered = [string.lower() for string in strings]
+        text = '\x00'.join(lowered)
+        lengths = map(len, lowered)
+    starts = list(accumulate((length + 1 for length in lengths), initial=0))
+
+    result = {keyword: [] for keyword in PEER_REVIEW_KEYWORDS}
+    hits = PEER_REVIEW_MATCHER.scan(text, lowered=True)
+    for keyword in PEER_REVIEW_KEYWORDS:
+        last = -1
+        for offset in hits.offsets.get(keyword, ()):
+            index = bisect_right(starts, offset) - 1
+            if index != last:
+                parent = parent_of(index)
+                if parent is not None:
+                    result[keyword].append(parent)
+            last = index
+    return result
+
+
+def collect_features(soup: BeautifulSoup) -> PageFeatures:
+    """Събира PageFeatures с едно обхождане на дървото.
+
+    Резултатът е еквивалентен на select_one() по всеки селектор,
+    soup.get_text(), find_all(string=...) по ключовите думи и find_all()
+    на членовете в секциите, но документът се обхожда само веднъж.
+    """
+    features = PageFeatures()
+
+    text_types = soup.interesting_string_types
+    if isinstance(text_types, type):
+        text_types = (text_types,)
+
+    wanted = set(TITLE_SELECTORS) | set(DESCRIPTION_SELECTORS) | set(EDITORIAL_SELECTORS)
+    editorial = set(EDITORIAL_SELECTORS)
+    first_match = {}
+    active_sections: List[str] = []
+    section_members: Dict[str, list] = {}
+    all_strings = []
+    text_parts = []
+    link_tags = []
+
+    # Състояние за страница на редакционния съвет
+    chrome_depth = 0
+    containers = {}
+    in_container = {'main': False, 'article': False}
+    board_candidates = []
+
+    stack = [(child, None) for child in reversed(soup.contents)]
+    while stack:
+        node, leaving = stack.pop()
+
+        if leaving is not None:
+            for action in leaving:
+                if action == 'chrome':
+                    chrome_depth -= 1
+                elif action in in_container:
+                    in_container[action] = False
+                else:
+                    active_sections.remove(action)
+            continue
+
+        if isinstance(node, NavigableString):
+            if text_types is None or type(node) in text_types:
+                text_parts.append(node)
+            all_strings.append(node)
+            continue
+
+        name = node.name
+        exit_actions = []
+
+        # Членове в активните секции на съвета (самата секция не се брои)
+        if name in MEMBER_TAGS and active_sections:
+            string = node.string
+            if string is not None and MEMBER_PATTERN.search(string):
+                for selector in active_sections:
+                    section_members[selector].append(node)
+
+        if name in BOARD_PAGE_TAGS and not chrome_depth:
+            string = node.string
+            if string is not None and BOARD_PAGE_NAME_PATTERN.search(string):
+                board_candidates.append((node, in_container['main'], in_container['article']))
+
+        for key in _selector_keys(name, node.get('class'), node.attrs):
+            if key in wanted and key not in first_match:
+                first_match[key] = node
+                if key in editorial:
+                    section_members[key] = []
+                    active_sections.append(key)
+                    exit_actions.append(key)
+
+        if name in CHROME_TAGS:
+            chrome_depth += 1
+            exit_actions.append('chrome')
+        elif name in in_container and name not in containers:
+            containers[name] = node
+            in_container[name] = True
+            exit_actions.append(name)
+        elif name == 'a' and node.get('href'):
+            link_tags.append(node)
+
+        if exit_actions:
+            stack.append((node, exit_actions))
+        stack.extend((child, None) for child in reversed(node.contents))
+
+    features.text = ''.join(text_parts)
+
+    # Текстовете се изчисляват само за намерените елементи
+    for selector in TITLE_SELECTORS:
+        if selector in first_match:
+            features.title_candidates[selector] = first_match[selector].get_text(strip=True)
+    for selector in DESCRIPTION_SELECTORS:
+        if selector in first_match:
+            element = first_match[selector]
+            if element.name == 'meta':
+                features.description_candidates[selector] = element.get('content', '')
+            else:
+                features.description_candidates[selector] = element.get_text(strip=True)
+    for selector in EDITORIAL_SELECTORS:
+        if selector in section_members:
+            features.board_sections[selector] = [m.get_text(strip=True) for m in section_members[selector]]
+
+    parent_texts = {}
+    peer_review_parents = keyword_parents(all_strings, lambda index: all_strings[index].parent)
+    for keyword, parents in peer_review_parents.items():
+        for parent in parents:
+            if id(parent) not in parent_texts:
+                parent_texts[id(parent)] = parent.get_text(strip=True)
+            features.peer_review_snippets[keyword].append(parent_texts[id(parent)])
+
+    # Контейнерът е първият <main>, иначе първият <article>, иначе целият документ
+    if 'main' in containers:
+        chosen = [node for node, in_main, _ in board_candidates if in_main]
+    elif 'article' in containers:
+        chosen = [node for node, _, in_article in board_candidates if in_article]
+    else:
+        chosen = [node for node, _, _ in board_candidates]
+    features.board_page_members = [node.get_text(strip=True) for node in chosen]
+
+    features.links = [
+        (link['href'], ' '.join(link.get_text(' ', strip=True).lower().split()))
+        for link in link_tags
+    ]
+
+    return features
@@ -0,0 +1,125 @@
+"""
+Политика за ескалация към JavaScript рендериране с памет по домейн
+"""
+
+import time
+import logging
+from typing import Dict, List, Optional
+from urllib.parse import urlparse
+
+from config import Config
+from sqlite_store import SQLiteStore, data_path
+
+logger = logging.getLogger(__name__)
+
+# Полетата, заради които си струва да се стартира браузър
+KEY_FIELDS = ('editorial_board', 'peer_review_info', 'issn')
+
+ESCALATE = 'escalate'
+RENDER_FIRST = 'render_first'
+SKIP_RENDER = 'skip_render'
+
+
+def host_key(url: str) -> str:
+    host = urlparse(url).netloc.lower()
+    return host[4:] if host.startswith('www.') else host
+
+
+def missing_key_fields(journal_data: Dict) -> List[str]:
+    """Ключовите полета, които статичното извличане е оставило празни"""
+    return [field for field in KEY_FIELDS if not journal_data.get(field)]
+
+
+def render_added_data(before: Dict, after: Dict) -> bool:
+    """Дали рендерирането е попълнило празно поле или е добавило членове на съвета"""
+    for field in KEY_FIELDS:
+        if not before.get(field) and after.get(field):
+            return True
+    return len(after.get('editorial_board', [])) > len(before.get('editorial_board', []))
+
+
+class RenderPolicyStore(SQLiteStore):
+    """Статистика по домейн: колко пъти е рендериран и колко пъти е помогнало"""
+
+    SCHEMA = '''
+        CREATE TABLE IF NOT EXISTS domain_render_stats (
+            host TEXT PRIMARY KEY,
+            renders INTEGER NOT NULL DEFAULT 0,
+            helpful INTEGER NOT NULL DEFAULT 0,
+            updated_at REAL NOT NULL
+        );
+    '''
+
+    def __init__(self, path: str = None):
+        super().__init__(path or data_path(Config.RENDER_POLICY_DB))
+
+    def get(self, host: str) -> Optional[Dict]:
+        with self.transaction() as conn:
+            row = conn.execute(
+                'SELECT renders, helpful, updated_at FROM domain_render_stats WHERE host = ?',
+                (host,)
+            ).fetchone()
+        return dict(row) if row else None
+
+    def record(self, host: str, helpful: bool):
+        with self.transaction() as conn:
+            conn.execute('''
+                INSERT INTO domain_render_stats (host, renders, helpful, updated_at)
+                VALUES (?, 1, ?, ?)
+                ON CONFLICT(host) DO UPDATE SET
+                    renders = renders + 1,
+                    helpful = helpful + excluded.helpful,
+                    updated_at = excluded.updated_at
+            ''', (host, int(helpful), time.time()))
+
+    def forget(self, host: str):
+        with self.transaction() as conn:
+            conn.execute('DELETE FROM domain_render_stats WHERE host = ?', (host,))
+
+
+class RenderPolicy:
+    """Решава дали да се рендерира, като помни резултата за всеки хост.
+
+    - render_first: рендерирането винаги е помагало - статичната заявка се пропуска
+    - skip_render: рендерирането никога не е добавило данни - не се стартира браузър
+    - escalate: рендерира се само ако KEY_FIELDS са останали празни
+    Записите по-стари от RENDER_POLICY_TTL се преоценяват.
+    """
+
+    def __init__(self, store: RenderPolicyStore = None, min_samples: int = None, ttl: float = None):
+        self.store = store or RenderPolicyStore()
+        self.min_samples = min_samples or Config.RENDER_POLICY_MIN_SAMPLES
+        self.ttl = Config.RENDER_POLICY_TTL if ttl is None else ttl
+
+    def host_mode(self, url: str) -> str:
+        """Режимът за хоста според натрупаната история"""
+        try:
+            stats = self.store.get(host_key(url))
+        except Exception as e:
+            logger.warning(f"Недостъпна история за рендериране: {e}")
+            return ESCALATE
+
+        if not stats or stats['renders'] < self.min_samples:
+            return ESCALATE
+        if time.time() - stats['updated_at'] > self.ttl:
+            return ESCALATE
+        if stats['helpful'] == 0:
+            return SKIP_RENDER
+        if stats['helpful'] == stats['renders']:
+            return RENDER_FIRST
+        return ESCALATE
+
+    def should_render(self, url: str, journal_data: Dict) -> bool:
+        """Рендериране след статично извличане - само при липсващи ключови полета"""
+        if not missing_key_fields(journal_data):
+            return False
+        return self.host_mode(url) != SKIP_RENDER
+
+    def record_outcome(self, url: str, before: Dict, after: Dict) -> bool:
+        """Запомня дали рендерирането е добавило данни"""
+        helpful = render_added_data(before, after)
+        try:
+            self.store.record(host_key(url), helpful)
+        except Exception as e:
+            logger.warning(f"Неуспешен запис в историята за рендериране: {e}")
+        return helpful
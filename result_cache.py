@@ -0,0 +1,110 @@
+"""
+Кеш на готовите анализи, споделен между gunicorn worker-ите (SQLite)
+"""
+
+import json
+import time
+import logging
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from config import Config
+from sqlite_store import SQLiteStore, data_path
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+# Параметри, които не променят съдържанието на страницата
+TRACKING_PARAMS = ('utm_', 'fbclid', 'gclid')
+
+
+def canonical_url(url: str) -> str:
+    """Нормализиран URL за ключ в кеша.
+
+    Схемата и хостът са с малки букви, портът по подразбиране и фрагментът
+    се премахват, крайната наклонена черта не се брои, а query параметрите
+    са сортирани и без tracking параметрите.
+    """
+    url = url.strip()
+    if '://' not in url:
+        url = 'https://' + url
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+
+    host = (parts.hostname or '').rstrip('.')
+    if ':' in host:
+        host = f'[{host}]'  # IPv6
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    netloc = host if port in (None, DEFAULT_PORTS.get(scheme)) else f'{host}:{port}'
+
+    path = parts.path.rstrip('/') or '/'
+    query = urlencode(sorted(
+        (name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not name.lower().startswith(TRACKING_PARAMS)
+    ))
+    return urlunsplit((scheme, netloc, path, query, ''))
+
+
+class ResultCache(SQLiteStore):
+    """JSON стойности с TTL и LRU изчистване при надхвърлен брой записи"""
+
+    SCHEMA = '''
+        CREATE TABLE IF NOT EXISTS results (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            accessed_at REAL NOT NULL,
+            expires_at REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_results_accessed ON results (accessed_at);
+    '''
+
+    def __init__(self, path: str = None, ttl: float = None, max_entries: int = None):
+        super().__init__(path or data_path(Config.RESULT_CACHE_DB))
+        self.ttl = Config.RESULT_CACHE_TTL if ttl is None else ttl
+        self.max_entries = max_entries or Config.RESULT_CACHE_MAX_ENTRIES
+
+    def get(self, key: str) -> Optional[Tuple[Dict, float]]:
+        """(стойност, възраст в секунди) или None, ако липсва или е изтекла"""
+        now = time.time()
+        with self.transaction() as conn:
+            row = conn.execute(
+                'SELECT value, created_at, expires_at FROM results WHERE key = ?', (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            if row['expires_at'] <= now:
+                conn.execute('DELETE FROM results WHERE key = ?', (key,))
+                return None
+            conn.execute('UPDATE results SET accessed_at = ? WHERE key = ?', (now, key))
+        return json.loads(row['value']), now - row['created_at']
+
+    def put(self, key: str, value: Dict, ttl: float = None):
+        """Записва стойността и изчиства изтеклите и най-отдавна ползваните записи"""
+        now = time.time()
+        ttl = self.ttl if ttl is None else ttl
+        with self.transaction() as conn:
+            conn.execute(
+                'INSERT OR REPLACE INTO results (key, value, created_at, accessed_at, expires_at) '
+                'VALUES (?, ?, ?, ?, ?)',
+                (key, json.dumps(value, ensure_ascii=False), now, now, now + ttl)
+            )
+            conn.execute('DELETE FROM results WHERE expires_at <= ?', (now,))
+            excess = conn.execute('SELECT COUNT(*) FROM results').fetchone()[0] - self.max_entries
+            if excess > 0:
+                conn.execute(
+                    'DELETE FROM results WHERE key IN '
+                    '(SELECT key FROM results ORDER BY accessed_at ASC LIMIT ?)',
+                    (excess,)
+                )
+
+    def delete(self, key: str):
+        with self.transaction() as conn:
+            conn.execute('DELETE FROM results WHERE key = ?', (key,))
+
+    def clear(self):
+        with self.transaction() as conn:
+            conn.execute('DELETE FROM results')
@@ -2,55 +2,155 @@
 Scopus API интеграция за допълнителен анализ на списания
 """
 
-import requests
+import time
 import logging
-from typing import Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import requests
+
 from config import Config
+from http_client import HTTPClient, get_http_client
+from scopus_keys import APIKeyPool, get_key_pool
+from scopus_cache import INDEXING_STATUS, METRICS, SEARCH, ScopusResponseCache, get_scopus_cache
+from scopus_metrics import parse_serial_title
+from scopus_rate_limit import RETRY_STATUSES, RateLimiter, backoff_delay, get_rate_limiter, retry_after
+from scopus_sources import SourceIndex, get_source_index, normalize_issn
+from title_matcher import best_match, query_terms
 
 logger = logging.getLogger(__name__)
 
+# Полетата за обхождане на списанията (източниците) сред резултатите на Scopus Search
+SOURCE_FIELDS = 'dc:identifier,source-id,title,issn,eIssn,publicationName,subject-area,source-type,openaccess'
+
 class ScopusAPIClient:
     """Клиент за работа с Scopus API"""
     
-    def __init__(self, api_key: str = None):
-        self.api_key = api_key or Config.SCOPUS_API_KEY
+    def __init__(self, api_key: str = None, http_client: Optional[HTTPClient] = None,
+                 rate_limiter: Optional[RateLimiter] = None, max_retries: int = None,
+                 cache: Optional[ScopusResponseCache] = None, use_cache: bool = True,
+                 key_pool: Optional[APIKeyPool] = None):
+        # При няколко ключа (SCOPUS_API_KEYS) всяка заявка минава през ключа с най-много квота
+        if key_pool is None and api_key is None and rate_limiter is None:
+            key_pool = get_key_pool()
+        self.key_pool = key_pool
+        self.api_key = api_key or (key_pool.keys[0] if key_pool else Config.SCOPUS_API_KEY)
+        self.http = http_client or get_http_client()
         self.base_url = Config.SCOPUS_BASE_URL
         self.headers = {
             'Accept': 'application/json',
             'X-ELS-APIKey': self.api_key
         }
+        # Клиентите с един и същ ключ делят token bucket-а и квотата му
+        self.rate_limiter = rate_limiter or (key_pool.limiters[self.api_key] if key_pool else get_rate_limiter(self.api_key))
+        self.max_retries = Config.SCOPUS_MAX_RETRIES if max_retries is None else max_retries
+        # Отговорите се помнят между заявките и процесите (данните се менят най-много веднъж годишно)
+        self.cache = cache or (get_scopus_cache() if use_cache else None)
+    
+    def _cached(self, endpoint: str, params: Dict, fetch) -> Dict:
+        if self.cache is None:
+            return fetch()
+        return self.cache.cached(endpoint, params, fetch)
+    
+    @property
+    def quota(self) -> Dict:
+        """Последно известната квота на ключа (или общо на ключовете): limit, remaining, reset_at"""
+        if self.key_pool is not None:
+            return self.key_pool.quota()
+        return self.rate_limiter.quota.snapshot()
+    
+    def _next_key(self) -> Tuple[str, RateLimiter]:
+        """Ключът за следващата заявка и неговият limiter"""
+        if self.key_pool is None:
+            return self.api_key, self.rate_limiter
+        api_key = self.key_pool.acquire(Config.SCOPUS_MAX_QUOTA_WAIT)
+        return api_key, self.key_pool.limiters[api_key]
+    
+    def _get(self, url: str, params: Dict) -> requests.Response:
+        """GET към Scopus със съобразяване с квотата и повторни опити.
+        
+        Всяка заявка изчаква token bucket-а. При 429 и 5xx се опитва отново
+        след Retry-After (ако го има) или експоненциално забавяне с jitter;
+        мрежовите грешки също се повтарят. С набор от ключове 429 слага ключа
+        в пауза и заявката се повтаря веднага с друг ключ. Връща последния отговор.
+        """
+        attempt = 0
+        while True:
+            api_key, limiter = self._next_key()
+            if not limiter.wait(Config.SCOPUS_MAX_QUOTA_WAIT):
+                raise RuntimeError('Scopus квотата е изчерпана до подновяването ѝ')
+            
+            headers = self.headers if api_key == self.api_key else dict(self.headers, **{'X-ELS-APIKey': api_key})
+            try:
+                response = self.http.get(url, headers=headers, params=params)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt >= self.max_retries:
+                    raise
+                delay = backoff_delay(attempt)
+                logger.warning(f"Scopus заявката не успя ({e}) - нов опит след {delay:.1f} s")
+            else:
+                limiter.quota.update(response.headers)
+                if self.key_pool is not None:
+                    self.key_pool.record(api_key, response.status_code, response.headers)
+                if response.status_code not in RETRY_STATUSES or attempt >= self.max_retries:
+                    return response
+                delay = retry_after(response.headers)
+                if response.status_code == 429 and self.key_pool is not None and self.key_pool.has_ready_key():
+                    # Друг ключ има свободна квота
+                    delay = 0.0
+                elif delay is None:
+                    delay = backoff_delay(attempt)
+                elif delay > Config.SCOPUS_MAX_QUOTA_WAIT:
+                    # Квотата е изчерпана за дълго - няма смисъл да чакаме тук
+                    return response
+                logger.warning(f"Scopus API {response.status_code} - нов опит след {delay:.1f} s")
+            
+            attempt += 1
+            time.sleep(delay)
     
-    def search_journal(self, journal_title: str, issn: str = None) -> Dict:
-        """Търси списание в Scopus базата данни"""
+    def search_journal(self, journal_title: str, issn: str = None, include_raw: bool = False) -> Dict:
+        """Търси списание в Scopus базата данни.
+        
+        include_raw добавя суровите записи от отговора ('raw_matches'); такива
+        резултати не минават през кеша.
+        """
         if not self.api_key:
             logger.warning("Scopus API ключ не е настроен")
             return {'error': 'API ключ не е наличен'}
         
+        if include_raw:
+            return self._search_journal(journal_title, issn, include_raw=True)
+        return self._cached(SEARCH, {'title': journal_title, 'issn': issn or ''},
+                            lambda: self._search_journal(journal_title, issn))
+    
+    def _search_journal(self, journal_title: str, issn: str = None, include_raw: bool = False) -> Dict:
         try:
-            # Конструиране на заявката
-            query_parts = [f'title("{journal_title}")']
+            # Конструиране на заявката - от значимите думи, а не от точния низ, за да не
+            # зависи от пунктуацията, '&'/'and' и азбуката (кирилицата се транслитерира).
+            # SRCTITLE търси в заглавието на източника (списанието), а не на статиите
+            query_parts = []
+            terms = query_terms(journal_title)
+            if terms:
+                query_parts.append(f"SRCTITLE({' AND '.join(terms)})")
             if issn:
-                query_parts.append(f'issn({issn})')
+                query_parts.append(f'ISSN({issn})')
+            if not query_parts:
+                return {'error': 'Заглавие или ISSN е задължително'}
             
             query = ' AND '.join(query_parts)
             
             params = {
                 'query': query,
-                'field': 'title,issn,subject-area,source-type,openaccess',
+                'field': SOURCE_FIELDS,
                 'count': 25,
                 'start': 0
             }
             
-            response = requests.get(
-                self.base_url,
-                headers=self.headers,
-                params=params,
-                timeout=30
-            )
+            response = self._get(self.base_url, params)
             
             if response.status_code == 200:
                 data = response.json()
-                return self._process_search_results(data)
+                return self._process_search_results(data, journal_title, issn, include_raw)
             else:
                 logger.error(f"Scopus API грешка: {response.status_code}")
                 return {'error': f'API грешка: {response.status_code}'}
@@ -59,10 +159,29 @@ class ScopusAPIClient:
             logger.error(f"Грешка при търсене в Scopus: {e}")
             return {'error': str(e)}
     
-    def _process_search_results(self, data: Dict) -> Dict:
-        """Обработва резултатите от Scopus търсенето"""
+    @staticmethod
+    def _entry_title(entry: Dict) -> str:
+        return entry.get('prism:publicationName') or entry.get('dc:title', '')
+    
+    @staticmethod
+    def _entry_issns(entry: Dict) -> List[str]:
+        return [entry.get('prism:issn'), entry.get('prism:eIssn')]
+    
+    def _process_search_results(self, data: Dict, journal_title: str = None, issn: str = None,
+                                include_raw: bool = False) -> Dict:
+        """Обработва резултатите от Scopus търсенето.
+        
+        Scopus Search връща документи, а не списания - статиите от едно
+        списание се обединяват по source-id, преди да се сравнят заглавията.
+        Кандидатите се подреждат локално по сходство на заглавието (триграми);
+        съвпадащ ISSN решава при равностойни заглавия. Без заглавие се взима
+        първият резултат, както го подрежда Scopus. Другите съвпадения се пазят
+        само като заглавие, ISSN и Scopus ID.
+        """
         try:
             entries = data.get('search-results', {}).get('entry', [])
+            # Празен резултат идва като един запис с 'error'
+            entries = self._unique_sources(entry for entry in entries if 'error' not in entry)
             
             if not entries:
                 return {
@@ -70,25 +189,246 @@ class ScopusAPIClient:
                     'message': 'Списанието не е намерено в Scopus'
                 }
             
-            # Вземаме първия резултат (най-близкото съвпадение)
-            journal = entries[0]
+            journal, confidence, ambiguous = entries[0], None, False
+            if journal_title or issn:
+                match, ambiguous = best_match(
+                    journal_title or '', [(self._entry_title(entry), entry) for entry in entries],
+                    issn=issn, issns_of=self._entry_issns
+                )
+                if match is None or match.score < Config.SCOPUS_TITLE_MIN_CONFIDENCE:
+                    return {
+                        'found': False,
+                        'message': 'Няма достатъчно близко заглавие сред резултатите от Scopus',
+                        'best_candidate': match.title if match else None,
+                        'match_confidence': match.score if match else 0.0
+                    }
+                journal, confidence = match.item, match.score
             
-            return {
-                'found': True,
-                'scopus_id': journal.get('dc:identifier', '').replace('SCOPUS_ID:', ''),
-                'title': journal.get('dc:title', ''),
-                'issn': journal.get('prism:issn', ''),
-                'subject_areas': self._extract_subject_areas(journal.get('subject-area', [])),
-                'source_type': journal.get('prism:aggregationType', ''),
-                'open_access': journal.get('openaccess', 0) == 1,
+            result = self._journal_info(journal)
+            result.update({
+                'match_confidence': confidence,
+                'ambiguous': ambiguous,
                 'total_results': len(entries),
-                'all_matches': entries[:5]  # Първите 5 съвпадения
-            }
+                'all_matches': [self._match_summary(entry) for entry in entries[:5]]  # Първите 5 съвпадения
+            })
+            if include_raw:
+                result['raw_matches'] = entries[:5]
+            return result
             
         except Exception as e:
             logger.error(f"Грешка при обработка на Scopus резултати: {e}")
             return {'error': str(e)}
     
+    @staticmethod
+    def _source_id(entry: Dict) -> str:
+        """ID на списанието (source-id) - за get_journal_metrics; dc:identifier е на документа"""
+        return str(entry.get('source-id') or entry.get('dc:identifier', '').replace('SCOPUS_ID:', ''))
+    
+    @classmethod
+    def _unique_sources(cls, entries: Iterable[Dict]) -> List[Dict]:
+        """Първият документ от всяко списание, в реда на Scopus"""
+        unique = {}
+        for entry in entries:
+            unique.setdefault(cls._source_id(entry), entry)
+        return list(unique.values())
+    
+    @staticmethod
+    def _match_summary(entry: Dict) -> Dict:
+        return {
+            'scopus_id': ScopusAPIClient._source_id(entry),
+            'title': ScopusAPIClient._entry_title(entry),
+            'issn': entry.get('prism:issn', ''),
+        }
+    
+    def _journal_info(self, journal: Dict) -> Dict:
+        """Основните данни за списанието от един резултат на Scopus Search"""
+        return {
+            'found': True,
+            'scopus_id': self._source_id(journal),
+            'title': self._entry_title(journal),
+            'issn': journal.get('prism:issn', ''),
+            'subject_areas': self._extract_subject_areas(journal.get('subject-area', [])),
+            'source_type': journal.get('prism:aggregationType', ''),
+            'open_access': journal.get('openaccess', 0) == 1,
+        }
+    
+    def search_issns(self, issns: Iterable[str]) -> Dict[str, Dict]:
+        """Групово търсене по ISSN: {ISSN, както е подаден: резултат като от search_journal}.
+        
+        ISSN-ите се обединяват в заявки ISSN(a) OR ISSN(b) OR ... в рамките на
+        SCOPUS_MAX_QUERY_LENGTH символа и SCOPUS_BULK_CHUNK_SIZE ISSN-а. Резултатите
+        на всяка заявка се обхождат по страници, докато се намери всеки ISSN от нея
+        или резултатите свършат; така група от стотици списания струва няколко
+        заявки. ISSN-ите, неоткрити до SCOPUS_BULK_MAX_PAGES страници, се търсят
+        поотделно.
+        """
+        issns = list(issns)
+        if not self.api_key:
+            logger.warning("Scopus API ключ не е настроен")
+            return {issn: {'error': 'API ключ не е наличен'} for issn in issns}
+        
+        results: Dict[str, Dict] = {}
+        inputs: Dict[str, List[str]] = {}
+        for issn in issns:
+            normalized = normalize_issn(issn)
+            if normalized is None:
+                results[issn] = {'error': f'Невалиден ISSN: {issn}'}
+            else:
+                inputs.setdefault(normalized, []).append(issn)
+        
+        # Вече кешираните ISSN-и (със същия ключ като search_journal('', issn)) не се търсят отново
+        pending = []
+        for normalized in inputs:
+            cached = self.cache.get(SEARCH, self._issn_params(normalized)) if self.cache else None
+            if cached is None:
+                pending.append(normalized)
+            else:
+                for issn in inputs[normalized]:
+                    results[issn] = dict(cached)
+        
+        for chunk in self._issn_chunks(pending):
+            try:
+                matches, exhausted = self._search_issn_chunk(chunk)
+            except Exception as e:
+                logger.error(f"Грешка при групово търсене в Scopus: {e}")
+                for normalized in chunk:
+                    for issn in inputs[normalized]:
+                        results[issn] = {'error': str(e)}
+                continue
+            
+            for normalized in chunk:
+                if normalized in matches:
+                    result = self._journal_info(matches[normalized])
+                    result['match_confidence'] = 1.0
+                elif exhausted:
+                    result = {'found': False, 'message': 'Списанието не е намерено в Scopus'}
+                else:
+                    result = self._search_journal('', _format_issn(normalized))
+                if self.cache is not None:
+                    self.cache.put(SEARCH, self._issn_params(normalized), result)
+                for issn in inputs[normalized]:
+                    results[issn] = dict(result)
+        return results
+    
+    def iter_search(self, query: str, fields: str = None, page_size: int = None,
+                    max_results: int = None) -> Iterator[Dict]:
+        """Всички резултати от Scopus Search за заявката, един по един.
+        
+        Страниците се обхождат с cursor=* (deep paging без ограничението на
+        start), а следващата страница се изтегля във фонова нишка, докато
+        извикващият обработва текущата - в паметта има най-много две страници.
+        При грешка от API се хвърля RuntimeError. Прекратено обхождане (break
+        или close()) не изтегля нови страници.
+        """
+        if not self.api_key:
+            raise RuntimeError('API ключ не е наличен')
+        
+        params = {'query': query, 'count': page_size or Config.SCOPUS_PAGE_SIZE, 'cursor': '*'}
+        if fields:
+            params['field'] = fields
+        
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='scopus-cursor')
+        yielded = 0
+        try:
+            future = executor.submit(self._search_page, params)
+            while future is not None:
+                entries, next_cursor = future.result()
+                future = None
+                if next_cursor and (max_results is None or yielded + len(entries) < max_results):
+                    future = executor.submit(self._search_page, dict(params, cursor=next_cursor))
+                
+                for entry in entries:
+                    if max_results is not None and yielded >= max_results:
+                        return
+                    yield entry
+                    yielded += 1
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+    
+    def _search_page(self, params: Dict) -> Tuple[List[Dict], Optional[str]]:
+        """Една страница от Scopus Search и курсорът към следващата (None в края)"""
+        response = self._get(self.base_url, params)
+        if response.status_code != 200:
+            raise RuntimeError(f'API грешка: {response.status_code}')
+        
+        search_results = response.json().get('search-results', {})
+        entries = [entry for entry in search_results.get('entry', []) if 'error' not in entry]
+        next_cursor = (search_results.get('cursor') or {}).get('@next')
+        if not entries or len(entries) < int(params['count']) or next_cursor == params['cursor']:
+            next_cursor = None
+        return entries, next_cursor
+    
+    def iter_sources(self, query: str) -> Iterator[Dict]:
+        """Списанията сред резултатите на заявката, без повторения.
+        
+        Например SUBJAREA(MATH) AND SRCTYPE(j) обхожда списанията в една
+        предметна област. Всеки резултат е във формата на search_journal с
+        допълнително 'source_id'; в паметта се пазят само видените source-id.
+        """
+        seen = set()
+        for entry in self.iter_search(query, fields=SOURCE_FIELDS):
+            source_id = entry.get('source-id') or normalize_issn(entry.get('prism:issn')) or self._entry_title(entry)
+            if source_id in seen:
+                continue
+            seen.add(source_id)
+            result = self._journal_info(entry)
+            result['source_id'] = entry.get('source-id', '')
+            yield result
+    
+    @staticmethod
+    def _issn_params(issn: str) -> Dict:
+        return {'title': '', 'issn': issn}
+    
+    @staticmethod
+    def _issn_chunks(issns: List[str]) -> Iterator[List[str]]:
+        """Групи ISSN-и, чиято OR заявка не надхвърля лимитите на Scopus"""
+        chunk: List[str] = []
+        length = 0
+        for issn in issns:
+            term_length = len(f' OR ISSN({_format_issn(issn)})')
+            if chunk and (len(chunk) >= Config.SCOPUS_BULK_CHUNK_SIZE
+                          or length + term_length > Config.SCOPUS_MAX_QUERY_LENGTH):
+                yield chunk
+                chunk, length = [], 0
+            chunk.append(issn)
+            length += term_length
+        if chunk:
+            yield chunk
+    
+    def _search_issn_chunk(self, chunk: List[str]) -> Tuple[Dict[str, Dict], bool]:
+        """Първият резултат за всеки ISSN от групата и дали всички резултати са обходени"""
+        query = ' OR '.join(f'ISSN({_format_issn(issn)})' for issn in chunk)
+        pending = set(chunk)
+        matches: Dict[str, Dict] = {}
+        start = 0
+        
+        for _ in range(Config.SCOPUS_BULK_MAX_PAGES):
+            response = self._get(self.base_url, {
+                'query': query,
+                'field': SOURCE_FIELDS,
+                'count': Config.SCOPUS_PAGE_SIZE,
+                'start': start
+            })
+            if response.status_code != 200:
+                raise RuntimeError(f'API грешка: {response.status_code}')
+            
+            search_results = response.json().get('search-results', {})
+            entries = [entry for entry in search_results.get('entry', []) if 'error' not in entry]
+            for entry in entries:
+                for value in self._entry_issns(entry):
+                    normalized = normalize_issn(value) if value else None
+                    if normalized in pending:
+                        matches[normalized] = entry
+                        pending.discard(normalized)
+            
+            start += len(entries)
+            total = int(search_results.get('opensearch:totalResults') or 0)
+            if not entries or start >= total:
+                return matches, True
+            if not pending:
+                return matches, False
+        return matches, False
+    
     def _extract_subject_areas(self, subject_areas: List) -> List[str]:
         """Извлича предметните области от Scopus резултатите"""
         if isinstance(subject_areas, list):
@@ -97,29 +437,38 @@ class ScopusAPIClient:
             return [subject_areas.get('$', '')]
         return []
     
-    def get_journal_metrics(self, scopus_id: str) -> Dict:
-        """Получава метрики за списание от Scopus"""
+    def get_journal_metrics(self, scopus_id: str, include_raw: bool = False) -> Dict:
+        """Получава метрики за списание от Scopus (CiteScore, SJR и SNIP по години).
+        
+        include_raw добавя целия отговор на Serial Title API ('data'); такива
+        резултати не минават през кеша.
+        """
         if not self.api_key or not scopus_id:
             return {'error': 'API ключ или Scopus ID не е наличен'}
         
+        if include_raw:
+            return self._get_journal_metrics(scopus_id, include_raw=True)
+        return self._cached(METRICS, {'scopus_id': str(scopus_id)}, lambda: self._get_journal_metrics(scopus_id))
+    
+    def _get_journal_metrics(self, scopus_id: str, include_raw: bool = False) -> Dict:
         try:
-            # Използваме Scopus Sources API за метрики
+            # Използваме Scopus Sources API за метрики; ENHANCED изгледът съдържа
+            # CiteScore по години с местата в предметните области
             sources_url = 'https://api.elsevier.com/content/serial/title'
             params = {
                 'scopus_id': scopus_id,
-                'field': 'title,issn,subject-area,metrics'
+                'view': 'ENHANCED'
             }
             
-            response = requests.get(
-                sources_url,
-                headers=self.headers,
-                params=params,
-                timeout=30
-            )
+            response = self._get(sources_url, params)
+            if response.status_code in (401, 403):
+                # Ключът няма достъп до ENHANCED - STANDARD дава SJR, SNIP и текущия CiteScore
+                logger.info(f"Scopus ENHANCED изгледът не е достъпен ({response.status_code}) - ползвам STANDARD")
+                response = self._get(sources_url, dict(params, view='STANDARD'))
             
             if response.status_code == 200:
                 data = response.json()
-                return self._process_metrics_data(data)
+                return self._process_metrics_data(data, include_raw)
             else:
                 logger.error(f"Scopus Sources API грешка: {response.status_code}")
                 return {'error': f'API грешка: {response.status_code}'}
@@ -128,14 +477,16 @@ class ScopusAPIClient:
             logger.error(f"Грешка при получаване на метрики: {e}")
             return {'error': str(e)}
     
-    def _process_metrics_data(self, data: Dict) -> Dict:
-        """Обработва данните за метрики"""
+    def _process_metrics_data(self, data: Dict, include_raw: bool = False) -> Dict:
+        """Обработва данните за метрики до компактния вид на JournalMetrics.to_dict()"""
         try:
-            # Това е опростена обработка - реалната структура може да варира
-            return {
-                'metrics_available': True,
-                'data': data
-            }
+            parsed = parse_serial_title(data)
+            result = {'metrics_available': bool(parsed)}
+            if parsed:
+                result.update(parsed[0].to_dict())
+            if include_raw:
+                result['data'] = data
+            return result
         except Exception as e:
             logger.error(f"Грешка при обработка на метрики: {e}")
             return {'error': str(e)}
@@ -145,12 +496,16 @@ class ScopusAPIClient:
         title = journal_data.get('title', '')
         issn = journal_data.get('issn', '')
         
-        if not title:
-            return {'error': 'Заглавие на списанието е задължително'}
+        if not title and not issn:
+            return {'error': 'Заглавие или ISSN на списанието е задължително'}
         
         # Търсим списанието в Scopus
-        search_result = self.search_journal(title, issn)
-        
+        return self._cached(INDEXING_STATUS, {'title': title, 'issn': issn or ''},
+                            lambda: self._indexing_status(self.search_journal(title, issn)))
+    
+    @staticmethod
+    def _indexing_status(search_result: Dict) -> Dict:
+        """Статус на индексиране от резултата на search_journal/search_issns"""
         if search_result.get('error'):
             return search_result
         
@@ -166,34 +521,152 @@ class ScopusAPIClient:
                 'recommendation': 'Списанието не е намерено в Scopus. Може да се кандидатира за индексиране.'
             }
 
+def _format_issn(issn: str) -> str:
+    """Нормализиран ISSN във вида 1234-5678"""
+    return f'{issn[:4]}-{issn[4:]}'
+
 class ScopusEnhancer:
     """Клас за подобряване на анализа с данни от Scopus"""
     
-    def __init__(self):
-        self.api_client = ScopusAPIClient()
+    def __init__(self, api_client: Optional[ScopusAPIClient] = None,
+                 source_index: Optional[SourceIndex] = None):
+        self.api_client = api_client or ScopusAPIClient()
+        # Локалният Source List (ако е импортиран) отговаря без заявка към API
+        self.source_index = source_index if source_index is not None else get_source_index()
+    
+    @property
+    def available(self) -> bool:
+        """Има ли откъде да се провери индексирането - API ключ или локален Source List"""
+        return bool(self.api_client.api_key) or self.source_index is not None
+    
+    def check_indexing_status(self, journal_data: Dict) -> Dict:
+        """Статус на индексиране - от локалния Source List, а ако там няма - от API"""
+        local_status = self._check_local_index(journal_data)
+        if self._is_final(local_status):
+            return local_status
+        
+        api_status = self.api_client.check_indexing_status(journal_data)
+        # Без достъп до API локалният отрицателен отговор е по-полезен от грешката
+        if api_status.get('error') and local_status is not None:
+            return local_status
+        return api_status
+    
+    def check_indexing_status_many(self, journals: List[Dict]) -> List[Dict]:
+        """Статусите на група списания (в реда на journals).
+        
+        Локалният Source List отговаря за каквото може; за останалите с ISSN
+        има едно групово търсене (search_issns), а поотделно се търсят само
+        списанията без ISSN.
+        """
+        statuses: List[Optional[Dict]] = [None] * len(journals)
+        by_issn: Dict[str, List[int]] = {}
+        local_statuses: Dict[int, Dict] = {}
+        
+        for position, journal_data in enumerate(journals):
+            local_status = self._check_local_index(journal_data)
+            if self._is_final(local_status):
+                statuses[position] = local_status
+                continue
+            if local_status is not None:
+                local_statuses[position] = local_status
+            issn = normalize_issn(journal_data.get('issn'))
+            if issn:
+                by_issn.setdefault(issn, []).append(position)
+        
+        if by_issn:
+            found = self.api_client.search_issns(list(by_issn))
+            for issn, positions in by_issn.items():
+                status = self.api_client._indexing_status(found[issn])
+                for position in positions:
+                    statuses[position] = status
+        
+        for position, journal_data in enumerate(journals):
+            if statuses[position] is None:
+                statuses[position] = self.api_client.check_indexing_status(journal_data)
+            if statuses[position].get('error') and position in local_statuses:
+                statuses[position] = local_statuses[position]
+        return statuses
+    
+    def _is_final(self, local_status: Optional[Dict]) -> bool:
+        """Дали локалният отговор е окончателен.
+        
+        Липсващо или неактивно заглавие може да е само различно изписване -
+        тогава се проверява в API (ако има ключ).
+        """
+        if local_status is None:
+            return False
+        return local_status['indexed'] or local_status.get('discontinued') or not self.api_client.api_key
+    
+    def _check_local_index(self, journal_data: Dict) -> Optional[Dict]:
+        """Отговор от Source List; None, ако индексът не е импортиран"""
+        if self.source_index is None:
+            return None
+        try:
+            source = self.source_index.lookup(issn=journal_data.get('issn'), title=journal_data.get('title'))
+        except Exception as e:
+            logger.warning(f"Недостъпен локален Scopus индекс: {e}")
+            return None
+        
+        if source is None:
+            return {
+                'indexed': False,
+                'source': 'local',
+                'recommendation': 'Списанието не е намерено в Scopus Source List. Може да се кандидатира за индексиране.'
+            }
+        
+        scopus_data = {
+            'found': True,
+            'scopus_id': source['source_id'] or '',
+            'title': source['title'],
+            'issn': source['print_issn'] or source['e_issn'] or '',
+            'subject_areas': source['subject_areas'],
+            'source_type': source['source_type'] or '',
+            'coverage': source['coverage'],
+            'matched_by': source['matched_by'],
+            'match_confidence': source.get('match_confidence', 1.0),
+            'ambiguous': source.get('ambiguous', False),
+        }
+        if source['discontinued']:
+            return {
+                'indexed': False,
+                'discontinued': True,
+                'source': 'local',
+                'scopus_data': scopus_data,
+                'recommendation': 'Списанието е прекратено в Scopus поради проблеми с качеството.'
+            }
+        return {
+            'indexed': source['active'],
+            'discontinued': False,
+            'source': 'local',
+            'scopus_data': scopus_data,
+            'recommendation': ('Списанието вече е индексирано в Scopus' if source['active'] else
+                               'Списанието е в Scopus, но покритието му е неактивно.')
+        }
     
     def enhance_journal_analysis(self, journal_data: Dict) -> Dict:
         """Подобрява анализа на списанието с данни от Scopus"""
         enhanced_data = journal_data.copy()
         
         # Проверяваме статуса на индексиране
-        indexing_status = self.api_client.check_indexing_status(journal_data)
-        enhanced_data['scopus_indexing_status'] = indexing_status
+        self.apply_indexing_status(enhanced_data, self.check_indexing_status(journal_data))
+        return enhanced_data
+    
+    def apply_indexing_status(self, journal_data: Dict, indexing_status: Dict):
+        """Добавя статуса на индексиране и данните от Scopus към journal_data (на място)"""
+        journal_data['scopus_indexing_status'] = indexing_status
         
         # Ако списанието е индексирано, получаваме допълнителни данни
         if indexing_status.get('indexed'):
             scopus_data = indexing_status.get('scopus_data', {})
-            enhanced_data['scopus_metrics'] = scopus_data
+            journal_data['scopus_metrics'] = scopus_data
             
             # Добавяме Scopus предметни области
             if scopus_data.get('subject_areas'):
-                enhanced_data['scopus_subject_areas'] = scopus_data['subject_areas']
+                journal_data['scopus_subject_areas'] = scopus_data['subject_areas']
             
             # Добавяме Scopus ID
             if scopus_data.get('scopus_id'):
-                enhanced_data['scopus_id'] = scopus_data['scopus_id']
-        
-        return enhanced_data
+                journal_data['scopus_id'] = scopus_data['scopus_id']
     
     def calculate_scopus_compatibility(self, journal_data: Dict) -> Dict:
         """Изчислява съвместимостта със Scopus стандартите"""
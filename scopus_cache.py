@@ -0,0 +1,114 @@
+"""
+Постоянен кеш на отговорите от Scopus API с TTL по endpoint и отрицателно кеширане
+"""
+
+import os
+import json
+import logging
+import threading
+from typing import Callable, Dict, Optional
+
+from config import Config
+from result_cache import ResultCache
+from scopus_sources import normalize_issn
+from sqlite_store import data_path
+from title_matcher import title_key
+
+logger = logging.getLogger(__name__)
+
+SEARCH = 'search'
+METRICS = 'metrics'
+INDEXING_STATUS = 'indexing_status'
+# Сменя се, когато заявките към Scopus или обработката на отговорите се променят - старите записи вече не се ползват
+CACHE_VERSION = 3
+
+
+def is_negative(result: Dict) -> bool:
+    """Отговор 'не е намерено' - кешира се за по-кратко (SCOPUS_CACHE_NEGATIVE_TTL)"""
+    return result.get('found') is False or result.get('indexed') is False
+
+
+def cache_key(endpoint: str, params: Dict) -> str:
+    """Ключ от нормализираните параметри - различно изписаните заглавия и ISSN съвпадат"""
+    normalized = {}
+    for name, value in params.items():
+        if name == 'issn':
+            value = normalize_issn(value) or ''
+        elif name == 'title':
+            value = title_key(value or '')
+        normalized[name] = value
+    return f'{endpoint}:v{CACHE_VERSION}:{json.dumps(normalized, sort_keys=True, ensure_ascii=False)}'
+
+
+class ScopusResponseCache:
+    """Отговорите на search, metrics и indexing_status в SQLite (общ за worker-ите).
+
+    Размерът е ограничен с LRU изчистване (SCOPUS_CACHE_MAX_ENTRIES). Грешките
+    не се кешират. Броячите на попадения и пропуски са за текущия процес.
+    """
+
+    def __init__(self, store: ResultCache = None, ttls: Dict[str, float] = None,
+                 negative_ttl: float = None):
+        self.store = store or ResultCache(data_path(Config.SCOPUS_CACHE_DB),
+                                          max_entries=Config.SCOPUS_CACHE_MAX_ENTRIES)
+        self.ttls = ttls or Config.SCOPUS_CACHE_TTLS
+        self.negative_ttl = Config.SCOPUS_CACHE_NEGATIVE_TTL if negative_ttl is None else negative_ttl
+        self._counters: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def _count(self, endpoint: str, outcome: str):
+        with self._lock:
+            counters = self._counters.setdefault(endpoint, {'hits': 0, 'misses': 0})
+            counters[outcome] += 1
+
+    def get(self, endpoint: str, params: Dict) -> Optional[Dict]:
+        try:
+            cached = self.store.get(cache_key(endpoint, params))
+        except Exception as e:
+            logger.warning(f"Недостъпен кеш на Scopus отговорите: {e}")
+            cached = None
+        self._count(endpoint, 'hits' if cached is not None else 'misses')
+        return cached[0] if cached is not None else None
+
+    def put(self, endpoint: str, params: Dict, result: Dict):
+        if 'error' in result:
+            return
+        ttl = self.negative_ttl if is_negative(result) else self.ttls.get(endpoint, Config.SCOPUS_CACHE_DEFAULT_TTL)
+        try:
+            self.store.put(cache_key(endpoint, params), result, ttl=ttl)
+        except Exception as e:
+            logger.warning(f"Неуспешен запис в кеша на Scopus отговорите: {e}")
+
+    def cached(self, endpoint: str, params: Dict, fetch: Callable[[], Dict]) -> Dict:
+        """Отговорът от кеша, а при липса - от fetch() (и се записва)"""
+        result = self.get(endpoint, params)
+        if result is None:
+            result = fetch()
+            self.put(endpoint, params, result)
+        return result
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """{endpoint: {'hits', 'misses'}} от стартирането на процеса"""
+        with self._lock:
+            return {endpoint: dict(counters) for endpoint, counters in self._counters.items()}
+
+    def clear(self):
+        self.store.clear()
+
+
+_scopus_cache = None
+_scopus_cache_pid = None
+_scopus_cache_lock = threading.Lock()
+
+
+def get_scopus_cache() -> Optional[ScopusResponseCache]:
+    """Общият за процеса кеш; None, ако е изключен (SCOPUS_CACHE_ENABLED)"""
+    global _scopus_cache, _scopus_cache_pid
+
+    if not Config.SCOPUS_CACHE_ENABLED:
+        return None
+    with _scopus_cache_lock:
+        if _scopus_cache is None or _scopus_cache_pid != os.getpid():
+            _scopus_cache = ScopusResponseCache()
+            _scopus_cache_pid = os.getpid()
+        return _scopus_cache
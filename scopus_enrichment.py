@@ -0,0 +1,134 @@
+"""
+Scopus проверка, която върви успоредно с извличането на страниците на списанието
+"""
+
+import os
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Callable, Dict, Optional, Tuple
+
+from config import Config
+from scopus_sources import normalize_issn
+
+logger = logging.getLogger(__name__)
+
+# Етапите, след които в journal_data може да има заглавие или ISSN
+LOOKUP_STAGES = frozenset(['extracted', 'crawled', 'rendered'])
+
+
+class ScopusEnrichment:
+    """Проверката в Scopus за един анализ.
+
+    Проверката започва във фонова нишка, щом е известно заглавие или ISSN
+    (обикновено след извличането на първата страница), докато анализът
+    продължава с обхождането и рендерирането. finish() изчаква резултата
+    и го слива в journal_data. Ако по-късните етапи са добавили заглавие
+    или ISSN, а ранната проверка не е намерила списанието, тя се повтаря
+    с пълните данни - също в pool-а и със същия timeout. cancel() отменя
+    проверката, когато анализът е неуспешен.
+    """
+
+    def __init__(self, enhancer, executor: ThreadPoolExecutor = None, timeout: float = None):
+        self.enhancer = enhancer
+        self.executor = executor or get_enrichment_executor()
+        self.timeout = Config.SCOPUS_ENRICH_TIMEOUT if timeout is None else timeout
+        self._future: Optional[Future] = None
+        self._query: Optional[Tuple[str, str]] = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _query_of(journal_data: Dict) -> Optional[Tuple[str, str]]:
+        """(заглавие, ISSN) за проверката; None, ако няма нито едно от двете"""
+        title = (journal_data.get('title') or '').strip()
+        issn = normalize_issn(journal_data.get('issn')) or ''
+        if not title and not issn:
+            return None
+        return title, issn
+
+    def _lookup(self, query: Tuple[str, str]) -> Dict:
+        title, issn = query
+        return self.enhancer.check_indexing_status({'title': title, 'issn': issn})
+
+    def _submit(self, query: Tuple[str, str]) -> Future:
+        self._query = query
+        self._future = self.executor.submit(self._lookup, query)
+        return self._future
+
+    def start(self, journal_data: Dict) -> bool:
+        """Стартира проверката във фонов режим; False, ако вече върви или няма данни"""
+        query = self._query_of(journal_data)
+        if query is None:
+            return False
+        with self._lock:
+            if self._future is not None:
+                return False
+            self._submit(query)
+        logger.info(f"Scopus проверката започна успоредно с анализа: {query[0] or query[1]}")
+        return True
+
+    def cancel(self) -> bool:
+        """Отменя проверката; True, ако не е започнала (започналата завършва, а резултатът се пренебрегва)"""
+        with self._lock:
+            future, self._future = self._future, None
+        return future is not None and future.cancel()
+
+    def progress(self, progress: Optional[Callable] = None) -> Callable:
+        """progress за extract_journal_data, който стартира проверката при първите данни"""
+        def report(stage: str, journal_data: Optional[Dict] = None):
+            if journal_data is not None and stage in LOOKUP_STAGES and self._future is None:
+                self.start(journal_data)
+            if progress is not None:
+                progress(stage, journal_data)
+        return report
+
+    def _wait(self, future: Optional[Future]) -> Optional[Dict]:
+        if future is None:
+            return None
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeout:
+            future.cancel()
+            logger.warning(f"Scopus проверката не завърши за {self.timeout:.0f} s")
+            return {'error': 'Scopus проверката не завърши навреме'}
+        except Exception as e:
+            logger.error(f"Грешка при Scopus проверката: {e}")
+            return {'error': str(e)}
+
+    def finish(self, journal_data: Dict) -> Optional[Dict]:
+        """Изчаква проверката и добавя резултата към journal_data.
+
+        Връща статуса на индексиране или None, ако няма заглавие и ISSN.
+        """
+        query = self._query_of(journal_data)
+        status = self._wait(self._future)
+        if status is not None and query is not None and query != self._query and not status.get('indexed'):
+            # Обхождането или рендерирането са открили повече - новата проверка е по-точна.
+            # При грешка или timeout със същите данни повторение няма смисъл.
+            status = None
+        if status is None:
+            if query is None:
+                return None
+            with self._lock:
+                future = self._submit(query)
+            status = self._wait(future)
+
+        self.enhancer.apply_indexing_status(journal_data, status)
+        return status
+
+
+_executor = None
+_executor_pid = None
+_executor_lock = threading.Lock()
+
+
+def get_enrichment_executor() -> ThreadPoolExecutor:
+    """Общият за процеса pool за Scopus проверките (SCOPUS_ENRICH_WORKERS нишки)"""
+    global _executor, _executor_pid
+
+    with _executor_lock:
+        if _executor is None or _executor_pid != os.getpid():
+            _executor = ThreadPoolExecutor(max_workers=Config.SCOPUS_ENRICH_WORKERS,
+                                           thread_name_prefix='scopus-enrichment')
+            _executor_pid = os.getpid()
+        return _executor
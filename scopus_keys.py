@@ -0,0 +1,212 @@
+"""
+Набор от Scopus API ключове: квота по ключ, избор на ключа с най-много свободна квота и пауза след 429
+"""
+
+import os
+import time
+import hashlib
+import logging
+import threading
+from typing import Callable, Dict, Iterable, List, Optional
+
+from config import Config
+from scopus_rate_limit import RateLimiter, get_rate_limiter, retry_after
+from sqlite_store import SQLiteStore, data_path
+
+logger = logging.getLogger(__name__)
+
+
+def key_id(api_key: str) -> str:
+    """Идентификатор на ключа за хранилището и логовете - самият ключ не се записва"""
+    return hashlib.sha256(api_key.encode('utf-8')).hexdigest()[:16]
+
+
+class KeyUsageStore(SQLiteStore):
+    """Последно известната квота, паузата и броячите на всеки ключ"""
+
+    SCHEMA = '''
+        CREATE TABLE IF NOT EXISTS scopus_key_usage (
+            key_id TEXT PRIMARY KEY,
+            quota_limit INTEGER,
+            remaining INTEGER,
+            reset_at REAL,
+            cooldown_until REAL NOT NULL DEFAULT 0,
+            requests INTEGER NOT NULL DEFAULT 0,
+            throttled INTEGER NOT NULL DEFAULT 0,
+            updated_at REAL NOT NULL
+        );
+    '''
+
+    def __init__(self, path: str = None):
+        super().__init__(path or data_path(Config.SCOPUS_KEYS_DB))
+
+    def load(self) -> Dict[str, Dict]:
+        with self.transaction() as conn:
+            rows = conn.execute('SELECT * FROM scopus_key_usage').fetchall()
+        return {row['key_id']: dict(row) for row in rows}
+
+    def record(self, key: str, quota: Dict, cooldown_until: float, throttled: bool):
+        with self.transaction() as conn:
+            conn.execute('''
+                INSERT INTO scopus_key_usage
+                    (key_id, quota_limit, remaining, reset_at, cooldown_until, requests, throttled, updated_at)
+                VALUES (?, ?, ?, ?, ?, 1, ?, ?)
+                ON CONFLICT(key_id) DO UPDATE SET
+                    quota_limit = COALESCE(excluded.quota_limit, quota_limit),
+                    remaining = COALESCE(excluded.remaining, remaining),
+                    reset_at = COALESCE(excluded.reset_at, reset_at),
+                    cooldown_until = excluded.cooldown_until,
+                    requests = requests + 1,
+                    throttled = throttled + excluded.throttled,
+                    updated_at = excluded.updated_at
+            ''', (key_id(key), quota['limit'], quota['remaining'], quota['reset_at'],
+                  cooldown_until, int(throttled), time.time()))
+
+
+class APIKeyPool:
+    """Scopus API ключовете на институцията като една обща квота.
+
+    Всеки ключ има свой RateLimiter (token bucket и квота от X-RateLimit-*),
+    общ с get_rate_limiter(ключ). За всяка заявка се избира ключът с най-много
+    оставаща квота, като се пропускат ключовете с изчерпана квота и тези в
+    пауза след 429. Квотите и паузите се записват в KeyUsageStore и се
+    възстановяват след рестарт, така че изчерпан ключ не се пробва отново.
+    """
+
+    def __init__(self, keys: Iterable[str], store: Optional[KeyUsageStore] = None,
+                 limiters: Dict[str, RateLimiter] = None, cooldown: float = None,
+                 clock: Callable[[], float] = time.time, sleep: Callable[[float], None] = time.sleep):
+        self.keys: List[str] = list(dict.fromkeys(key for key in keys if key))
+        if not self.keys:
+            raise ValueError('Няма Scopus API ключове')
+        self.store = store
+        self.cooldown = Config.SCOPUS_KEY_COOLDOWN if cooldown is None else cooldown
+        self.clock = clock
+        self.sleep = sleep
+        limiters = limiters or {}
+        self.limiters = {key: limiters.get(key) or get_rate_limiter(key) for key in self.keys}
+        self._cooldown_until = {key: 0.0 for key in self.keys}
+        self._lock = threading.Lock()
+        self._restore()
+
+    def _restore(self):
+        if self.store is None:
+            return
+        try:
+            saved = self.store.load()
+        except Exception as e:
+            logger.warning(f"Недостъпна история на Scopus ключовете: {e}")
+            return
+
+        now = self.clock()
+        for key in self.keys:
+            usage = saved.get(key_id(key))
+            if usage is None:
+                continue
+            # Квота от минал период вече е подновена - не се възстановява
+            if usage['reset_at'] and usage['reset_at'] > now:
+                self.limiters[key].quota.restore({
+                    'limit': usage['quota_limit'], 'remaining': usage['remaining'], 'reset_at': usage['reset_at']
+                })
+            self._cooldown_until[key] = usage['cooldown_until'] or 0.0
+
+    def _headroom(self, key: str) -> float:
+        """Оставащата квота; неизползван ключ или подновена квота - без ограничение"""
+        quota = self.limiters[key].quota
+        snapshot = quota.snapshot()
+        if snapshot['remaining'] is None or not quota.seconds_to_reset():
+            return float('inf')
+        return snapshot['remaining']
+
+    def available_in(self, key: str) -> float:
+        """След колко секунди ключът може да се ползва (пауза след 429 или изчерпана квота)"""
+        delay = max(0.0, self._cooldown_until[key] - self.clock())
+        quota = self.limiters[key].quota
+        if quota.exhausted():
+            delay = max(delay, quota.seconds_to_reset())
+        return delay
+
+    def select(self) -> str:
+        """Ключът с най-много свободна квота; ако няма свободен - този, който се освобождава най-скоро"""
+        with self._lock:
+            ready = [key for key in self.keys if not self.available_in(key)]
+            if ready:
+                # max() връща първия при равенство - ключовете се ползват по реда си
+                return max(ready, key=self._headroom)
+            return min(self.keys, key=self.available_in)
+
+    def has_ready_key(self) -> bool:
+        with self._lock:
+            return any(not self.available_in(key) for key in self.keys)
+
+    def acquire(self, max_wait: float = None) -> str:
+        """Избира ключ, като изчаква, ако всички са в пауза; RuntimeError при повече от max_wait"""
+        key = self.select()
+        delay = self.available_in(key)
+        if delay > 0:
+            if max_wait is not None and delay > max_wait:
+                raise RuntimeError('Всички Scopus API ключове са в пауза или с изчерпана квота')
+            logger.warning(f"Всички Scopus API ключове са заети - изчаквам {delay:.0f} s")
+            self.sleep(delay)
+        return key
+
+    def record(self, key: str, status_code: int, headers: Dict):
+        """Отчита отговора: при 429 ключът почива до Retry-After, подновяването или SCOPUS_KEY_COOLDOWN"""
+        throttled = status_code == 429
+        quota = self.limiters[key].quota
+        with self._lock:
+            if throttled:
+                delay = retry_after(headers, self.clock)
+                if delay is None and quota.exhausted():
+                    delay = quota.seconds_to_reset()
+                if delay is None:
+                    delay = self.cooldown
+                self._cooldown_until[key] = self.clock() + delay
+                logger.warning(f"Scopus ключ {key_id(key)} получи 429 - пауза {delay:.0f} s")
+            cooldown_until = self._cooldown_until[key]
+
+        if self.store is not None:
+            try:
+                self.store.record(key, quota.snapshot(), cooldown_until, throttled)
+            except Exception as e:
+                logger.warning(f"Неуспешен запис на квотата на Scopus ключ: {e}")
+
+    def quota(self) -> Dict:
+        """Общата квота на ключовете: сумата на лимитите и остатъците, най-ранното подновяване"""
+        snapshots = [self.limiters[key].quota.snapshot() for key in self.keys]
+        known = [snapshot for snapshot in snapshots if snapshot['remaining'] is not None]
+        if not known:
+            return {'limit': None, 'remaining': None, 'reset_at': None}
+        resets = [snapshot['reset_at'] for snapshot in known if snapshot['reset_at']]
+        return {
+            'limit': sum(snapshot['limit'] or 0 for snapshot in known),
+            'remaining': sum(snapshot['remaining'] for snapshot in known),
+            'reset_at': min(resets) if resets else None,
+        }
+
+    def snapshot(self) -> List[Dict]:
+        """Състоянието на всеки ключ (по key_id) за наблюдение"""
+        now = self.clock()
+        return [
+            dict(self.limiters[key].quota.snapshot(), key_id=key_id(key),
+                 cooldown=max(0.0, self._cooldown_until[key] - now))
+            for key in self.keys
+        ]
+
+
+_key_pool = None
+_key_pool_pid = None
+_key_pool_lock = threading.Lock()
+
+
+def get_key_pool() -> Optional[APIKeyPool]:
+    """Общият за процеса набор от SCOPUS_API_KEYS; None при по-малко от два ключа"""
+    global _key_pool, _key_pool_pid
+
+    if len(Config.SCOPUS_API_KEYS) < 2:
+        return None
+    with _key_pool_lock:
+        if _key_pool is None or _key_pool_pid != os.getpid():
+            _key_pool = APIKeyPool(Config.SCOPUS_API_KEYS, store=KeyUsageStore())
+            _key_pool_pid = os.getpid()
+        return _key_pool
@@ -0,0 +1,204 @@
+"""
+Компактни метрики на списание от Scopus Serial Title API: CiteScore, SJR и SNIP по години
+"""
+
+from typing import Dict, List, Optional
+
+from scopus_sources import ASJC_AREAS
+
+
+def _number(value) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _integer(value) -> Optional[int]:
+    number = _number(value)
+    return int(number) if number is not None else None
+
+
+def _as_list(value) -> List:
+    """Elsevier връща единичния елемент като обект, а не като списък"""
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+class SubjectRank:
+    """Място на списанието в една предметна област (ASJC) по CiteScore"""
+
+    __slots__ = ('subject_code', 'rank', 'percentile')
+
+    def __init__(self, subject_code: str, rank: Optional[int], percentile: Optional[float]):
+        self.subject_code = subject_code
+        self.rank = rank
+        self.percentile = percentile
+
+    def to_dict(self) -> Dict:
+        return {
+            'subject_code': self.subject_code,
+            'subject_area': ASJC_AREAS.get(self.subject_code[:2]),
+            'rank': self.rank,
+            'percentile': self.percentile,
+        }
+
+
+class CiteScoreYear:
+    """CiteScore за една година с данните, от които е изчислен"""
+
+    __slots__ = ('year', 'value', 'citations', 'documents', 'percent_cited', 'complete', 'subject_ranks')
+
+    def __init__(self, year: int, value: Optional[float], citations: Optional[int] = None,
+                 documents: Optional[int] = None, percent_cited: Optional[float] = None,
+                 complete: bool = True, subject_ranks: List[SubjectRank] = None):
+        self.year = year
+        self.value = value
+        self.citations = citations
+        self.documents = documents
+        self.percent_cited = percent_cited
+        self.complete = complete
+        self.subject_ranks = subject_ranks or []
+
+    @property
+    def best_percentile(self) -> Optional[float]:
+        percentiles = [rank.percentile for rank in self.subject_ranks if rank.percentile is not None]
+        return max(percentiles) if percentiles else None
+
+    def to_dict(self) -> Dict:
+        return {
+            'year': self.year,
+            'value': self.value,
+            'citations': self.citations,
+            'documents': self.documents,
+            'percent_cited': self.percent_cited,
+            'complete': self.complete,
+            'subject_ranks': [rank.to_dict() for rank in self.subject_ranks],
+        }
+
+
+class JournalMetrics:
+    """CiteScore, SJR и SNIP на едно списание; годините са подредени от най-новата"""
+
+    __slots__ = ('source_id', 'title', 'issn', 'e_issn', 'citescore', 'sjr', 'snip', 'citescore_tracker')
+
+    def __init__(self, source_id: str = '', title: str = '', issn: str = '', e_issn: str = ''):
+        self.source_id = source_id
+        self.title = title
+        self.issn = issn
+        self.e_issn = e_issn
+        self.citescore: List[CiteScoreYear] = []
+        self.sjr: Dict[int, float] = {}
+        self.snip: Dict[int, float] = {}
+        # Текущата (непълна) година - (година, стойност)
+        self.citescore_tracker: Optional[tuple] = None
+
+    @classmethod
+    def from_entry(cls, entry: Dict) -> 'JournalMetrics':
+        """От един запис на serial-metadata-response (STANDARD или ENHANCED изглед)"""
+        metrics = cls(
+            source_id=str(entry.get('source-id') or ''),
+            title=entry.get('dc:title') or '',
+            issn=entry.get('prism:issn') or '',
+            e_issn=entry.get('prism:eIssn') or '',
+        )
+        metrics.sjr = _yearly_values(entry.get('SJRList', {}).get('SJR'))
+        metrics.snip = _yearly_values(entry.get('SNIPList', {}).get('SNIP'))
+
+        info = entry.get('citeScoreYearInfoList') or {}
+        for year_info in _as_list(info.get('citeScoreYearInfo')):
+            year = _integer(year_info.get('@year'))
+            if year is None:
+                continue
+            metrics.citescore.append(_citescore_year(year, year_info))
+        metrics.citescore.sort(key=lambda item: item.year, reverse=True)
+
+        if not metrics.citescore:
+            # ENHANCED изгледът не е наличен - само текущата стойност
+            year = _integer(info.get('citeScoreCurrentMetricYear'))
+            value = _number(info.get('citeScoreCurrentMetric'))
+            if year is not None and value is not None:
+                metrics.citescore.append(CiteScoreYear(year, value))
+        tracker_year = _integer(info.get('citeScoreTrackerYear'))
+        tracker = _number(info.get('citeScoreTracker'))
+        if tracker_year is not None and tracker is not None:
+            metrics.citescore_tracker = (tracker_year, tracker)
+        return metrics
+
+    @property
+    def latest_citescore(self) -> Optional[CiteScoreYear]:
+        complete = [item for item in self.citescore if item.complete and item.value is not None]
+        return complete[0] if complete else None
+
+    @staticmethod
+    def _latest(values: Dict[int, float]) -> Optional[Dict]:
+        if not values:
+            return None
+        year = max(values)
+        return {'year': year, 'value': values[year]}
+
+    def to_dict(self) -> Dict:
+        latest = self.latest_citescore
+        return {
+            'source_id': self.source_id,
+            'title': self.title,
+            'issn': self.issn,
+            'e_issn': self.e_issn,
+            'citescore': latest.value if latest else None,
+            'citescore_year': latest.year if latest else None,
+            'citescore_percentile': latest.best_percentile if latest else None,
+            'sjr': self._latest(self.sjr),
+            'snip': self._latest(self.snip),
+            'citescore_tracker': (
+                {'year': self.citescore_tracker[0], 'value': self.citescore_tracker[1]}
+                if self.citescore_tracker else None
+            ),
+            'citescore_history': [item.to_dict() for item in self.citescore],
+            'sjr_history': [{'year': year, 'value': value} for year, value in sorted(self.sjr.items(), reverse=True)],
+            'snip_history': [{'year': year, 'value': value} for year, value in sorted(self.snip.items(), reverse=True)],
+        }
+
+
+def _yearly_values(items) -> Dict[int, float]:
+    """[{'@year': '2022', '$': '1.2'}, ...] -> {2022: 1.2}"""
+    values = {}
+    for item in _as_list(items):
+        year = _integer(item.get('@year'))
+        value = _number(item.get('$'))
+        if year is not None and value is not None:
+            values[year] = value
+    return values
+
+
+def _citescore_year(year: int, year_info: Dict) -> CiteScoreYear:
+    """Записът за всички типове документи ('all') от citeScoreInformationList"""
+    info = {}
+    for information in _as_list(year_info.get('citeScoreInformationList')):
+        for candidate in _as_list(information.get('citeScoreInfo')):
+            if candidate.get('docType', 'all') == 'all':
+                info = candidate
+                break
+        if info:
+            break
+
+    ranks = [
+        SubjectRank(str(rank.get('subjectCode') or ''), _integer(rank.get('rank')), _number(rank.get('percentile')))
+        for rank in _as_list(info.get('citeScoreSubjectRank'))
+    ]
+    return CiteScoreYear(
+        year,
+        _number(info.get('citeScore')),
+        citations=_integer(info.get('citationCount')),
+        documents=_integer(info.get('scholarlyOutput')),
+        percent_cited=_number(info.get('percentCited')),
+        complete=(year_info.get('@status') or 'Complete').lower() == 'complete',
+        subject_ranks=ranks,
+    )
+
+
+def parse_serial_title(payload: Dict) -> List[JournalMetrics]:
+    """Метриките за всеки запис в отговора на Serial Title API"""
+    response = payload.get('serial-metadata-response') or {}
+    return [JournalMetrics.from_entry(entry) for entry in _as_list(response.get('entry'))
+            if isinstance(entry, dict) and 'error' not in entry]
@@ -0,0 +1,204 @@
+"""
+Ограничаване на заявките към Scopus API: token bucket, квота от X-RateLimit-* и retry с backoff
+"""
+
+import os
+import time
+import random
+import logging
+import threading
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Optional
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Статуси, при които заявката се повтаря
+RETRY_STATUSES = frozenset([429, 500, 502, 503, 504])
+
+
+class TokenBucket:
+    """Thread-safe token bucket: до rate заявки в секунда с натрупване до capacity"""
+
+    def __init__(self, rate: float, capacity: float = None,
+                 clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep):
+        self.rate = rate
+        self.capacity = capacity or max(1.0, rate)
+        self.tokens = self.capacity
+        self.clock = clock
+        self.sleep = sleep
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float, rate: float, capacity: float):
+        self.tokens = min(capacity, self.tokens + (now - self._updated) * rate)
+        self._updated = now
+
+    def reserve(self, rate: float = None, max_wait: float = None) -> Optional[float]:
+        """Взима жетон и връща след колко секунди може да се изпрати заявката.
+
+        rate (ако е по-нисък от основния) забавя заявките временно - напр.
+        когато квотата свършва. Тогава жетоните се натрупват с този rate и
+        най-много до max(1, rate), така че всички заявки се разреждат
+        равномерно, а не само една от тях. Жетонът се резервира веднага,
+        така че нишките, които чакат, не изпреварват една друга. Ако
+        чакането е над max_wait, жетон не се взима и се връща None.
+        """
+        with self._lock:
+            now = self.clock()
+            effective = min(self.rate, rate) if rate else self.rate
+            capacity = min(self.capacity, max(1.0, effective))
+            self._refill(now, effective, capacity)
+            tokens = self.tokens - 1
+            delay = 0.0 if tokens >= 0 else -tokens / effective
+            if max_wait is not None and delay > max_wait:
+                return None
+            self.tokens = tokens
+            return delay
+
+    def acquire(self, rate: float = None, max_wait: float = None) -> bool:
+        """Изчаква, докато има свободен жетон; False, ако чакането е над max_wait"""
+        delay = self.reserve(rate, max_wait)
+        if delay is None:
+            return False
+        if delay > 0:
+            self.sleep(delay)
+        return True
+
+
+class QuotaTracker:
+    """Оставащата квота на ключа според X-RateLimit-Limit/-Remaining/-Reset"""
+
+    def __init__(self, clock: Callable[[], float] = time.time):
+        self.clock = clock
+        self.limit: Optional[int] = None
+        self.remaining: Optional[int] = None
+        # Unix време, в което квотата се подновява
+        self.reset_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def update(self, headers: Dict):
+        """Обновява квотата от заглавките на отговора (липсващите се пропускат)"""
+        limit = _int_header(headers, 'X-RateLimit-Limit')
+        remaining = _int_header(headers, 'X-RateLimit-Remaining')
+        reset_at = _int_header(headers, 'X-RateLimit-Reset')
+        with self._lock:
+            if limit is not None:
+                self.limit = limit
+            if remaining is not None:
+                self.remaining = remaining
+            if reset_at is not None:
+                self.reset_at = float(reset_at)
+
+    def restore(self, snapshot: Dict):
+        """Възстановява запазено състояние (от snapshot()), напр. след рестарт"""
+        with self._lock:
+            self.limit = snapshot.get('limit')
+            self.remaining = snapshot.get('remaining')
+            self.reset_at = snapshot.get('reset_at')
+
+    def seconds_to_reset(self) -> Optional[float]:
+        if self.reset_at is None:
+            return None
+        return max(0.0, self.reset_at - self.clock())
+
+    def exhausted(self) -> bool:
+        """Квотата е изчерпана и още не е подновена"""
+        with self._lock:
+            return self.remaining is not None and self.remaining <= 0 and bool(self.seconds_to_reset())
+
+    def pacing_rate(self) -> Optional[float]:
+        """Заявки в секунда, с които оставащата квота стига до подновяването ѝ.
+
+        None, докато квотата е над SCOPUS_QUOTA_RESERVE (дял от лимита) -
+        тогава ограничава само token bucket-ът. Под резерва остатъкът се
+        разпределя равномерно до подновяването, така че групов анализ се
+        забавя плавно вместо да изчерпа седмичната квота наведнъж.
+        """
+        with self._lock:
+            if self.remaining is None or self.reset_at is None:
+                return None
+            if self.limit and self.remaining > self.limit * Config.SCOPUS_QUOTA_RESERVE:
+                return None
+            window = self.seconds_to_reset()
+            if not window:
+                return None
+            return max(self.remaining, 1) / window
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {'limit': self.limit, 'remaining': self.remaining, 'reset_at': self.reset_at}
+
+
+class RateLimiter:
+    """Token bucket и квота за един API ключ"""
+
+    def __init__(self, rate: float = None, burst: float = None,
+                 clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep):
+        self.bucket = TokenBucket(rate or Config.SCOPUS_REQUESTS_PER_SECOND,
+                                  burst or Config.SCOPUS_BURST, clock=clock, sleep=sleep)
+        self.quota = QuotaTracker()
+        self.sleep = sleep
+
+    def wait(self, max_wait: float = None) -> bool:
+        """Изчаква реда си; False, ако квотата е изчерпана или темпото до подновяването ѝ
+        изисква чакане над max_wait секунди"""
+        if self.quota.exhausted():
+            delay = self.quota.seconds_to_reset()
+            if max_wait is not None and delay > max_wait:
+                return False
+            logger.warning(f"Scopus квотата е изчерпана - изчаквам {delay:.0f} s до подновяването ѝ")
+            self.sleep(delay)
+        return self.bucket.acquire(self.quota.pacing_rate(), max_wait)
+
+
+def retry_after(headers: Dict, clock: Callable[[], float] = time.time) -> Optional[float]:
+    """Retry-After в секунди (число или HTTP дата); None, ако липсва или е невалиден"""
+    value = headers.get('Retry-After')
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - clock())
+    except (TypeError, ValueError):
+        return None
+
+
+def backoff_delay(attempt: int, base: float = None, cap: float = None) -> float:
+    """Експоненциално забавяне с пълен jitter (0 .. base * 2^attempt, най-много cap)"""
+    base = Config.SCOPUS_BACKOFF_BASE if base is None else base
+    cap = Config.SCOPUS_BACKOFF_MAX if cap is None else cap
+    return random.uniform(0, min(cap, base * (2 ** attempt)))
+
+
+def _int_header(headers: Dict, name: str) -> Optional[int]:
+    value = headers.get(name)
+    if value is None:
+        return None
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+_limiters: Dict[str, RateLimiter] = {}
+_limiters_pid = None
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(api_key: str) -> RateLimiter:
+    """Общият за процеса limiter на ключа - всички клиенти с един ключ делят квотата му"""
+    global _limiters_pid
+
+    with _limiters_lock:
+        if _limiters_pid != os.getpid():
+            _limiters.clear()
+            _limiters_pid = os.getpid()
+        limiter = _limiters.get(api_key)
+        if limiter is None:
+            limiter = _limiters[api_key] = RateLimiter()
+        return limiter
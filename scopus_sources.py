@@ -0,0 +1,348 @@
+"""
+Локален индекс на Scopus Source List - проверка за индексиране без заявка към API.
+
+Импорт (CSV или xlsx, изтеглен от Elsevier):
+    python scopus_sources.py source_list.xlsx
+"""
+
+import os
+import re
+import csv
+import sys
+import argparse
+import logging
+import threading
+import unicodedata
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from config import Config
+from sqlite_store import SQLiteStore, data_path
+
+logger = logging.getLogger(__name__)
+
+HAVE_OPENPYXL = False
+try:
+    import openpyxl
+    HAVE_OPENPYXL = True
+except ImportError:
+    pass
+
+# Колоните от Source List (заглавията се сравняват по начало, без значение от регистъра)
+COLUMN_PREFIXES = {
+    'source_id': ('sourcerecord id', 'source record id', 'scopus source id', 'sourceid'),
+    'title': ('source title', 'title'),
+    'print_issn': ('print-issn', 'print issn', 'issn'),
+    'e_issn': ('e-issn', 'e issn', 'eissn'),
+    'active': ('active or inactive', 'active'),
+    'discontinued': ('titles discontinued', 'discontinued'),
+    'coverage': ('coverage',),
+    'publisher': ("publisher's name", 'publisher'),
+    'source_type': ('source type',),
+    'asjc': ('all science journal classification codes', 'asjc'),
+}
+
+# Основните области по първите две цифри на ASJC кода
+ASJC_AREAS = {
+    '10': 'Multidisciplinary',
+    '11': 'Agricultural and Biological Sciences',
+    '12': 'Arts and Humanities',
+    '13': 'Biochemistry, Genetics and Molecular Biology',
+    '14': 'Business, Management and Accounting',
+    '15': 'Chemical Engineering',
+    '16': 'Chemistry',
+    '17': 'Computer Science',
+    '18': 'Decision Sciences',
+    '19': 'Earth and Planetary Sciences',
+    '20': 'Economics, Econometrics and Finance',
+    '21': 'Energy',
+    '22': 'Engineering',
+    '23': 'Environmental Science',
+    '24': 'Immunology and Microbiology',
+    '25': 'Materials Science',
+    '26': 'Mathematics',
+    '27': 'Medicine',
+    '28': 'Neuroscience',
+    '29': 'Nursing',
+    '30': 'Pharmacology, Toxicology and Pharmaceutics',
+    '31': 'Physics and Astronomy',
+    '32': 'Psychology',
+    '33': 'Social Sciences',
+    '34': 'Veterinary',
+    '35': 'Dentistry',
+    '36': 'Health Professions',
+}
+
+# Стойности в колоната за прекратени списания, които не означават прекратяване
+NOT_DISCONTINUED = frozenset(['', 'no', 'false', '0', 'n'])
+ISSN_PATTERN = re.compile(r'^(\d{7}[\dX])$')
+TITLE_PUNCTUATION = re.compile(r'[^\w\s]+')
+
+
+def normalize_issn(value) -> Optional[str]:
+    """ISSN като 8 символа без тире ('1234-567x' -> '1234567X'); None при невалиден"""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        # Excel пази ISSN без тире като число и губи водещите нули
+        return normalize_issn(str(int(value)).zfill(8))
+    issn = re.sub(r'[\s-]', '', str(value)).upper()
+    return issn if ISSN_PATTERN.match(issn) else None
+
+
+def normalize_title(title: str) -> str:
+    """Заглавие за сравнение: малки букви, без диакритика и пунктуация, '&' -> 'and'"""
+    if not title:
+        return ''
+    title = unicodedata.normalize('NFKD', str(title).lower().replace('&', ' and '))
+    title = ''.join(char for char in title if not unicodedata.combining(char))
+    title = TITLE_PUNCTUATION.sub(' ', title.replace('_', ' '))
+    return ' '.join(title.split())
+
+
+def asjc_areas(codes: Iterable[str]) -> List[str]:
+    """Основните предметни области за списък от ASJC кодове (без повторения)"""
+    areas = []
+    for code in codes:
+        area = ASJC_AREAS.get(str(code)[:2])
+        if area and area not in areas:
+            areas.append(area)
+    return areas
+
+
+def _column_map(headers: Iterable) -> Dict[str, int]:
+    """Индексът на колоната за всяко от полетата в COLUMN_PREFIXES"""
+    columns = {}
+    normalized = [' '.join(str(header or '').lower().split()) for header in headers]
+    for field, prefixes in COLUMN_PREFIXES.items():
+        for prefix in prefixes:
+            index = next((i for i, header in enumerate(normalized)
+                          if header.startswith(prefix) and i not in columns.values()), None)
+            if index is not None:
+                columns[field] = index
+                break
+    return columns
+
+
+class SourceIndex(SQLiteStore):
+    """Списанията от Scopus Source List с ключове по нормализиран ISSN и заглавие"""
+
+    SCHEMA = '''
+        CREATE TABLE IF NOT EXISTS sources (
+            id INTEGER PRIMARY KEY,
+            source_id TEXT,
+            title TEXT NOT NULL,
+            print_issn TEXT,
+            e_issn TEXT,
+            active INTEGER NOT NULL,
+            discontinued INTEGER NOT NULL,
+            coverage TEXT,
+            publisher TEXT,
+            source_type TEXT,
+            asjc TEXT
+        );
+        CREATE TABLE IF NOT EXISTS source_keys (
+            key TEXT NOT NULL,
+            source INTEGER NOT NULL,
+            PRIMARY KEY (key, source)
+        ) WITHOUT ROWID;
+    '''
+
+    def __init__(self, path: str = None):
+        super().__init__(path or data_path(Config.SCOPUS_SOURCES_DB))
+        self._title_index = None
+        self._title_index_lock = threading.Lock()
+
+    def import_rows(self, rows: Iterable[List]) -> int:
+        """Заменя индекса със записите от таблица (първият ред - заглавията); връща броя им"""
+        rows = iter(rows)
+        headers = next(rows, None)
+        if headers is None:
+            return 0
+        columns = _column_map(headers)
+        if 'title' not in columns or not {'print_issn', 'e_issn'} & columns.keys():
+            raise ValueError('Файлът не прилича на Scopus Source List - липсват колони за заглавие и ISSN')
+
+        def value(row, field):
+            index = columns.get(field)
+            return row[index] if index is not None and index < len(row) else None
+
+        def cell(row, field):
+            raw = value(row, field)
+            return '' if raw is None else str(raw).strip()
+
+        imported = 0
+        with self.transaction() as conn:
+            conn.execute('DELETE FROM source_keys')
+            conn.execute('DELETE FROM sources')
+            for row in rows:
+                title = cell(row, 'title')
+                if not title:
+                    continue
+                print_issn = normalize_issn(value(row, 'print_issn'))
+                e_issn = normalize_issn(value(row, 'e_issn'))
+                codes = re.findall(r'\d{4}', cell(row, 'asjc'))
+                active = cell(row, 'active')
+                cursor = conn.execute(
+                    'INSERT INTO sources (source_id, title, print_issn, e_issn, active, discontinued, '
+                    'coverage, publisher, source_type, asjc) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    (cell(row, 'source_id') or None, title, print_issn, e_issn,
+                     int(not active or active.lower().startswith(('active', 'yes'))),
+                     int(cell(row, 'discontinued').lower() not in NOT_DISCONTINUED),
+                     cell(row, 'coverage') or None, cell(row, 'publisher') or None,
+                     cell(row, 'source_type') or None, ';'.join(codes) or None)
+                )
+                keys = {f'issn:{issn}' for issn in (print_issn, e_issn) if issn}
+                normalized = normalize_title(title)
+                if normalized:
+                    keys.add(f'title:{normalized}')
+                conn.executemany('INSERT OR IGNORE INTO source_keys (key, source) VALUES (?, ?)',
+                                 [(key, cursor.lastrowid) for key in keys])
+                imported += 1
+        self._title_index = None
+        logger.info(f"Импортирани {imported} списания от Scopus Source List")
+        return imported
+
+    def import_file(self, path: str, sheet: str = None) -> int:
+        """Импорт от CSV или xlsx (xlsx изисква openpyxl)"""
+        return self.import_rows(read_table(path, sheet))
+
+    def count(self) -> int:
+        with self.transaction() as conn:
+            return conn.execute('SELECT COUNT(*) FROM sources').fetchone()[0]
+
+    def title_index(self):
+        """Триграмен индекс на всички заглавия (създава се при първото приблизително търсене)"""
+        from title_matcher import TitleIndex
+
+        with self._title_index_lock:
+            if self._title_index is None:
+                with self.transaction() as conn:
+                    rows = conn.execute('SELECT id, title FROM sources').fetchall()
+                self._title_index = TitleIndex((row['title'], row['id']) for row in rows)
+            return self._title_index
+
+    def _find_fuzzy(self, title: str) -> Optional[Dict]:
+        """Най-близкото заглавие над SCOPUS_TITLE_MIN_CONFIDENCE"""
+        from title_matcher import AMBIGUITY_MARGIN
+
+        matches = self.title_index().search(title, limit=2, min_score=Config.SCOPUS_TITLE_MIN_CONFIDENCE)
+        if not matches:
+            return None
+        with self.transaction() as conn:
+            row = conn.execute('SELECT * FROM sources WHERE id = ?', (matches[0].item,)).fetchone()
+        if row is None:
+            return None
+        source = self._to_dict(row)
+        source['match_confidence'] = matches[0].score
+        source['ambiguous'] = len(matches) > 1 and matches[0].score - matches[1].score < AMBIGUITY_MARGIN
+        return source
+
+    def _find(self, key: str) -> Optional[Dict]:
+        with self.transaction() as conn:
+            row = conn.execute(
+                'SELECT sources.* FROM source_keys JOIN sources ON sources.id = source_keys.source '
+                'WHERE source_keys.key = ? ORDER BY sources.active DESC, sources.discontinued ASC LIMIT 1',
+                (key,)
+            ).fetchone()
+        return self._to_dict(row) if row is not None else None
+
+    def lookup(self, issn: str = None, title: str = None, e_issn: str = None,
+               fuzzy: bool = True) -> Optional[Dict]:
+        """Списанието по ISSN (печатен или електронен), а ако няма - по заглавие.
+
+        Ако няма точно съвпадение на нормализираното заглавие, при fuzzy=True
+        се търси най-близкото по триграми (с транслитерация от кирилица).
+        """
+        for value in (issn, e_issn):
+            normalized = normalize_issn(value)
+            if normalized:
+                source = self._find(f'issn:{normalized}')
+                if source is not None:
+                    source['matched_by'] = 'issn'
+                    return source
+        normalized_title = normalize_title(title)
+        if normalized_title:
+            source = self._find(f'title:{normalized_title}')
+            if source is not None:
+                source['matched_by'] = 'title'
+                return source
+        if title and fuzzy:
+            source = self._find_fuzzy(title)
+            if source is not None:
+                source['matched_by'] = 'fuzzy_title'
+                return source
+        return None
+
+    @staticmethod
+    def _to_dict(row) -> Dict:
+        codes = row['asjc'].split(';') if row['asjc'] else []
+        return {
+            'source_id': row['source_id'],
+            'title': row['title'],
+            'print_issn': row['print_issn'],
+            'e_issn': row['e_issn'],
+            'active': bool(row['active']),
+            'discontinued': bool(row['discontinued']),
+            'coverage': row['coverage'],
+            'publisher': row['publisher'],
+            'source_type': row['source_type'],
+            'asjc_codes': codes,
+            'subject_areas': asjc_areas(codes),
+        }
+
+
+def read_table(path: str, sheet: str = None) -> Iterator[List]:
+    """Редовете на CSV или xlsx файл като списъци (първият ред - заглавията)"""
+    if path.lower().endswith(('.xlsx', '.xlsm')):
+        if not HAVE_OPENPYXL:
+            raise ImportError('За импорт от xlsx е нужен openpyxl (pip install openpyxl) - или запазете файла като CSV')
+        workbook = openpyxl.load_workbook(path, read_only=True, data_only=True)
+        try:
+            worksheet = workbook[sheet] if sheet else workbook.worksheets[0]
+            for row in worksheet.iter_rows(values_only=True):
+                yield list(row)
+        finally:
+            workbook.close()
+        return
+
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        # Разделителят е най-честият от ',;\t' в реда със заглавията (Excel с локални настройки пише ';')
+        header = f.readline()
+        f.seek(0)
+        delimiter = max(',;\t', key=header.count)
+        yield from csv.reader(f, delimiter=delimiter)
+
+
+_source_index = None
+_source_index_pid = None
+_source_index_lock = threading.Lock()
+
+
+def get_source_index() -> Optional[SourceIndex]:
+    """Общият за процеса индекс; None, ако Source List още не е импортиран"""
+    global _source_index, _source_index_pid
+
+    if not os.path.exists(data_path(Config.SCOPUS_SOURCES_DB)):
+        return None
+    with _source_index_lock:
+        if _source_index is None or _source_index_pid != os.getpid():
+            _source_index = SourceIndex()
+            _source_index_pid = os.getpid()
+        return _source_index
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Импорт на Scopus Source List в локалния индекс')
+    parser.add_argument('path', help='CSV или xlsx файл от Elsevier')
+    parser.add_argument('--sheet', help='лист в xlsx файла (по подразбиране първият)')
+    parser.add_argument('--db', help='път до индекса (по подразбиране в DATA_DIR)')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    imported = SourceIndex(args.db).import_file(args.path, args.sheet)
+    print(f"Импортирани списания: {imported}")
+    return 0 if imported else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
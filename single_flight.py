@@ -0,0 +1,175 @@
+"""
+Обединяване на едновременните анализи на един и същ URL (single-flight)
+"""
+
+import os
+import time
+import uuid
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from config import Config
+from sqlite_store import SQLiteStore, data_path
+
+logger = logging.getLogger(__name__)
+
+
+class LeaseStore(SQLiteStore):
+    """Lease по ключ с изтичане - кой процес изпълнява анализа в момента"""
+
+    SCHEMA = '''
+        CREATE TABLE IF NOT EXISTS leases (
+            key TEXT PRIMARY KEY,
+            owner TEXT NOT NULL,
+            expires_at REAL NOT NULL
+        );
+    '''
+
+    def __init__(self, path: str = None):
+        super().__init__(path or data_path(Config.SINGLE_FLIGHT_DB))
+
+    def acquire(self, key: str, owner: str, ttl: float) -> bool:
+        """Взима lease-а, ако е свободен или изтекъл (напр. след спрял worker)"""
+        now = time.time()
+        with self.transaction() as conn:
+            cursor = conn.execute('''
+                INSERT INTO leases (key, owner, expires_at) VALUES (?, ?, ?)
+                ON CONFLICT(key) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at
+                WHERE leases.expires_at <= ?
+            ''', (key, owner, now + ttl, now))
+            return cursor.rowcount == 1
+
+    def release(self, key: str, owner: str):
+        with self.transaction() as conn:
+            conn.execute('DELETE FROM leases WHERE key = ? AND owner = ?', (key, owner))
+
+
+class _Call:
+    """Изпълнение в ход, което чакащите нишки споделят, заедно с етапите му"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+        self.events: List[Tuple[str, Any]] = []
+        self.listeners: List[Callable] = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, progress: Callable):
+        """Добавя получател на етапите; досегашните му се изпращат веднага"""
+        with self._lock:
+            for stage, data in self.events:
+                self._notify(progress, stage, data)
+            self.listeners.append(progress)
+
+    def report(self, stage: str, data: Any = None):
+        """progress на водещата нишка - етапът стига до всички чакащи"""
+        with self._lock:
+            self.events.append((stage, data))
+            for progress in self.listeners:
+                self._notify(progress, stage, data)
+
+    @staticmethod
+    def _notify(progress: Callable, stage: str, data: Any):
+        try:
+            progress(stage, data)
+        except Exception as e:
+            logger.warning(f"Грешка при препращане на етап '{stage}': {e}")
+
+
+class SingleFlight:
+    """Една задача на ключ - в процеса и между процесите.
+
+    В рамките на процеса дубликатите чакат резултата на първата нишка.
+    Между процесите първият взима lease в LeaseStore, а останалите чакат
+    да го освободи и четат резултата чрез lookup (споделения кеш). Ако
+    резултат няма (грешка или изтекло чакане), задачата се изпълнява отново.
+
+    Чакащите в процеса получават етапите на водещата нишка (do_with_progress).
+    Worker, който чака lease-а на друг процес, няма етапи до резултата.
+    """
+
+    def __init__(self, leases: LeaseStore = None, lease_ttl: float = None,
+                 wait_timeout: float = None, poll_interval: float = None):
+        self.leases = leases
+        self.lease_ttl = lease_ttl or Config.SINGLE_FLIGHT_LEASE_TTL
+        self.wait_timeout = wait_timeout or Config.SINGLE_FLIGHT_WAIT_TIMEOUT
+        self.poll_interval = poll_interval or Config.SINGLE_FLIGHT_POLL_INTERVAL
+        self.owner = f'{os.getpid()}-{uuid.uuid4().hex[:8]}'
+        self._calls: Dict[str, _Call] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def follower_timeout(self) -> float:
+        """Колко чака дубликат в процеса: водещата нишка може да чака lease до
+        wait_timeout и след това да анализира до lease_ttl"""
+        return self.wait_timeout + self.lease_ttl
+
+    def do(self, key: str, func: Callable[[], Any],
+           lookup: Callable[[], Optional[Any]] = None) -> Tuple[Any, bool]:
+        """Изпълнява func веднъж за ключа; връща (резултат, дали е споделен)"""
+        return self.do_with_progress(key, lambda report: func(), lookup)
+
+    def do_with_progress(self, key: str, func: Callable[[Callable], Any],
+                         lookup: Callable[[], Optional[Any]] = None,
+                         progress: Optional[Callable] = None) -> Tuple[Any, bool]:
+        """Като do, но func(report) получава progress, който стига до всички
+        чакащи; progress на всяка заявка получава етапите на общото изпълнение"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        if progress is not None:
+            call.subscribe(progress)
+
+        if not leader:
+            if not call.done.wait(self.follower_timeout):
+                raise TimeoutError(f"Изтече чакането на анализа на {key}")
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result, shared = self._run_once(key, lambda: func(call.report), lookup)
+            return call.result, shared
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    def _run_once(self, key: str, func: Callable[[], Any],
+                  lookup: Callable[[], Optional[Any]]) -> Tuple[Any, bool]:
+        """Изпълнение под lease; докато друг процес го държи - чакане на резултата му"""
+        if self.leases is None:
+            return func(), False
+
+        deadline = time.monotonic() + self.wait_timeout
+        while True:
+            try:
+                acquired = self.leases.acquire(key, self.owner, self.lease_ttl)
+            except Exception as e:
+                logger.warning(f"Недостъпен lease за {key}: {e}")
+                return func(), False
+
+            if acquired:
+                try:
+                    return func(), False
+                finally:
+                    try:
+                        self.leases.release(key, self.owner)
+                    except Exception as e:
+                        logger.warning(f"Неуспешно освобождаване на lease за {key}: {e}")
+
+            time.sleep(self.poll_interval)
+            if lookup is not None:
+                result = lookup()
+                if result is not None:
+                    return result, True
+            if time.monotonic() >= deadline:
+                logger.warning(f"Изтече чакането на друг worker за {key} - анализирам отново")
+                return func(), False
@@ -0,0 +1,172 @@
+"""
+Ограничено обхождане на свързаните страници на списанието
+(редакционен съвет, за списанието, рецензиране, цели и обхват, указания за автори)
+"""
+
+import time
+import logging
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Dict, List, Tuple
+from urllib.parse import urljoin, urlparse, urldefrag
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+# Текст на връзката -> секция. Включени са и български варианти
+SECTION_KEYWORDS = {
+    'editorial_board': [
+        'editorial board', 'editorial team', 'editorial committee', 'editors',
+        'редакционна колегия', 'редакционен съвет', 'редакционен екип', 'редакция'
+    ],
+    'peer_review': [
+        'peer review', 'review process', 'review policy', 'reviewers',
+        'рецензиране', 'рецензенти'
+    ],
+    'aims_scope': [
+        'aims & scope', 'aims and scope', 'focus and scope', 'aims', 'scope',
+        'цели и обхват', 'обхват'
+    ],
+    'author_guidelines': [
+        'author guidelines', 'guide for authors', 'instructions for authors',
+        'submission guidelines', 'submissions', 'for authors',
+        'указания за автори', 'за автори'
+    ],
+    'about': [
+        'about the journal', 'about us', 'about', 'journal information',
+        'за списанието', 'за нас'
+    ]
+}
+
+# Части от пътя, които подсказват секцията, когато текстът не е ясен
+SECTION_HREF_HINTS = {
+    'editorial_board': ['editorial-board', 'editorialboard', 'editorialteam', 'editorial-team', 'editors'],
+    'peer_review': ['peer-review', 'peerreview', 'review-process', 'reviewers'],
+    'aims_scope': ['aims', 'scope'],
+    'author_guidelines': ['guidelines', 'guide-for-authors', 'instructions', 'submissions'],
+    'about': ['about']
+}
+
+SKIPPED_EXTENSIONS = ('.pdf', '.doc', '.docx', '.zip', '.jpg', '.jpeg', '.png', '.gif', '.xml', '.rss')
+
+
+def _site_key(url: str) -> str:
+    host = urlparse(url).netloc.lower()
+    return host[4:] if host.startswith('www.') else host
+
+
+class SiteCrawler:
+    """Намира и изтегля до max_pages свързани страници в рамките на time_budget.
+
+    fetch_page(url, timeout=...) получава оставащата част от бюджета, така че
+    заявка, която не е приключила до края му, не продължава след него с
+    пълния HTTP timeout.
+    """
+
+    def __init__(self, fetch_page, max_pages: int = None, time_budget: float = None,
+                 max_workers: int = None):
+        self.fetch_page = fetch_page
+        self.max_pages = Config.CRAWL_MAX_PAGES if max_pages is None else max_pages
+        self.time_budget = time_budget or Config.CRAWL_TIME_BUDGET
+        self.max_workers = max_workers or Config.CRAWL_MAX_WORKERS
+
+    def _score_link(self, section: str, text: str, href: str) -> int:
+        score = 0
+        for keyword in SECTION_KEYWORDS[section]:
+            if text == keyword:
+                score = max(score, 3)
+            elif keyword in text:
+                score = max(score, 2)
+        path = urlparse(href).path.lower()
+        if any(hint in path for hint in SECTION_HREF_HINTS[section]):
+            score += 1
+        return score
+
+    def find_section_links(self, links: List[Tuple[str, str]], base_url: str) -> List[Tuple[str, str]]:
+        """Връща (секция, URL) за най-добрата връзка към всяка секция.
+
+        links са двойките (href, текст) от PageFeatures.links.
+        """
+        site = _site_key(base_url)
+        base = urldefrag(base_url)[0]
+        best: Dict[str, Tuple[int, str]] = {}
+
+        for href, text in links:
+            href = href.strip()
+            if not href or href.startswith(('#', 'mailto:', 'javascript:', 'tel:')):
+                continue
+
+            absolute = urldefrag(urljoin(base_url, href))[0]
+            parsed = urlparse(absolute)
+            if parsed.scheme not in ('http', 'https') or _site_key(absolute) != site:
+                continue
+            if absolute == base or parsed.path.lower().endswith(SKIPPED_EXTENSIONS):
+                continue
+
+            if len(text) > 80:
+                continue
+
+            for section in SECTION_KEYWORDS:
+                score = self._score_link(section, text, absolute)
+                if score >= 2 and score > best.get(section, (0, ''))[0]:
+                    best[section] = (score, absolute)
+
+        # Една и съща страница (напр. OJS "About") може да покрива няколко секции
+        section_links = []
+        seen = set()
+        for section in SECTION_KEYWORDS:
+            if section in best and best[section][1] not in seen:
+                seen.add(best[section][1])
+                section_links.append((section, best[section][1]))
+        return section_links[:self.max_pages]
+
+    def _fetch(self, url: str, deadline: float):
+        """Изтегля страницата с timeout до края на бюджета; не започва след него"""
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise TimeoutError('timeout')
+        return self.fetch_page(url, timeout=remaining)
+
+    def crawl(self, links: List[Tuple[str, str]], base_url: str) -> List[Dict]:
+        """Изтегля свързаните страници паралелно.
+
+        Връща списък с {'section', 'url', 'page'} или {'section', 'url', 'error'}
+        за всяка опитана страница; пропуснатите заради бюджета са с error='timeout'.
+        """
+        section_links = self.find_section_links(links, base_url)
+        if not section_links:
+            return []
+
+        deadline = time.monotonic() + self.time_budget
+        results = []
+        executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='site-crawler')
+        try:
+            futures = {
+                executor.submit(self._fetch, url, deadline): (section, url)
+                for section, url in section_links
+            }
+            pending = set(futures)
+            while pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+                for future in done:
+                    section, url = futures[future]
+                    try:
+                        results.append({'section': section, 'url': url, 'page': future.result()})
+                    except Exception as e:
+                        logger.info(f"Неуспешно изтегляне на {url}: {e}")
+                        results.append({'section': section, 'url': url, 'error': str(e)})
+
+            for future in pending:
+                section, url = futures[future]
+                results.append({'section': section, 'url': url, 'error': 'timeout'})
+        finally:
+            # Не чакаме бавните заявки - timeout-ът им изтича с бюджета
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        # Редът на връзките, а не на завършване - сливането на данните е детерминирано
+        order = {url: index for index, (_, url) in enumerate(section_links)}
+        results.sort(key=lambda result: order[result['url']])
+        return results
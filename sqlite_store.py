@@ -0,0 +1,51 @@
+"""
+Обща основа за малките SQLite хранилища, споделени между gunicorn worker-ите
+"""
+
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+from config import Config
+
+
+class SQLiteStore:
+    """SQLite файл с по една връзка на нишка и WAL режим.
+
+    Наследниците задават SCHEMA (изпълнява се веднъж при създаване).
+    """
+
+    SCHEMA = ''
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self.transaction() as conn:
+            conn.executescript(self.SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        # Връзките не се наследяват след fork
+        if conn is None or getattr(self._local, 'pid', None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=Config.SQLITE_BUSY_TIMEOUT)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    @contextmanager
+    def transaction(self):
+        """Връзка за текущата нишка; commit при успех, rollback при грешка"""
+        conn = self._connect()
+        with conn:
+            yield conn
+
+
+def data_path(filename: str) -> str:
+    """Път до файл в DATA_DIR"""
+    return os.path.join(Config.DATA_DIR, filename)
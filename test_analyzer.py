@@ -6,12 +6,54 @@ import unittest
 from unittest.mock import Mock, patch
 import sys
 import os
+import re
+import time
+import tempfile
+import json
+import threading
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from bs4 import BeautifulSoup
 
 # Добавяме текущата директория към Python path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+# SQLite хранилищата на app (кеш, lease-ове, задачи) - във временна директория, а не в работното дърво
+os.environ.setdefault('DATA_DIR', tempfile.mkdtemp(prefix='scopus-analyzer-tests-'))
 
+import app as app_module
 from app import ScopusJournalAnalyzer
+from config import Config
 from scopus_api import ScopusAPIClient, ScopusEnhancer
+from http_client import HTTPClient, FetchedPage, get_http_client
+from http_cache import HTTPCache
+from batch_analyzer import BatchAnalyzer
+from site_crawler import SiteCrawler
+from page_features import collect_features, MEMBER_PATTERN
+from keyword_matcher import KeywordMatcher
+from result_cache import ResultCache, canonical_url
+from single_flight import LeaseStore, SingleFlight
+from jobs import JobRunner, JobStore
+from scopus_rate_limit import QuotaTracker, RateLimiter, TokenBucket, backoff_delay, retry_after
+from scopus_sources import SourceIndex, normalize_issn, normalize_title
+from scopus_cache import ScopusResponseCache, cache_key
+from scopus_metrics import JournalMetrics, parse_serial_title
+from scopus_enrichment import ScopusEnrichment
+from scopus_keys import APIKeyPool, KeyUsageStore, key_id
+from batch_scoring import HAVE_NUMPY, BatchScorer, feature_matrix
+from benchmark_scoring import sample_journals
+from title_matcher import TitleIndex, best_match, query_terms, title_key, transliterate
+from html_parsers import HAVE_LXML, HAVE_SELECTOLAX, available_backends, parse_features, resolve_backend
+from benchmark_extraction import SAMPLE_PAGE, build_large_page, legacy_extract
+from browser_pool import BrowserPool, wait_until_ready
+from render_policy import RenderPolicy, RenderPolicyStore, RENDER_FIRST, SKIP_RENDER, ESCALATE
+
+def _mock_response(status, headers, content=b''):
+    """Mock на stream=True отговор от HTTP клиента"""
+    response = Mock(status_code=status, headers=headers)
+    response.iter_content.side_effect = lambda chunk_size: (
+        content[i:i + chunk_size] for i in range(0, len(content), chunk_size)
+    )
+    return response
 
 class TestScopusJournalAnalyzer(unittest.TestCase):
     """Тестове за основния анализатор"""
@@ -217,6 +259,2148 @@ class TestScopusEnhancer(unittest.TestCase):
         self.assertLessEqual(result['compatibility_score'], 100)
         self.assertIsInstance(result['compatibility_factors'], list)
 
+class TestHTTPClient(unittest.TestCase):
+    """Тестове за споделения HTTP транспорт"""
+    
+    def test_shared_client_is_reused(self):
+        """Тест дали анализаторът и Scopus клиентът делят един pool"""
+        self.assertIs(get_http_client(), get_http_client())
+        self.assertIs(ScopusJournalAnalyzer().http, ScopusAPIClient().http)
+    
+    def test_pool_configuration(self):
+        """Тест за размера на connection pool-а"""
+        client = HTTPClient(pool_connections=3, pool_maxsize=7, connect_timeout=2, read_timeout=9)
+        adapter = client.session.get_adapter('https://example.com/')
+        self.assertEqual(adapter._pool_connections, 3)
+        self.assertEqual(adapter._pool_maxsize, 7)
+        self.assertEqual(client.timeout, (2, 9))
+        client.close()
+    
+    def test_extract_uses_injected_client(self):
+        """Тест дали extract_journal_data минава през HTTP клиента"""
+        response = _mock_response(200, {}, b'<html><head><title>Injected Journal</title></head><body></body></html>')
+        http = Mock()
+        http.get.return_value = response
+        
+        with tempfile.TemporaryDirectory() as cache_dir:
+            analyzer = ScopusJournalAnalyzer(http_client=http, page_cache=HTTPCache(cache_dir))
+            journal_data = analyzer.extract_journal_data('https://example.com/journal')
+        
+        http.get.assert_called_once()
+        self.assertEqual(journal_data['title'], 'Injected Journal')
+        self.assertEqual(journal_data['fetch_info']['cache'], 'miss')
+    
+    def test_extract_without_cache(self):
+        """Тест без HTTP кеш"""
+        response = _mock_response(200, {}, b'<html><head><title>Injected Journal</title></head><body></body></html>')
+        http = Mock()
+        http.get.return_value = response
+        
+        with patch('app.Config.HTTP_CACHE_ENABLED', False):
+            analyzer = ScopusJournalAnalyzer(http_client=http)
+        journal_data = analyzer.extract_journal_data('https://example.com/journal')
+        
+        http.get.assert_called_once()
+        self.assertEqual(journal_data['title'], 'Injected Journal')
+        self.assertIsNone(journal_data['fetch_info']['cache'])
+
+class TestHTTPCache(unittest.TestCase):
+    """Тестове за HTTP кеша с условни заявки"""
+    
+    PAGE = b'<html><head><title>Cached Journal</title></head><body>ISSN: 1234-5678</body></html>'
+    URL = 'https://example.com/journal'
+    
+    def setUp(self):
+        """Временна директория за кеша"""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = HTTPCache(self.tmp.name, default_ttl=0)
+        self.http = Mock()
+        self.analyzer = ScopusJournalAnalyzer(http_client=self.http, page_cache=self.cache)
+    
+    def tearDown(self):
+        self.tmp.cleanup()
+    
+    def test_not_modified_served_from_cache(self):
+        """Тест за 304 отговор и изпращане на валидаторите"""
+        self.http.get.side_effect = [
+            _mock_response(200, {'etag': '"v1"', 'last-modified': 'Mon, 06 Oct 2025 10:00:00 GMT',
+                                 'cache-control': 'no-cache'}, self.PAGE),
+            _mock_response(304, {'etag': '"v1"'})
+        ]
+        
+        first = self.analyzer.fetch_page(self.URL)
+        second = self.analyzer.fetch_page(self.URL)
+        
+        self.assertEqual(first.cache_status, 'miss')
+        self.assertEqual(second.cache_status, 'revalidated')
+        self.assertEqual(second.content, self.PAGE)
+        sent_headers = self.http.get.call_args_list[1][1]['headers']
+        self.assertEqual(sent_headers['If-None-Match'], '"v1"')
+        self.assertEqual(sent_headers['If-Modified-Since'], 'Mon, 06 Oct 2025 10:00:00 GMT')
+    
+    def test_fresh_entry_skips_network(self):
+        """Тест дали пресен запис (max-age) не прави заявка"""
+        self.http.get.return_value = _mock_response(200, {'cache-control': 'public, max-age=3600'}, self.PAGE)
+        
+        self.analyzer.fetch_page(self.URL)
+        page = self.analyzer.fetch_page(self.URL)
+        
+        self.assertEqual(self.http.get.call_count, 1)
+        self.assertEqual(page.cache_status, 'fresh')
+    
+    def test_no_store_is_not_cached(self):
+        """Тест за Cache-Control: no-store"""
+        self.http.get.return_value = _mock_response(200, {'cache-control': 'no-store', 'etag': '"x"'}, self.PAGE)
+        
+        self.analyzer.fetch_page(self.URL)
+        
+        self.assertIsNone(self.cache.get(self.URL))
+    
+    def test_expires_lifetime(self):
+        """Тест за свежест от Expires спрямо Date"""
+        lifetime = self.cache.freshness_lifetime({
+            'date': 'Mon, 06 Oct 2025 10:00:00 GMT',
+            'expires': 'Mon, 06 Oct 2025 11:00:00 GMT'
+        }, time.time())
+        self.assertEqual(lifetime, 3600)
+
+class TestStreamingDownload(unittest.TestCase):
+    """Тестове за ограниченото по размер изтегляне"""
+    
+    def setUp(self):
+        """Анализатор без HTTP кеш"""
+        self.http = Mock()
+        with patch('app.Config.HTTP_CACHE_ENABLED', False):
+            self.analyzer = ScopusJournalAnalyzer(http_client=self.http)
+    
+    def test_oversized_page_is_truncated(self):
+        """Тест дали изтеглянето спира при лимита и това се записва"""
+        body = b'<html><head><title>Huge Journal</title></head><body>' + b'x' * 10000
+        response = _mock_response(200, {'content-type': 'text/html; charset=utf-8'}, body)
+        self.http.get.return_value = response
+        
+        with patch('app.Config.MAX_PAGE_BYTES', 4096), patch('app.Config.PAGE_CHUNK_SIZE', 1024):
+            journal_data = self.analyzer.extract_journal_data('https://example.com/huge')
+        
+        self.assertTrue(journal_data['fetch_info']['truncated'])
+        self.assertEqual(journal_data['fetch_info']['bytes'], 4096)
+        self.assertEqual(journal_data['title'], 'Huge Journal')
+        self.assertTrue(self.http.get.call_args[1]['stream'])
+        response.close.assert_called_once()
+    
+    def test_endless_stream_is_aborted(self):
+        """Тест дали безкраен поток се прекъсва след лимита"""
+        def endless(chunk_size):
+            while True:
+                yield b'a' * chunk_size
+        response = Mock(status_code=200, headers={'content-type': 'text/html'})
+        response.iter_content.side_effect = endless
+        self.http.get.return_value = response
+        
+        with patch('app.Config.MAX_PAGE_BYTES', 100000):
+            page = self.analyzer.fetch_page('https://example.com/stream')
+        
+        self.assertTrue(page.truncated)
+        self.assertEqual(len(page.content), 100000)
+    
+    def test_non_html_rejected_before_body(self):
+        """Тест дали PDF отговор се отказва без да се чете тялото"""
+        response = _mock_response(200, {'content-type': 'application/pdf'}, b'%PDF-1.7')
+        self.http.get.return_value = response
+        
+        journal_data = self.analyzer.extract_journal_data('https://example.com/file.pdf')
+        
+        self.assertIn('application/pdf', journal_data['error'])
+        response.iter_content.assert_not_called()
+        response.close.assert_called_once()
+
+class TestSiteCrawler(unittest.TestCase):
+    """Тестове за обхождането на свързаните страници"""
+    
+    HOME = '''<html><head><title>Journal of Crawling</title></head><body>
+        <nav><ul>
+            <li><a href="/about/editorialTeam">Editorial Board</a></li>
+            <li><a href="/policies#review">Peer Review Policy</a></li>
+            <li><a href="https://www.example.org/about">About the Journal</a></li>
+            <li><a href="https://other-site.com/editorial-board">Editorial Board</a></li>
+            <li><a href="mailto:editor@example.org">Contact</a></li>
+            <li><a href="/files/guide.pdf">Guide for Authors</a></li>
+        </ul></nav>
+        <h1>Journal of Crawling</h1>
+    </body></html>'''
+    
+    PAGES = {
+        'https://example.org/about/editorialTeam': '''<html><body>
+            <nav><li>Home Page</li></nav>
+            <main><h2>Editorial Board</h2><ul>
+                <li>Prof. John Smith, University of Cambridge</li>
+                <li>Dr. Ivan Petrov, Sofia University</li>
+            </ul></main></body></html>''',
+        'https://example.org/policies': '''<html><body>
+            <p>All papers undergo double blind peer review within 4 weeks.</p>
+            <p>ISSN: 2345-6789</p></body></html>''',
+        'https://www.example.org/about': '''<html><body>
+            <div class="about">An international open access journal on web crawling.</div></body></html>'''
+    }
+    
+    def setUp(self):
+        """Анализатор с фалшиво изтегляне по URL"""
+        self.fetched = []
+        self.timeouts = []
+        
+        def fake_fetch(url, timeout=None):
+            self.fetched.append(url)
+            self.timeouts.append(timeout)
+            if url == 'https://example.org/':
+                return FetchedPage(url, self.HOME.encode('utf-8'))
+            return FetchedPage(url, self.PAGES[url].encode('utf-8'))
+        
+        with patch('app.Config.HTTP_CACHE_ENABLED', False):
+            self.analyzer = ScopusJournalAnalyzer(http_client=Mock())
+        self.analyzer.fetch_page = fake_fetch
+        self.analyzer.crawler = SiteCrawler(fake_fetch, max_pages=5, time_budget=5)
+    
+    def test_finds_same_site_section_links(self):
+        """Тест дали се избират само вътрешни HTML връзки към секциите"""
+        features = collect_features(BeautifulSoup(self.HOME, 'html.parser'))
+        links = self.analyzer.crawler.find_section_links(features.links, 'https://example.org/')
+        
+        self.assertEqual(dict(links), {
+            'editorial_board': 'https://example.org/about/editorialTeam',
+            'peer_review': 'https://example.org/policies',
+            'about': 'https://www.example.org/about'
+        })
+    
+    def test_crawled_pages_are_merged(self):
+        """Тест за сливането на данните от свързаните страници"""
+        journal_data = self.analyzer.extract_journal_data('https://example.org/')
+        
+        self.assertEqual(journal_data['title'], 'Journal of Crawling')
+        self.assertIn('Prof. John Smith, University of Cambridge', journal_data['editorial_board'])
+        self.assertIn('Dr. Ivan Petrov, Sofia University', journal_data['editorial_board'])
+        self.assertNotIn('Home Page', journal_data['editorial_board'])
+        self.assertIn('double blind', journal_data['peer_review_info'])
+        self.assertEqual(journal_data['issn'], '2345-6789')
+        self.assertTrue(journal_data['open_access'])
+        self.assertEqual(len(journal_data['crawled_pages']), 3)
+        self.assertNotIn('https://other-site.com/editorial-board', self.fetched)
+    
+    def test_page_budget(self):
+        """Тест за лимита на броя страници"""
+        self.analyzer.crawler.max_pages = 1
+        
+        journal_data = self.analyzer.extract_journal_data('https://example.org/')
+        
+        self.assertEqual(len(journal_data['crawled_pages']), 1)
+        self.assertEqual(journal_data['crawled_pages'][0]['section'], 'editorial_board')
+    
+    def test_fetches_are_bounded_by_budget(self):
+        """Тест дали всяко изтегляне получава timeout до края на бюджета"""
+        self.analyzer.extract_journal_data('https://example.org/')
+        
+        crawl_timeouts = self.timeouts[1:]
+        self.assertEqual(len(crawl_timeouts), 3)
+        self.assertTrue(all(0 < timeout <= 5 for timeout in crawl_timeouts))
+    
+    def test_fetch_timeout_reaches_http_client(self):
+        """Тест дали timeout-ът на обхождането скъсява HTTP timeout-ите"""
+        http = Mock(timeout=(10, 30))
+        http.get.return_value = Mock(status_code=200, headers={'content-type': 'text/html'},
+                                     iter_content=Mock(return_value=[b'<html></html>']))
+        with patch('app.Config.HTTP_CACHE_ENABLED', False):
+            analyzer = ScopusJournalAnalyzer(http_client=http)
+        
+        analyzer.fetch_page('https://example.org/about', timeout=2.5)
+        
+        self.assertEqual(http.get.call_args.kwargs['timeout'], (2.5, 2.5))
+    
+    def test_no_fetch_after_budget(self):
+        """Тест дали страница, стигнала до нишка след края на бюджета, не се изтегля"""
+        crawler = SiteCrawler(Mock(), time_budget=5)
+        
+        with self.assertRaises(TimeoutError):
+            crawler._fetch('https://example.org/about', time.monotonic() - 1)
+        crawler.fetch_page.assert_not_called()
+
+class FakeDriver:
+    """WebDriver заместител за тестовете на пула"""
+    
+    def __init__(self, growth_steps=0, selectors_present=False):
+        self.alive = True
+        self.quit_called = False
+        self.visited = []
+        self.page_source = '<html><body><h1>Rendered Journal</h1></body></html>'
+        self.growth_steps = growth_steps
+        self.selectors_present = selectors_present
+        self.element_count = 10
+    
+    def get(self, url):
+        self.visited.append(url)
+    
+    def execute_script(self, script, *args):
+        if not self.alive:
+            raise RuntimeError('browser crashed')
+        if script == 'return 1':
+            return 1
+        if 'readyState' in script:
+            return 'complete'
+        if 'querySelector' in script:
+            return self.selectors_present
+        if 'getElementsByTagName' in script:
+            if self.growth_steps > 0:
+                self.growth_steps -= 1
+                self.element_count += 5
+            return self.element_count
+        return None
+    
+    def delete_all_cookies(self):
+        pass
+    
+    def quit(self):
+        self.quit_called = True
+
+class TestBrowserPool(unittest.TestCase):
+    """Тестове за пула от браузъри"""
+    
+    def setUp(self):
+        """Пул с фалшиви браузъри"""
+        self.created = []
+        
+        def factory():
+            driver = FakeDriver()
+            self.created.append(driver)
+            return driver
+        
+        self.pool = BrowserPool(size=2, max_pages=3, max_memory_mb=1000,
+                                acquire_timeout=0.2, driver_factory=factory)
+    
+    def tearDown(self):
+        self.pool.close()
+    
+    def test_browsers_are_reused(self):
+        """Тест дали един браузър обслужва няколко страници"""
+        self.pool.warm_up(1)
+        with patch('browser_pool.Config.BROWSER_STABLE_INTERVAL', 0.01):
+            html = self.pool.render('https://example.com/a')
+            self.pool.render('https://example.com/b')
+        
+        self.assertIn('Rendered Journal', html)
+        self.assertEqual(len(self.created), 1)
+        self.assertEqual(self.created[0].visited, ['https://example.com/a', 'https://example.com/b'])
+    
+    def test_recycled_after_max_pages(self):
+        """Тест за рестартиране след max_pages страници"""
+        for _ in range(3):
+            with self.pool.lease():
+                pass
+        
+        self.assertTrue(self.created[0].quit_called)
+    
+    def test_recycled_over_memory_threshold(self):
+        """Тест за рестартиране при голяма памет"""
+        with patch.object(self.pool, '_memory_mb', return_value=2048):
+            with self.pool.lease():
+                pass
+        
+        self.assertTrue(self.created[0].quit_called)
+    
+    def test_unhealthy_browser_is_replaced(self):
+        """Тест за health check преди отдаване"""
+        self.pool.warm_up(1)
+        self.created[0].alive = False
+        
+        with self.pool.lease() as driver:
+            self.assertIs(driver, self.created[1])
+        self.assertTrue(self.created[0].quit_called)
+    
+    def test_pool_is_bounded(self):
+        """Тест дали пулът не стартира повече от size браузъра"""
+        with self.pool.lease(), self.pool.lease():
+            with self.assertRaises(TimeoutError):
+                with self.pool.lease():
+                    pass
+        self.assertEqual(len(self.created), 2)
+    
+    def test_wait_until_ready(self):
+        """Тест за изчакване на селектори и стабилен DOM"""
+        with patch('browser_pool.Config.BROWSER_STABLE_INTERVAL', 0.01):
+            self.assertEqual(wait_until_ready(FakeDriver(selectors_present=True), ['.editorial-board'], 1), 'selectors')
+            growing = FakeDriver(growth_steps=3)
+            self.assertEqual(wait_until_ready(growing, ['.editorial-board'], 1), 'dom-stable')
+            self.assertEqual(growing.growth_steps, 0)
+
+class TestRenderPolicy(unittest.TestCase):
+    """Тестове за адаптивната ескалация към рендериране"""
+    
+    STATIC_PAGE = b'''<html><head><title>Dynamic Journal</title>
+        <script>window.React = {}; $.ajax('/board');</script></head>
+        <body><h1>Dynamic Journal</h1><p>ISSN: 1234-5678</p></body></html>'''
+    COMPLETE_PAGE = b'''<html><head><title>Static Journal</title>
+        <script>window.React = {};</script></head><body><h1>Static Journal</h1>
+        <p>ISSN: 1234-5678</p><p>We use double blind peer review.</p>
+        <div class="editorial-board"><li>Prof. John Smith, University of Cambridge</li></div></body></html>'''
+    RENDERED_PAGE = '''<html><body><h1>Dynamic Journal</h1><p>ISSN: 1234-5678</p>
+        <p>Manuscripts undergo peer review.</p>
+        <div class="editorial-board"><li>Dr. Jane Doe, Harvard University</li></div></body></html>'''
+    
+    def setUp(self):
+        """Анализатор с фалшив браузър и временна история"""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.policy = RenderPolicy(RenderPolicyStore(os.path.join(self.tmp.name, 'render.sqlite3')))
+        self.driver = FakeDriver(selectors_present=True)
+        self.driver.page_source = self.RENDERED_PAGE
+        self.pool = BrowserPool(size=1, driver_factory=lambda: self.driver)
+        self.http = Mock()
+        
+        with patch('app.Config.HTTP_CACHE_ENABLED', False), patch('app.Config.CRAWL_ENABLED', False):
+            self.analyzer = ScopusJournalAnalyzer(http_client=self.http, browser_pool=self.pool,
+                                                  render_policy=self.policy)
+        self.selenium = patch('app.HAVE_SELENIUM', True)
+        self.selenium.start()
+    
+    def tearDown(self):
+        self.selenium.stop()
+        self.pool.close()
+        self.tmp.cleanup()
+    
+    def test_renders_when_key_fields_missing(self):
+        """Тест за ескалация и запомняне, че рендерирането е помогнало"""
+        self.http.get.return_value = _mock_response(200, {'content-type': 'text/html'}, self.STATIC_PAGE)
+        
+        journal_data = self.analyzer.extract_journal_data('https://dynamic.example/')
+        
+        self.assertEqual(self.driver.visited, ['https://dynamic.example/'])
+        self.assertIn('Dr. Jane Doe, Harvard University', journal_data['editorial_board'])
+        self.assertTrue(journal_data['fetch_info']['rendered'])
+        self.assertEqual(self.policy.store.get('dynamic.example')['helpful'], 1)
+    
+    def test_complete_static_page_is_not_rendered(self):
+        """Тест дали скриптове с 'react'/'ajax' вече не предизвикват рендериране"""
+        self.http.get.return_value = _mock_response(200, {'content-type': 'text/html'}, self.COMPLETE_PAGE)
+        
+        journal_data = self.analyzer.extract_journal_data('https://static.example/')
+        
+        self.assertEqual(self.driver.visited, [])
+        self.assertFalse(journal_data['fetch_info']['rendered'])
+    
+    def test_host_where_rendering_never_helps_is_skipped(self):
+        """Тест за пропускане на браузъра според историята на хоста"""
+        for _ in range(2):
+            self.policy.store.record('useless.example', helpful=False)
+        self.http.get.return_value = _mock_response(200, {'content-type': 'text/html'}, self.STATIC_PAGE)
+        
+        self.analyzer.extract_journal_data('https://www.useless.example/')
+        
+        self.assertEqual(self.policy.host_mode('https://useless.example/'), SKIP_RENDER)
+        self.assertEqual(self.driver.visited, [])
+    
+    def test_known_javascript_host_renders_first(self):
+        """Тест за директно рендериране без статична заявка"""
+        for _ in range(2):
+            self.policy.store.record('dynamic.example', helpful=True)
+        
+        journal_data = self.analyzer.extract_journal_data('https://dynamic.example/')
+        
+        self.assertEqual(self.policy.host_mode('https://dynamic.example/'), RENDER_FIRST)
+        self.http.get.assert_not_called()
+        self.assertEqual(self.driver.visited, ['https://dynamic.example/'])
+        self.assertEqual(journal_data['issn'], '1234-5678')
+    
+    def test_stale_history_is_reevaluated(self):
+        """Тест за изтичане на историята"""
+        for _ in range(2):
+            self.policy.store.record('old.example', helpful=False)
+        self.policy.ttl = -1
+        
+        self.assertEqual(self.policy.host_mode('https://old.example/'), ESCALATE)
+
+class TestBatchAnalyzer(unittest.TestCase):
+    """Тестове за асинхронния групов анализ"""
+    
+    def setUp(self):
+        """Анализатор, чийто fetch_page само изчаква и брои паралелните заявки"""
+        self.analyzer = ScopusJournalAnalyzer(http_client=Mock())
+        self.lock = threading.Lock()
+        self.in_flight = {}
+        self.max_seen = {'total': 0}
+        self.delays = {}
+        
+        self.fetched = []
+        
+        def fake_fetch(url):
+            host = url.split('/')[2]
+            self.fetched.append(url)
+            with self.lock:
+                self.in_flight[host] = self.in_flight.get(host, 0) + 1
+                total = sum(self.in_flight.values())
+                self.max_seen['total'] = max(self.max_seen['total'], total)
+                self.max_seen[host] = max(self.max_seen.get(host, 0), self.in_flight[host])
+            time.sleep(self.delays.get(url, 0.02))
+            with self.lock:
+                self.in_flight[host] -= 1
+            return FetchedPage(url, b'<html><head><title>Batch Journal</title></head><body>ISSN: 1234-5678</body></html>')
+        
+        self.analyzer.fetch_page = fake_fetch
+    
+    def test_limits_are_respected(self):
+        """Тест за глобалния и per-host лимит"""
+        urls = [f'https://host{i % 3}.example/j/{i}' for i in range(30)]
+        batch = BatchAnalyzer(self.analyzer, max_concurrency=5, per_host_limit=2)
+        
+        results = batch.run(urls)
+        
+        self.assertEqual(len(results), 30)
+        self.assertEqual(sorted(r['url'] for r in results), sorted(urls))
+        self.assertLessEqual(self.max_seen['total'], 5)
+        for host in ('host0.example', 'host1.example', 'host2.example'):
+            self.assertLessEqual(self.max_seen[host], 2)
+        self.assertTrue(all(r['readiness_analysis']['total_score'] > 0 for r in results))
+    
+    def test_results_in_completion_order(self):
+        """Тест дали бързите анализи се връщат преди бавните"""
+        self.delays = {'https://slow.example/': 0.3}
+        batch = BatchAnalyzer(self.analyzer, max_concurrency=4, per_host_limit=2)
+        
+        results = batch.run(['https://slow.example/', 'https://fast.example/a', 'https://fast.example/b'])
+        
+        self.assertEqual(results[-1]['url'], 'https://slow.example/')
+    
+    def test_errors_are_reported_per_url(self):
+        """Тест дали грешка в един URL не спира групата"""
+        def failing_fetch(url):
+            raise ConnectionError('refused')
+        self.analyzer.fetch_page = failing_fetch
+        
+        results = BatchAnalyzer(self.analyzer, max_concurrency=2).run(['https://down.example/'])
+        
+        self.assertEqual(results[0]['error'], 'refused')
+    
+    def test_host_limit_covers_crawling(self):
+        """Тест дали свързаните страници се изтеглят в слота на хоста"""
+        home = FetchedPage('', b'<html><body><h1>Crawled Journal</h1>'
+                               b'<a href="/editorial-board">Editorial Board</a></body></html>')
+        fetch = self.analyzer.fetch_page
+        
+        def fetch_with_links(url, timeout=None):
+            page = fetch(url)
+            return FetchedPage(url, home.content) if not url.endswith('/editorial-board') else page
+        
+        self.analyzer.fetch_page = fetch_with_links
+        self.analyzer.crawler = SiteCrawler(fetch_with_links, max_pages=1, time_budget=5)
+        urls = [f'https://host{i % 2}.example/j/{i}' for i in range(8)]
+        
+        with patch('app.HAVE_SELENIUM', False):
+            results = BatchAnalyzer(self.analyzer, max_concurrency=4, per_host_limit=1).run(urls)
+        
+        self.assertEqual(len(self.fetched), 16)
+        self.assertTrue(all(len(r['journal_data']['crawled_pages']) == 1 for r in results))
+        self.assertLessEqual(self.max_seen['host0.example'], 1)
+        self.assertLessEqual(self.max_seen['host1.example'], 1)
+    
+    def test_stream_yields_all_results(self):
+        """Тест за синхронния поточен генератор"""
+        urls = [f'https://host{i % 4}.example/j/{i}' for i in range(20)]
+        
+        results = list(BatchAnalyzer(self.analyzer, max_concurrency=3, per_host_limit=1).stream(iter(urls)))
+        
+        self.assertEqual(sorted(r['url'] for r in results), sorted(urls))
+        self.assertLessEqual(self.max_seen['total'], 3)
+    
+    def test_stream_stops_when_closed(self):
+        """Тест дали затвореният генератор (прекъсната връзка) спира новите анализи"""
+        urls = [f'https://host.example/j/{i}' for i in range(200)]
+        stream = BatchAnalyzer(self.analyzer, max_concurrency=2, per_host_limit=2).stream(iter(urls))
+        
+        next(stream)
+        stream.close()
+        time.sleep(0.2)
+        started = len(self.fetched)
+        time.sleep(0.2)
+        
+        self.assertLess(started, 20)
+        self.assertEqual(len(self.fetched), started)
+    
+    def test_batch_endpoint_streams_ndjson(self):
+        """Тест за POST /analyze/batch - по един JSON ред за всеки URL"""
+        client = app_module.app.test_client()
+        with patch.object(app_module.analyzer, 'load_page', side_effect=self.analyzer.fetch_page), \
+                patch('app.Config.CRAWL_ENABLED', False), patch('app.HAVE_SELENIUM', False):
+            response = client.post('/analyze/batch', json={'urls': ['a.example/1', 'https://b.example/2']})
+            lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+        
+        self.assertEqual(response.mimetype, 'application/x-ndjson')
+        self.assertEqual(sorted(line['url'] for line in lines), ['https://a.example/1', 'https://b.example/2'])
+        for line in lines:
+            self.assertEqual(line['journal_data']['title'], 'Batch Journal')
+            self.assertIn('total_score', line['readiness_analysis'])
+    
+    def test_batch_endpoint_validation(self):
+        """Тест за празен и прекалено голям списък"""
+        client = app_module.app.test_client()
+        
+        self.assertEqual(client.post('/analyze/batch', json={'urls': []}).status_code, 400)
+        with patch('app.Config.BATCH_MAX_URLS', 2):
+            response = client.post('/analyze/batch', json={'urls': ['a', 'b', 'c']})
+        self.assertEqual(response.status_code, 413)
+
+class TestPageFeatures(unittest.TestCase):
+    """Тестове за еднократното обхождане спрямо предишното извличане"""
+    
+    def setUp(self):
+        self.analyzer = ScopusJournalAnalyzer(http_client=Mock(), parser_backend='html.parser')
+        self.url = 'https://example.com/journal'
+    
+    def assert_parity(self, html):
+        legacy = legacy_extract(BeautifulSoup(html, 'html.parser'), self.url)
+        data, features = self.analyzer._extract_page_data(html.encode('utf-8'), self.url)
+        
+        for field in ('title', 'description', 'issn', 'doi_prefix', 'peer_review_info',
+                      'publication_frequency', 'open_access', 'languages'):
+            self.assertEqual(data.get(field), legacy.get(field), field)
+        self.assertEqual(sorted(data['editorial_board']), sorted(legacy['editorial_board']))
+        self.assertEqual(features.links, legacy['links'])
+    
+    def test_sample_page_parity(self):
+        """Тест за еднакви резултати на примерната страница"""
+        self.assert_parity(SAMPLE_PAGE)
+    
+    def test_large_page_parity(self):
+        """Тест за еднакви резултати на голяма страница"""
+        self.assert_parity(build_large_page(50))
+    
+    def test_text_matches_get_text(self):
+        """Тест дали събраният текст съвпада с soup.get_text()"""
+        soup = BeautifulSoup(SAMPLE_PAGE, 'html.parser')
+        
+        self.assertEqual(collect_features(soup).text, soup.get_text())
+    
+    def test_nested_sections(self):
+        """Тест за член, който е едновременно в две секции на съвета"""
+        html = ('<div class="editorial-board"><div class="editors">'
+                '<p>Anna Smith</p></div><p>John Brown</p></div>')
+        
+        soup = BeautifulSoup(html, 'html.parser')
+        
+        features = collect_features(soup)
+        
+        for selector in ('.editorial-board', '.editors'):
+            expected = [m.get_text(strip=True) for m in soup.select_one(selector).find_all(
+                ['li', 'p', 'div'], string=MEMBER_PATTERN)]
+            self.assertEqual(features.board_sections[selector], expected)
+        self.assertIn('John Brown', features.board_sections['.editorial-board'])
+        self.assertNotIn('John Brown', features.board_sections['.editors'])
+
+class TestParserBackends(unittest.TestCase):
+    """Тестове за еднаквите journal_data с различните HTML парсери"""
+    
+    CYRILLIC_PAGE = '''<html><head><meta charset="windows-1251"><title>Български журнал</title></head>
+        <body><main><h1>Български журнал</h1><ul><li>Иван Петров</li><li>Мария Иванова</li></ul>
+        <p>ISSN: 1311-0000. Всички статии минават double blind peer review.</p></main></body></html>'''
+    
+    def analyze(self, backend, url, pages):
+        """Пълен анализ (с обхождане на свързаните страници) с дадения парсер"""
+        def fake_fetch(page_url, timeout=None):
+            return FetchedPage(page_url, pages[page_url])
+        
+        with patch('app.Config.HTTP_CACHE_ENABLED', False):
+            analyzer = ScopusJournalAnalyzer(http_client=Mock(), parser_backend=backend)
+        analyzer.fetch_page = fake_fetch
+        analyzer.crawler = SiteCrawler(fake_fetch, max_pages=5, time_budget=5, max_workers=1)
+        with patch('app.HAVE_SELENIUM', False):
+            journal_data = analyzer.extract_journal_data(url)
+        journal_data.pop('analysis_timestamp')
+        return journal_data
+    
+    def corpus(self):
+        crawl_pages = {url: html.encode('utf-8') for url, html in TestSiteCrawler.PAGES.items()}
+        crawl_pages['https://example.org/'] = TestSiteCrawler.HOME.encode('utf-8')
+        return [
+            ('https://example.com/journal', {'https://example.com/journal': SAMPLE_PAGE.encode('utf-8')}),
+            ('https://example.com/archive', {'https://example.com/archive': build_large_page(30).encode('utf-8')}),
+            ('https://example.org/', crawl_pages),
+            ('https://example.bg/', {'https://example.bg/': self.CYRILLIC_PAGE.encode('cp1251')}),
+        ]
+    
+    def assert_backend_parity(self, backend):
+        for url, pages in self.corpus():
+            expected = self.analyze('html.parser', url, pages)
+            actual = self.analyze(backend, url, pages)
+            self.assertEqual(actual, expected, url)
+    
+    @unittest.skipUnless(HAVE_LXML, 'lxml не е инсталиран')
+    def test_lxml_parity(self):
+        """Тест за еднакви резултати с lxml"""
+        self.assert_backend_parity('lxml')
+    
+    @unittest.skipUnless(HAVE_SELECTOLAX, 'selectolax не е инсталиран')
+    def test_selectolax_parity(self):
+        """Тест за еднакви резултати със selectolax"""
+        self.assert_backend_parity('selectolax')
+    
+    def test_cyrillic_page_is_decoded(self):
+        """Тест за страница в windows-1251 с всеки наличен парсер"""
+        for backend in available_backends():
+            features = parse_features(self.CYRILLIC_PAGE.encode('cp1251'), backend)
+            self.assertEqual(features.title_candidates['h1'], 'Български журнал', backend)
+            self.assertIn('Иван Петров', features.board_page_members, backend)
+    
+    def test_resolve_backend(self):
+        """Тест за избора на парсер и връщането към html.parser"""
+        self.assertEqual(resolve_backend('auto'), available_backends()[0])
+        self.assertEqual(resolve_backend('html.parser'), 'html.parser')
+        self.assertEqual(resolve_backend('no-such-parser'), 'html.parser')
+        with patch('html_parsers.HAVE_SELECTOLAX', False), patch('html_parsers.HAVE_LXML', False):
+            self.assertEqual(resolve_backend('auto'), 'html.parser')
+            self.assertEqual(resolve_backend('selectolax'), 'html.parser')
+
+class TestKeywordMatcher(unittest.TestCase):
+    """Тестове за компилираното търсене на ключови думи"""
+    
+    KEYWORDS = ['peer review', 'review', 'review process', 'annual', 'biannual', 'dr.', 'md', 'cc by']
+    
+    def test_same_as_substring_checks(self):
+        """Тест за семантиката на `keyword in text.lower()`, вкл. припокриващи се думи"""
+        text = 'Biannual journal. Peer Review and review process by Dr. Smith (MD), CC BY; annual review.'
+        lowered = text.lower()
+        
+        hits = KeywordMatcher(self.KEYWORDS).scan(text)
+        
+        for keyword in self.KEYWORDS:
+            expected = [i for i in range(len(lowered)) if lowered.startswith(keyword, i)]
+            self.assertEqual(hits.offsets.get(keyword, []), expected, keyword)
+        self.assertEqual(hits.count('review'), 3)
+        self.assertEqual(hits.count('annual'), 2)
+    
+    def test_helpers(self):
+        """Тест за first/any/found - редът е този на речника, а не на текста"""
+        hits = KeywordMatcher(['monthly', 'quarterly', 'annual']).scan('Annual issues, then quarterly.')
+        
+        self.assertEqual(hits.first(['monthly', 'quarterly', 'annual']), 'quarterly')
+        self.assertEqual(hits.found(['annual', 'monthly', 'quarterly']), ['annual', 'quarterly'])
+        self.assertTrue(hits.any(['monthly', 'annual']))
+        self.assertFalse(KeywordMatcher(['monthly']).scan('').any(['monthly']))
+    
+    def test_presence_only_scan(self):
+        """Тест дали positions=False намира същите думи само с първата позиция"""
+        text = 'Biannual journal. Peer Review and review process by Dr. Smith (MD), CC BY; annual review.'
+        matcher = KeywordMatcher(self.KEYWORDS)
+        full = matcher.scan(text)
+        
+        hits = matcher.scan(text, positions=False)
+        
+        self.assertEqual(hits.offsets, {keyword: offsets[:1] for keyword, offsets in full.offsets.items()})
+        self.assertEqual(hits.count('review'), 1)
+    
+    def test_peer_review_parents(self):
+        """Тест дали всеки низ с ключова дума дава родителя си веднъж"""
+        html = '<div><p>Peer review, peer review.</p><span>referee</span><!-- double blind --></div>'
+        soup = BeautifulSoup(html, 'html.parser')
+        
+        features = collect_features(soup)
+        
+        self.assertEqual(features.peer_review_snippets['peer review'], ['Peer review, peer review.'])
+        self.assertEqual(features.peer_review_snippets['referee'], ['referee'])
+        self.assertEqual(features.peer_review_snippets['double blind'], [soup.div.get_text(strip=True)])
+    
+    def test_peer_review_parents_when_lower_changes_length(self):
+        """Тест за позициите, когато lower() променя дължината на текста"""
+        soup = BeautifulSoup('<p>İİİ Universität</p><p>Referee reports</p>', 'html.parser')
+        
+        features = collect_features(soup)
+        
+        self.assertEqual(features.peer_review_snippets['referee'], ['Referee reports'])
+    
+    def test_scores_use_board_keywords(self):
+        """Тест за оценките по титли и афилиации на съвета"""
+        analyzer = ScopusJournalAnalyzer(http_client=Mock())
+        journal_data = {
+            'editorial_board': ['Prof. Anna Lee, Professor at Oxford University', 'Dr. Ivan Ivanov, Hospital', 'Jane Doe'],
+            'peer_review_info': 'Double blind peer review by two referees within 6 weeks',
+            'description': 'A GLOBAL journal'
+        }
+        
+        self.assertEqual(analyzer._calculate_editorial_standards(journal_data), 15 + 2 * 3 + 2 * 2)
+        self.assertEqual(analyzer._calculate_peer_review_score(journal_data), 3 * 15 + 20 + 10)
+        scope = analyzer._analyze_international_scope(journal_data)
+        self.assertEqual(scope['international_scope_score'], 2 * 5 + 10)
+
+class TestResultCache(unittest.TestCase):
+    """Тестове за кеша на готовите анализи"""
+    
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cache = ResultCache(os.path.join(self.tmp.name, 'results.sqlite3'), ttl=60, max_entries=2)
+    
+    def tearDown(self):
+        self.tmp.cleanup()
+    
+    def test_canonical_url(self):
+        """Тест за нормализирането на URL-а за ключ"""
+        self.assertEqual(canonical_url('HTTPS://Example.COM:443/Journal/?b=2&utm_source=x&a=1#top'),
+                         'https://example.com/Journal?a=1&b=2')
+        self.assertEqual(canonical_url('example.com'), 'https://example.com/')
+        self.assertEqual(canonical_url('http://example.com:8080/j/'), 'http://example.com:8080/j')
+        self.assertNotEqual(canonical_url('http://example.com/'), canonical_url('https://example.com/'))
+    
+    def test_ttl(self):
+        """Тест за изтичането на записите"""
+        self.cache.put('a', {'value': 1}, ttl=-1)
+        self.cache.put('b', {'value': 2})
+        
+        self.assertIsNone(self.cache.get('a'))
+        value, age = self.cache.get('b')
+        self.assertEqual(value, {'value': 2})
+        self.assertGreaterEqual(age, 0)
+    
+    def test_lru_eviction(self):
+        """Тест дали при препълване отпада най-отдавна ползваният запис"""
+        self.cache.put('a', {'value': 1})
+        time.sleep(0.01)
+        self.cache.put('b', {'value': 2})
+        time.sleep(0.01)
+        self.cache.get('a')
+        time.sleep(0.01)
+        self.cache.put('c', {'value': 3})
+        
+        self.assertIsNotNone(self.cache.get('a'))
+        self.assertIsNone(self.cache.get('b'))
+        self.assertIsNotNone(self.cache.get('c'))
+    
+    def test_shared_between_instances(self):
+        """Тест дали две инстанции (като два worker-а) виждат едни и същи записи"""
+        other = ResultCache(self.cache.path)
+        self.cache.put('shared', {'value': 1})
+        
+        self.assertEqual(other.get('shared')[0], {'value': 1})
+    
+    def test_analyze_route_reports_cache_hits(self):
+        """Тест за /analyze - вторият анализ на същия URL идва от кеша"""
+        calls = []
+        
+        def fake_extract(url, progress=None):
+            calls.append(url)
+            return {'url': url, 'title': 'Cached Journal', 'editorial_board': []}
+        
+        client = app_module.app.test_client()
+        with patch('app.result_cache', self.cache), \
+                patch.object(app_module.analyzer, 'extract_journal_data', side_effect=fake_extract):
+            first = client.post('/analyze', json={'url': 'example.com/journal/'}).get_json()
+            second = client.post('/analyze', json={'url': 'https://EXAMPLE.com/journal'}).get_json()
+        
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(first['cache'], {'hit': False, 'age': 0, 'coalesced': False})
+        self.assertTrue(second['cache']['hit'])
+        self.assertGreaterEqual(second['cache']['age'], 0)
+        self.assertEqual(second['journal_data']['title'], 'Cached Journal')
+    
+    def test_errors_are_not_cached(self):
+        """Тест дали неуспешен анализ не се записва в кеша"""
+        client = app_module.app.test_client()
+        with patch('app.result_cache', self.cache), \
+                patch.object(app_module.analyzer, 'extract_journal_data', return_value={'error': 'timeout'}):
+            response = client.post('/analyze', json={'url': 'https://down.example/'})
+        
+        self.assertEqual(response.status_code, 500)
+        self.assertIsNone(self.cache.get(canonical_url('https://down.example/')))
+
+class TestSingleFlight(unittest.TestCase):
+    """Тестове за обединяването на едновременните анализи"""
+    
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.leases = LeaseStore(os.path.join(self.tmp.name, 'leases.sqlite3'))
+    
+    def tearDown(self):
+        self.tmp.cleanup()
+    
+    def run_concurrently(self, func, count):
+        results = [None] * count
+        
+        def worker(index):
+            try:
+                results[index] = func()
+            except Exception as e:
+                results[index] = e
+        
+        threads = [threading.Thread(target=worker, args=(i,)) for i in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(5)
+        return results
+    
+    def test_duplicates_share_one_call(self):
+        """Тест дали едновременните заявки в процеса изпълняват задачата веднъж"""
+        flight = SingleFlight()
+        calls = []
+        
+        def slow():
+            calls.append(1)
+            time.sleep(0.2)
+            return {'value': 42}
+        
+        results = self.run_concurrently(lambda: flight.do('key', slow), 5)
+        
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(all(result[0] == {'value': 42} for result in results))
+        self.assertEqual(sorted(shared for _, shared in results), [False, True, True, True, True])
+    
+    def test_error_is_shared(self):
+        """Тест дали грешката на първата заявка стига и до чакащите"""
+        flight = SingleFlight()
+        
+        def failing():
+            time.sleep(0.1)
+            raise ConnectionError('refused')
+        
+        results = self.run_concurrently(lambda: flight.do('key', failing), 3)
+        
+        self.assertTrue(all(isinstance(result, ConnectionError) for result in results))
+        # След грешката ключът е свободен за нов опит
+        self.assertEqual(flight.do('key', lambda: 'ok'), ('ok', False))
+    
+    def test_follower_waits_for_full_run(self):
+        """Тест дали дубликатът чака целия анализ, а не само wait_timeout"""
+        flight = SingleFlight(wait_timeout=0.05, lease_ttl=1)
+        
+        def slow():
+            time.sleep(0.2)
+            return 'done'
+        
+        results = self.run_concurrently(lambda: flight.do('key', slow), 2)
+        
+        self.assertEqual(sorted(results), [('done', False), ('done', True)])
+    
+    def test_followers_receive_stages(self):
+        """Тест дали чакащите заявки получават етапите на общия анализ"""
+        flight = SingleFlight()
+        started = threading.Event()
+        release = threading.Event()
+        stages = {'leader': [], 'follower': []}
+        
+        def analysis(report):
+            report('extracted', {'title': 'Shared Journal'})
+            started.set()
+            release.wait(5)
+            report('scored')
+            return 'done'
+        
+        def run(name):
+            return flight.do_with_progress('key', analysis, progress=lambda stage, data: stages[name].append(stage))
+        
+        leader = threading.Thread(target=run, args=('leader',))
+        leader.start()
+        self.assertTrue(started.wait(5))
+        follower = threading.Thread(target=run, args=('follower',))
+        follower.start()
+        time.sleep(0.05)
+        release.set()
+        leader.join(5)
+        follower.join(5)
+        
+        self.assertEqual(stages['leader'], ['extracted', 'scored'])
+        self.assertEqual(stages['follower'], ['extracted', 'scored'])
+    
+    def test_other_process_waits_for_lease(self):
+        """Тест между два worker-а: вторият чете резултата на първия"""
+        first = SingleFlight(self.leases, poll_interval=0.02)
+        second = SingleFlight(self.leases, poll_interval=0.02)
+        shared_cache = {}
+        calls = []
+        
+        def analyze():
+            calls.append(1)
+            time.sleep(0.2)
+            shared_cache['key'] = {'value': 1}
+            return shared_cache['key']
+        
+        leader = threading.Thread(target=first.do, args=('key', analyze))
+        leader.start()
+        time.sleep(0.05)
+        result, shared = second.do('key', analyze, lookup=lambda: shared_cache.get('key'))
+        leader.join()
+        
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(shared)
+        self.assertEqual(result, {'value': 1})
+    
+    def test_expired_lease_is_taken_over(self):
+        """Тест дали lease на спрял worker се поема след изтичането му"""
+        self.assertTrue(self.leases.acquire('key', 'dead-worker', ttl=-1))
+        self.assertTrue(self.leases.acquire('key', 'alive-worker', ttl=60))
+        self.assertFalse(self.leases.acquire('key', 'third-worker', ttl=60))
+        
+        self.leases.release('key', 'alive-worker')
+        self.assertTrue(self.leases.acquire('key', 'third-worker', ttl=60))
+    
+    def test_analyze_route_coalesces_requests(self):
+        """Тест за /analyze - едновременните заявки за един URL правят един анализ"""
+        calls = []
+        
+        def fake_extract(url, progress=None):
+            calls.append(url)
+            time.sleep(0.2)
+            return {'url': url, 'title': 'Popular Journal', 'editorial_board': []}
+        
+        client = app_module.app.test_client()
+        cache = ResultCache(os.path.join(self.tmp.name, 'results.sqlite3'))
+        with patch('app.result_cache', cache), patch('app.single_flight', SingleFlight(self.leases)), \
+                patch.object(app_module.analyzer, 'extract_journal_data', side_effect=fake_extract):
+            responses = self.run_concurrently(
+                lambda: client.post('/analyze', json={'url': 'https://popular.example/'}).get_json(), 4)
+        
+        self.assertEqual(len(calls), 1)
+        # Само една заявка е анализирала; останалите са изчакали нея или са взели резултата от кеша
+        fresh = [r for r in responses if not r['cache']['hit'] and not r['cache']['coalesced']]
+        self.assertEqual(len(fresh), 1)
+        self.assertTrue(all(r['journal_data']['title'] == 'Popular Journal' for r in responses))
+
+class TestJobs(unittest.TestCase):
+    """Тестове за фоновите задачи за анализ"""
+    
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = JobStore(os.path.join(self.tmp.name, 'jobs.sqlite3'))
+        self.release = threading.Event()
+        
+        def execute(url, progress):
+            progress('extracted', {'title': 'Partial Journal'})
+            self.release.wait(5)
+            if 'fail' in url:
+                return {'error': 'refused'}
+            return {'journal_data': {'title': 'Final Journal'}, 'readiness_analysis': {'total_score': 50}}
+        
+        self.runner = JobRunner(execute, self.store, max_workers=2, queue_limit=2)
+        self.client = app_module.app.test_client()
+        self.patch = patch('app.job_runner', self.runner)
+        self.patch.start()
+    
+    def tearDown(self):
+        self.release.set()
+        self.patch.stop()
+        self.runner.shutdown()
+        self.tmp.cleanup()
+    
+    def wait_for(self, job_id, predicate):
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            job = self.client.get(f'/jobs/{job_id}').get_json()
+            if predicate(job):
+                return job
+            time.sleep(0.01)
+        self.fail(f'Задачата не достигна очакваното състояние: {job}')
+    
+    def test_job_lifecycle(self):
+        """Тест за POST /jobs и проследяването с GET /jobs/<id>"""
+        response = self.client.post('/jobs', json={'url': 'journal.example'})
+        self.assertEqual(response.status_code, 202)
+        job_id = response.get_json()['job_id']
+        self.assertEqual(response.get_json()['status_url'], f'/jobs/{job_id}')
+        
+        running = self.wait_for(job_id, lambda job: job.get('stage') == 'extracted')
+        self.assertEqual(running['status'], 'running')
+        self.assertTrue(running['partial'])
+        self.assertEqual(running['result']['journal_data']['title'], 'Partial Journal')
+        self.assertIsNone(running['result']['readiness_analysis'])
+        self.assertEqual(running['url'], 'https://journal.example')
+        
+        self.release.set()
+        done = self.wait_for(job_id, lambda job: job['status'] == 'done')
+        self.assertFalse(done['partial'])
+        self.assertEqual(done['result']['readiness_analysis']['total_score'], 50)
+    
+    def test_failed_job(self):
+        """Тест за задача, чийто анализ е неуспешен"""
+        self.release.set()
+        job_id = self.client.post('/jobs', json={'url': 'https://fail.example/'}).get_json()['job_id']
+        
+        job = self.wait_for(job_id, lambda job: job['status'] == 'error')
+        self.assertEqual(job['error'], 'refused')
+    
+    def test_status_write_failure_fails_job(self):
+        """Тест дали грешка при записа на статуса 'running' не оставя задачата в опашката"""
+        self.release.set()
+        update = self.store.update
+        
+        def failing_update(job_id, **fields):
+            if fields.get('status') == 'running':
+                raise sqlite3.OperationalError('database is locked')
+            return update(job_id, **fields)
+        
+        with patch.object(self.store, 'update', side_effect=failing_update):
+            job_id = self.client.post('/jobs', json={'url': 'https://journal.example/'}).get_json()['job_id']
+            job = self.wait_for(job_id, lambda job: job['status'] == 'error')
+        
+        self.assertEqual(job['error'], 'database is locked')
+    
+    def test_unrecorded_final_state_ends_waits(self):
+        """Тест дали незаписаното крайно състояние стига до wait, GET и SSE"""
+        self.release.set()
+        update, add_event = self.store.update, self.store.add_event
+        
+        def failing_update(job_id, **fields):
+            if fields.get('status') in ('done', 'error'):
+                raise sqlite3.OperationalError('disk I/O error')
+            return update(job_id, **fields)
+        
+        def failing_add_event(job_id, stage, data=None):
+            if stage in ('done', 'error'):
+                raise sqlite3.OperationalError('disk I/O error')
+            return add_event(job_id, stage, data)
+        
+        with patch.object(self.store, 'update', side_effect=failing_update), \
+                patch.object(self.store, 'add_event', side_effect=failing_add_event):
+            job_id = self.runner.submit('https://journal.example/')
+            job = self.runner.wait(job_id, 5)
+            events = self.read_events(job_id)
+            failed = self.runner.wait(self.runner.submit('https://fail.example/'), 5)
+        
+        self.assertEqual(job['status'], 'done')
+        self.assertEqual(job['result']['readiness_analysis']['total_score'], 50)
+        self.assertEqual(self.client.get(f'/jobs/{job_id}').get_json()['status'], 'done')
+        self.assertEqual([name for name, _, _ in events], ['stage', 'done'])
+        self.assertEqual(events[-1][1]['result']['journal_data']['title'], 'Final Journal')
+        self.assertEqual((failed['status'], failed['error']), ('error', 'refused'))
+    
+    def test_queue_limit(self):
+        """Тест за ограничената опашка"""
+        self.assertEqual(self.client.post('/jobs', json={'url': 'https://a.example/'}).status_code, 202)
+        self.assertEqual(self.client.post('/jobs', json={'url': 'https://b.example/'}).status_code, 202)
+        self.assertEqual(self.client.post('/jobs', json={'url': 'https://c.example/'}).status_code, 503)
+    
+    def test_unknown_job_and_missing_url(self):
+        """Тест за 404 и 400"""
+        self.assertEqual(self.client.get('/jobs/missing').status_code, 404)
+        self.assertEqual(self.client.post('/jobs', json={}).status_code, 400)
+    
+    def test_analyze_returns_job_after_deadline(self):
+        """Тест дали /analyze връща 202 и id на задачата, когато анализът е бавен"""
+        with patch('app.Config.ANALYZE_SYNC_TIMEOUT', 0.05), patch('app.result_cache', None):
+            response = self.client.post('/analyze', json={'url': 'https://slow.example/'})
+        
+        self.assertEqual(response.status_code, 202)
+        job_id = response.get_json()['job_id']
+        self.release.set()
+        self.assertEqual(self.wait_for(job_id, lambda job: job['status'] == 'done')['status'], 'done')
+    
+    def test_analyze_within_deadline(self):
+        """Тест дали бързият анализ се връща директно от /analyze"""
+        self.release.set()
+        with patch('app.result_cache', None):
+            response = self.client.post('/analyze', json={'url': 'https://fast.example/'})
+        
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()['journal_data']['title'], 'Final Journal')
+    
+    def test_analyzer_reports_stages(self):
+        """Тест за етапите, които анализаторът съобщава"""
+        stages = []
+        with patch('app.Config.HTTP_CACHE_ENABLED', False), patch('app.Config.CRAWL_ENABLED', False):
+            analyzer = ScopusJournalAnalyzer(http_client=Mock())
+        analyzer.fetch_page = lambda url: FetchedPage(url, b'<html><h1>Staged Journal</h1></html>')
+        
+        with patch('app.HAVE_SELENIUM', False):
+            analyzer.extract_journal_data('https://staged.example/', lambda stage, data: stages.append(stage))
+        
+        self.assertEqual(stages, ['fetching', 'fetched', 'extracting', 'extracted'])
+    
+    def read_events(self, job_id, headers=None):
+        """Чете SSE потока до края - (име, данни, id) за всяко събитие"""
+        with patch('app.Config.JOB_EVENTS_POLL_INTERVAL', 0.01):
+            response = self.client.get(f'/jobs/{job_id}/events', headers=headers or {})
+            body = response.get_data(as_text=True)
+        self.assertEqual(response.mimetype, 'text/event-stream')
+        
+        events = []
+        for block in body.strip().split('\n\n'):
+            fields = dict(line.split(': ', 1) for line in block.split('\n') if not line.startswith(':'))
+            events.append((fields['event'], json.loads(fields['data']), fields.get('id')))
+        return events
+    
+    def test_event_stream(self):
+        """Тест за GET /jobs/<id>/events - етапите с времената им и накрая резултата"""
+        job_id = self.client.post('/jobs', json={'url': 'https://journal.example/'}).get_json()['job_id']
+        self.wait_for(job_id, lambda job: job.get('stage') == 'extracted')
+        self.release.set()
+        
+        events = self.read_events(job_id)
+        
+        self.assertEqual([name for name, _, _ in events], ['stage', 'done'])
+        name, stage, _ = events[0]
+        self.assertEqual(stage['stage'], 'extracted')
+        self.assertGreaterEqual(stage['elapsed'], 0)
+        self.assertIn('duration', stage)
+        self.assertEqual(events[1][1]['result']['readiness_analysis']['total_score'], 50)
+        
+        # Повторно свързване след първото събитие - само останалите
+        resumed = self.read_events(job_id, {'Last-Event-ID': events[0][2]})
+        self.assertEqual([name for name, _, _ in resumed], ['done'])
+    
+    def test_event_stream_failed_job(self):
+        """Тест дали неуспешната задача завършва потока със събитие 'error'"""
+        self.release.set()
+        job_id = self.client.post('/jobs', json={'url': 'https://fail.example/'}).get_json()['job_id']
+        
+        events = self.read_events(job_id)
+        
+        self.assertEqual(events[-1][0], 'error')
+        self.assertEqual(events[-1][1]['error'], 'refused')
+        self.assertEqual(self.client.get('/jobs/missing/events').status_code, 404)
+    
+    def test_stage_events_carry_partial_scores(self):
+        """Тест за данните на етапите от реалния анализ: частична оценка, без промяна на journal_data"""
+        page = FetchedPage('https://staged.example/', b'<html><h1>Staged Journal</h1><p>ISSN: 1234-5678</p></html>')
+        analyzer = ScopusJournalAnalyzer(http_client=Mock())
+        journal_data = analyzer._empty_journal_data(page.url)
+        journal_data.update(analyzer._extract_page_data(page.content, page.url)[0])
+        before = dict(journal_data)
+        
+        event = app_module._stage_event('extracted', journal_data)
+        
+        self.assertEqual(journal_data, before)
+        self.assertEqual(event['journal_data']['title'], 'Staged Journal')
+        self.assertEqual(event['journal_data']['issn'], '1234-5678')
+        self.assertGreater(event['readiness_analysis']['detailed_scores']['technical_standards'], 0)
+        self.assertEqual(app_module._stage_event('fetched', None), {})
+        
+        # При пълни данни частичната оценка съвпада с окончателната
+        with patch('app.HAVE_SELENIUM', False):
+            full = analyzer.analyze_page(page.url, page)
+        final = analyzer.calculate_scopus_readiness(full)
+        partial = analyzer.partial_scores(full)
+        self.assertEqual(partial['total_score'], final['total_score'])
+        self.assertEqual(partial['detailed_scores'], final['detailed_scores'])
+
+class FakeClock:
+    """Ръчно управляван часовник - sleep само премества времето напред"""
+    
+    def __init__(self, now=1000.0):
+        self.now = now
+        self.sleeps = []
+    
+    def __call__(self):
+        return self.now
+    
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+def api_response(status, payload=None, headers=None):
+    response = Mock()
+    response.status_code = status
+    response.headers = headers or {}
+    response.json.return_value = payload or {}
+    return response
+
+class TestScopusRateLimit(unittest.TestCase):
+    """Тестове за ограничаването на заявките към Scopus API"""
+    
+    def setUp(self):
+        self.clock = FakeClock()
+        self.limiter = RateLimiter(rate=2, burst=2, clock=self.clock, sleep=self.clock.sleep)
+        self.http = Mock()
+        self.client = ScopusAPIClient(api_key='test-key', http_client=self.http,
+                                      rate_limiter=self.limiter, max_retries=3, use_cache=False)
+        self.sleep_patch = patch('scopus_api.time.sleep')
+        self.retry_sleeps = self.sleep_patch.start()
+    
+    def tearDown(self):
+        self.sleep_patch.stop()
+    
+    def test_token_bucket_spacing(self):
+        """Тест дали след натрупаните жетони заявките се разреждат до rate"""
+        bucket = TokenBucket(rate=2, capacity=2, clock=self.clock, sleep=self.clock.sleep)
+        for _ in range(5):
+            bucket.acquire()
+        
+        self.assertEqual(self.clock.sleeps, [0.5, 0.5, 0.5])
+        # По-нисък временен rate (напр. при свършваща квота) удължава паузата;
+        # резервираният досега жетон също се възстановява с новия rate
+        bucket.acquire(rate=0.25)
+        self.assertEqual(self.clock.sleeps[-1], 7.5)
+    
+    def test_pacing_spreads_all_requests(self):
+        """Тест дали под резерва на квотата всички заявки вървят с темпото, а не само една"""
+        limiter = RateLimiter(rate=3, burst=3, clock=self.clock, sleep=self.clock.sleep)
+        limiter.quota = QuotaTracker(clock=self.clock)
+        # 100 заявки за 100 s - 1 заявка в секунда
+        limiter.quota.update({'X-RateLimit-Limit': '1000', 'X-RateLimit-Remaining': '100',
+                              'X-RateLimit-Reset': str(int(self.clock.now + 100))})
+        started = self.clock.now
+        
+        for sent in range(21):
+            self.assertTrue(limiter.wait(max_wait=60))
+            limiter.quota.update({'X-RateLimit-Remaining': str(99 - sent)})
+        
+        self.assertAlmostEqual(self.clock.now - started, 20, delta=0.5)
+        self.assertLessEqual(max(self.clock.sleeps), 1.05)
+        self.assertGreaterEqual(len(self.clock.sleeps), 19)
+    
+    def test_pacing_wait_is_capped(self):
+        """Тест дали чакане над max_wait заради темпото връща False, без да блокира"""
+        limiter = RateLimiter(rate=3, burst=3, clock=self.clock, sleep=self.clock.sleep)
+        limiter.quota = QuotaTracker(clock=self.clock)
+        # 1000 заявки за 3 дни - около 260 s между заявките
+        limiter.quota.update({'X-RateLimit-Limit': '100000', 'X-RateLimit-Remaining': '1000',
+                              'X-RateLimit-Reset': str(int(self.clock.now + 3 * 86400))})
+        
+        results = [limiter.wait(max_wait=60) for _ in range(10)]
+        
+        self.assertEqual(results, [True] + [False] * 9)
+        self.assertEqual(self.clock.sleeps, [])
+    
+    def test_retry_after_is_respected(self):
+        """Тест за повторен опит след 429 с Retry-After"""
+        self.http.get.side_effect = [
+            api_response(429, headers={'Retry-After': '7'}),
+            api_response(200, {'search-results': {'entry': []}}),
+        ]
+        
+        result = self.client.search_journal('Test Journal')
+        
+        self.assertFalse(result['found'])
+        self.assertEqual(self.http.get.call_count, 2)
+        self.retry_sleeps.assert_called_once_with(7.0)
+    
+    def test_server_errors_back_off_and_give_up(self):
+        """Тест за експоненциалното забавяне при 5xx и отказа след max_retries"""
+        self.http.get.return_value = api_response(503)
+        
+        with patch('scopus_rate_limit.random.uniform', side_effect=lambda low, high: high):
+            result = self.client.search_journal('Test Journal')
+        
+        self.assertEqual(result['error'], 'API грешка: 503')
+        self.assertEqual(self.http.get.call_count, 4)
+        self.assertEqual([c.args[0] for c in self.retry_sleeps.call_args_list], [0.5, 1.0, 2.0])
+    
+    def test_network_errors_are_retried(self):
+        """Тест за повторен опит след прекъсната връзка"""
+        import requests
+        self.http.get.side_effect = [requests.ConnectionError('reset'), api_response(200, SERIAL_TITLE)]
+        
+        result = self.client.get_journal_metrics('12345')
+        
+        self.assertTrue(result['metrics_available'])
+        self.assertEqual(self.http.get.call_count, 2)
+    
+    def test_quota_tracking_slows_down(self):
+        """Тест за квотата от X-RateLimit-* и плавното забавяне под резерва"""
+        quota = QuotaTracker(clock=self.clock)
+        quota.update({'X-RateLimit-Limit': '1000', 'X-RateLimit-Remaining': '900',
+                      'X-RateLimit-Reset': str(int(self.clock.now + 3600))})
+        self.assertIsNone(quota.pacing_rate())
+        
+        quota.update({'X-RateLimit-Remaining': '36'})
+        self.assertAlmostEqual(quota.pacing_rate(), 0.01)
+        self.assertFalse(quota.exhausted())
+        
+        quota.update({'X-RateLimit-Remaining': '0'})
+        self.assertTrue(quota.exhausted())
+    
+    def test_exhausted_quota_fails_fast(self):
+        """Тест дали при изчерпана квота за дълго заявката не се изпраща"""
+        self.limiter.quota.update({'X-RateLimit-Remaining': '0',
+                                   'X-RateLimit-Reset': str(int(time.time() + 86400))})
+        
+        result = self.client.search_journal('Test Journal')
+        
+        self.assertIn('квотата', result['error'])
+        self.http.get.assert_not_called()
+    
+    def test_client_exposes_quota(self):
+        """Тест дали клиентът записва квотата от отговорите"""
+        self.http.get.return_value = api_response(200, {}, {'X-RateLimit-Limit': '20000',
+                                                            'X-RateLimit-Remaining': '19999'})
+        self.client.search_journal('Test Journal')
+        
+        self.assertEqual(self.client.quota['remaining'], 19999)
+        self.assertEqual(self.client.quota['limit'], 20000)
+    
+    def test_retry_after_formats(self):
+        """Тест за Retry-After като секунди и като HTTP дата"""
+        self.assertEqual(retry_after({'Retry-After': '3'}), 3.0)
+        self.assertAlmostEqual(retry_after({'Retry-After': 'Thu, 01 Jan 1970 00:01:40 GMT'}, clock=lambda: 40), 60.0)
+        self.assertIsNone(retry_after({'Retry-After': 'soon'}))
+        self.assertIsNone(retry_after({}))
+        self.assertLessEqual(backoff_delay(10, base=1, cap=5), 5)
+
+SOURCE_LIST_CSV = (
+    'Sourcerecord ID,Source Title (Medline-sourced journals are indicated in Green),Print-ISSN,E-ISSN,'
+    'Active or Inactive,Titles discontinued by Scopus due to quality issues,Coverage,Source Type,'
+    'All Science Journal Classification Codes (ASJC)\n'
+    '21100000001,Journal of Computing & Mathematics,1234-5678,8765432X,Active,,2001-2024,Journal,"1700; 1703; 2600;"\n'
+    '21100000002,Acta Discontinuata,11112222,,Inactive,Discontinued,2010-2018,Journal,1100\n'
+    '21100000003,Old Inactive Review,3333-4444,,Inactive,,1990-2005,Journal,3300\n'
+)
+
+class TestScopusSources(unittest.TestCase):
+    """Тестове за локалния индекс на Scopus Source List"""
+    
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        path = os.path.join(self.tmp.name, 'sources.csv')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(SOURCE_LIST_CSV)
+        self.index = SourceIndex(os.path.join(self.tmp.name, 'sources.sqlite3'))
+        self.imported = self.index.import_file(path)
+        self.api_client = Mock(api_key='test-key')
+        self.enhancer = ScopusEnhancer(api_client=self.api_client, source_index=self.index)
+    
+    def tearDown(self):
+        self.tmp.cleanup()
+    
+    def test_normalization(self):
+        """Тест за нормализирането на ISSN и заглавия"""
+        self.assertEqual(normalize_issn('1234-567x'), '1234567X')
+        self.assertEqual(normalize_issn(1234567), '01234567')
+        self.assertIsNone(normalize_issn('12-34'))
+        self.assertEqual(normalize_title('Journal of Computing & Mathematics.'),
+                         normalize_title('journal of computing and mathematics'))
+        self.assertEqual(normalize_title('Revista Médica'), 'revista medica')
+    
+    def test_import_and_lookup(self):
+        """Тест за импорт от CSV и търсене по ISSN, e-ISSN и заглавие"""
+        self.assertEqual(self.imported, 3)
+        self.assertEqual(self.index.count(), 3)
+        
+        source = self.index.lookup(issn='1234-5678')
+        self.assertEqual(source['source_id'], '21100000001')
+        self.assertEqual(source['matched_by'], 'issn')
+        self.assertEqual(source['asjc_codes'], ['1700', '1703', '2600'])
+        self.assertEqual(source['subject_areas'], ['Computer Science', 'Mathematics'])
+        
+        self.assertEqual(self.index.lookup(issn='8765-432X')['title'], 'Journal of Computing & Mathematics')
+        by_title = self.index.lookup(issn='0000-0000', title='JOURNAL OF COMPUTING AND MATHEMATICS')
+        self.assertEqual(by_title['matched_by'], 'title')
+        self.assertTrue(self.index.lookup(issn='1111-2222')['discontinued'])
+        self.assertIsNone(self.index.lookup(title='Unknown Journal'))
+    
+    def test_rejects_unrelated_table(self):
+        """Тест дали таблица без заглавие и ISSN не изтрива индекса"""
+        with self.assertRaises(ValueError):
+            self.index.import_rows([['Name', 'Value'], ['a', 'b']])
+        self.assertEqual(self.index.count(), 3)
+    
+    def test_import_spreadsheet_values(self):
+        """Тест за числови ISSN от xlsx (без водещите нули)"""
+        rows = [['Source Title', 'Print-ISSN', 'E-ISSN'], ['Numeric Journal', 123456, None]]
+        self.assertEqual(self.index.import_rows(rows), 1)
+        self.assertEqual(self.index.lookup(issn='0012-3456')['title'], 'Numeric Journal')
+    
+    def test_enhancer_answers_locally(self):
+        """Тест дали индексираните и прекратените списания не стигат до API"""
+        status = self.enhancer.check_indexing_status({'title': 'Whatever', 'issn': '1234-5678'})
+        self.assertTrue(status['indexed'])
+        self.assertEqual(status['source'], 'local')
+        self.assertEqual(status['scopus_data']['subject_areas'], ['Computer Science', 'Mathematics'])
+        
+        discontinued = self.enhancer.check_indexing_status({'title': 'Acta Discontinuata', 'issn': ''})
+        self.assertFalse(discontinued['indexed'])
+        self.assertTrue(discontinued['discontinued'])
+        self.api_client.check_indexing_status.assert_not_called()
+        
+        enhanced = self.enhancer.enhance_journal_analysis({'title': 'X', 'issn': '8765-432X'})
+        self.assertEqual(enhanced['scopus_id'], '21100000001')
+    
+    def test_enhancer_falls_back_to_api(self):
+        """Тест за API при липса в индекса и за локалния отговор, ако API не е достъпен"""
+        self.api_client.check_indexing_status.return_value = {'indexed': True, 'scopus_data': {}}
+        status = self.enhancer.check_indexing_status({'title': 'Renamed Journal', 'issn': '9999-9999'})
+        self.assertTrue(status['indexed'])
+        self.api_client.check_indexing_status.assert_called_once()
+        
+        self.api_client.check_indexing_status.return_value = {'error': 'API грешка: 503'}
+        status = self.enhancer.check_indexing_status({'title': 'Renamed Journal', 'issn': '9999-9999'})
+        self.assertFalse(status['indexed'])
+        self.assertEqual(status['source'], 'local')
+        
+        self.api_client.api_key = ''
+        self.api_client.check_indexing_status.reset_mock()
+        self.assertFalse(self.enhancer.check_indexing_status({'title': 'Old Inactive Review'})['indexed'])
+        self.api_client.check_indexing_status.assert_not_called()
+
+def search_entry(title, issn='', scopus_id='1'):
+    return {'dc:identifier': f'SCOPUS_ID:{scopus_id}', 'prism:publicationName': title, 'prism:issn': issn}
+
+class TestTitleMatcher(unittest.TestCase):
+    """Тестове за приблизителното сравнение на заглавия"""
+    
+    def test_transliteration(self):
+        """Тест за транслитерацията на български заглавия"""
+        self.assertEqual(transliterate('Българско списание за щастие'), 'balgarsko spisanie za shtastie')
+        self.assertEqual(title_key('Юридически & Икономически Преглед'), 'yuridicheski and ikonomicheski pregled')
+        self.assertEqual(query_terms('Journal of Law & Economics'), ['journal', 'law', 'economics'])
+    
+    def test_ranking_and_confidence(self):
+        """Тест дали близкото заглавие печели пред първия резултат от API"""
+        index = TitleIndex([('Journal of Physics: Conference Series', 1),
+                            ('Journal of Applied Mathematics and Physics', 2),
+                            ('Bulgarian Journal of Physics', 3)])
+        
+        matches = index.search('Bulgarian J. Physics')
+        
+        self.assertEqual(matches[0].item, 3)
+        self.assertGreater(matches[0].score, matches[1].score)
+        self.assertEqual(index.search('Bulgarian Journal of Physics')[0].score, 1.0)
+        self.assertEqual(index.search(''), [])
+    
+    def test_large_index_candidates(self):
+        """Тест дали кандидатите се намират и в голям каталог"""
+        index = TitleIndex((f'Journal of Topic {i}', i) for i in range(500))
+        index.add('Balkan Journal of Dental Medicine', 'target')
+        
+        self.assertEqual(index.search('Balkan Journal Dental Medicine', limit=1)[0].item, 'target')
+    
+    def test_ambiguity_resolved_by_issn(self):
+        """Тест за равностойни заглавия - двусмислени без ISSN, решени с ISSN"""
+        candidates = [('Annals of Surgery', {'issn': '00034932'}), ('Annals of Surgery', {'issn': '15281140'})]
+        
+        match, ambiguous = best_match('Annals of Surgery', candidates)
+        self.assertTrue(ambiguous)
+        
+        match, ambiguous = best_match('Annals of Surgery', candidates, issn='1528-1140',
+                                      issns_of=lambda item: [item['issn']])
+        self.assertFalse(ambiguous)
+        self.assertEqual(match.item['issn'], '15281140')
+        self.assertEqual(match.score, 1.0)
+    
+    def test_search_results_use_best_title(self):
+        """Тест дали _process_search_results не взима сляпо първия резултат"""
+        client = ScopusAPIClient(api_key='test-key', http_client=Mock())
+        data = {'search-results': {'entry': [
+            search_entry('Journal of Economics and Business', scopus_id='1'),
+            search_entry('Economic Alternatives', scopus_id='2'),
+        ]}}
+        
+        result = client._process_search_results(data, 'Economic Alternatives')
+        self.assertEqual(result['scopus_id'], '2')
+        self.assertEqual(result['match_confidence'], 1.0)
+        
+        result = client._process_search_results(data, 'Икономически изследвания')
+        self.assertFalse(result['found'])
+        self.assertLess(result['match_confidence'], 0.7)
+    
+    def test_query_is_built_from_terms(self):
+        """Тест за заявката - думите на заглавието на списанието вместо точния низ"""
+        http = Mock()
+        http.get.return_value = api_response(200, {'search-results': {'entry': []}})
+        client = ScopusAPIClient(api_key='test-key', http_client=http,
+                                 rate_limiter=RateLimiter(rate=1000, burst=1000), use_cache=False)
+        
+        client.search_journal('Науки & Изкуства', '1234-5678')
+        
+        query = http.get.call_args.kwargs['params']['query']
+        self.assertEqual(query, 'SRCTITLE(nauki AND izkustva) AND ISSN(1234-5678)')
+        self.assertIn('publicationName', http.get.call_args.kwargs['params']['field'])
+        
+        client.search_journal('Journal of Law & Economics')
+        self.assertEqual(http.get.call_args.kwargs['params']['query'], 'SRCTITLE(journal AND law AND economics)')
+    
+    def test_local_catalog_fuzzy_lookup(self):
+        """Тест за приблизително търсене в локалния Source List"""
+        with tempfile.TemporaryDirectory() as tmp:
+            index = SourceIndex(os.path.join(tmp, 'sources.sqlite3'))
+            index.import_rows([['Source Title', 'Print-ISSN'],
+                               ['Bulgarian Chemical Communications', '0324-1130'],
+                               ['Bulgarian Journal of Veterinary Medicine', '1311-1477']])
+            
+            source = index.lookup(title='Bulgarian Chemical Communication')
+            self.assertEqual(source['print_issn'], '03241130')
+            self.assertEqual(source['matched_by'], 'fuzzy_title')
+            self.assertGreaterEqual(source['match_confidence'], 0.7)
+            self.assertIsNone(index.lookup(title='Bulgarian Chemical Communication', fuzzy=False))
+            self.assertIsNone(index.lookup(title='Completely Different Title'))
+
+class FakeScopusSearch:
+    """Scopus Search, който по OR заявка от ISSN(...) връща по един документ за всеки познат ISSN"""
+    
+    def __init__(self, known, page_size=25):
+        self.known = known
+        self.page_size = page_size
+        self.queries = []
+    
+    def get(self, url, headers=None, params=None):
+        self.queries.append(params['query'])
+        issns = re.findall(r'ISSN\(([\dX-]+)\)', params['query'], re.IGNORECASE)
+        entries = [search_entry(f'Journal {issn}', issn, scopus_id=issn) for issn in issns if issn in self.known]
+        # source-id идва само ако е поискан във field, както при истинското API
+        if 'source-id' in params.get('field', '').split(','):
+            entries = [dict(entry, **{'source-id': f"src-{entry['prism:issn']}"}) for entry in entries]
+        page = entries[params['start']:params['start'] + self.page_size]
+        return api_response(200, {'search-results': {
+            'opensearch:totalResults': str(len(entries)),
+            'entry': page or [{'error': 'Result set was empty'}]
+        }})
+
+class TestBulkISSNLookup(unittest.TestCase):
+    """Тестове за груповото търсене по ISSN"""
+    
+    def setUp(self):
+        self.issns = [f'{1000 + i:04d}-{2000 + i:04d}' for i in range(120)]
+        self.search = FakeScopusSearch(known=set(self.issns[:100]))
+        self.client = ScopusAPIClient(api_key='test-key', http_client=self.search,
+                                      rate_limiter=RateLimiter(rate=1000, burst=1000), use_cache=False)
+    
+    def test_cohort_needs_few_requests(self):
+        """Тест дали 120 ISSN-а се проверяват с няколко заявки и се връщат към входа"""
+        results = self.client.search_issns(self.issns)
+        
+        self.assertEqual(len(results), 120)
+        self.assertLessEqual(len(self.search.queries), 8)
+        self.assertTrue(results['1005-2005']['found'])
+        self.assertEqual(results['1005-2005']['scopus_id'], 'src-1005-2005')
+        self.assertEqual(results['1005-2005']['match_confidence'], 1.0)
+        self.assertFalse(results['1110-2110']['found'])
+        for query in self.search.queries:
+            self.assertLessEqual(len(query), Config.SCOPUS_MAX_QUERY_LENGTH)
+    
+    def test_input_forms_and_invalid_issns(self):
+        """Тест за различно изписани и невалидни ISSN-и"""
+        results = self.client.search_issns(['10002000', '1000-2000', 'not-an-issn'])
+        
+        self.assertTrue(results['10002000']['found'])
+        self.assertTrue(results['1000-2000']['found'])
+        self.assertIn('error', results['not-an-issn'])
+        self.assertEqual(len(self.search.queries), 1)
+    
+    def test_chunks_respect_query_length(self):
+        """Тест за разделянето на заявките по дължина"""
+        with patch('scopus_api.Config.SCOPUS_MAX_QUERY_LENGTH', 100), \
+                patch('scopus_api.Config.SCOPUS_BULK_CHUNK_SIZE', 50):
+            chunks = list(ScopusAPIClient._issn_chunks([issn.replace('-', '') for issn in self.issns[:20]]))
+        
+        self.assertEqual(sum(len(chunk) for chunk in chunks), 20)
+        self.assertTrue(all(len(chunk) == 5 for chunk in chunks))
+    
+    def test_unresolved_issns_fall_back(self):
+        """Тест за ISSN-и, които не се появяват до SCOPUS_BULK_MAX_PAGES страници"""
+        with patch('scopus_api.Config.SCOPUS_BULK_MAX_PAGES', 1):
+            results = self.client.search_issns(self.issns[:30])
+        
+        self.assertTrue(all(results[issn]['found'] for issn in self.issns[:30]))
+        # Една групова заявка и по една за петте ISSN-а извън първата страница
+        self.assertEqual(len(self.search.queries), 6)
+    
+    def test_enhancer_bulk_status(self):
+        """Тест за статуса на група списания - локален индекс, после едно групово търсене"""
+        with tempfile.TemporaryDirectory() as tmp:
+            index = SourceIndex(os.path.join(tmp, 'sources.sqlite3'))
+            index.import_rows([['Source Title', 'Print-ISSN'], ['Local Journal', '1001-2001']])
+            enhancer = ScopusEnhancer(api_client=self.client, source_index=index)
+            journals = [{'title': 'Local Journal', 'issn': '1001-2001'},
+                        {'title': 'Remote Journal', 'issn': '1002-2002'},
+                        {'title': 'Unknown Journal', 'issn': '1115-2115'}]
+            
+            statuses = enhancer.check_indexing_status_many(journals)
+        
+        self.assertEqual(statuses[0]['source'], 'local')
+        self.assertTrue(statuses[1]['indexed'])
+        self.assertFalse(statuses[2]['indexed'])
+        self.assertEqual(len(self.search.queries), 1)
+
+class TestScopusCache(unittest.TestCase):
+    """Тестове за постоянния кеш на Scopus отговорите"""
+    
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = ResultCache(os.path.join(self.tmp.name, 'scopus.sqlite3'), max_entries=100)
+        self.cache = ScopusResponseCache(self.store, ttls={'search': 3600, 'metrics': 7200}, negative_ttl=60)
+        self.http = Mock()
+        self.client = ScopusAPIClient(api_key='test-key', http_client=self.http, cache=self.cache,
+                                      rate_limiter=RateLimiter(rate=1000, burst=1000))
+    
+    def tearDown(self):
+        self.tmp.cleanup()
+    
+    def expires_in(self, endpoint, params):
+        with self.store.transaction() as conn:
+            row = conn.execute('SELECT created_at, expires_at FROM results WHERE key = ?',
+                               (cache_key(endpoint, params),)).fetchone()
+        return round(row['expires_at'] - row['created_at'])
+    
+    def test_search_is_cached_by_normalized_query(self):
+        """Тест дали различно изписаното заглавие и ISSN ползват записа в кеша"""
+        self.http.get.return_value = api_response(200, {'search-results': {'entry': [
+            search_entry('Journal of Law & Economics', '1234-5678')]}})
+        
+        first = self.client.search_journal('Journal of Law & Economics', '1234-5678')
+        second = ScopusAPIClient(api_key='test-key', http_client=self.http, cache=self.cache).search_journal(
+            'journal of law and economics', '12345678')
+        
+        self.assertTrue(first['found'])
+        self.assertEqual(second['scopus_id'], first['scopus_id'])
+        self.assertEqual(self.http.get.call_count, 1)
+        self.assertEqual(self.cache.stats()['search'], {'hits': 1, 'misses': 1})
+        self.assertEqual(self.expires_in('search', {'title': 'Journal of Law & Economics', 'issn': '1234-5678'}), 3600)
+    
+    def test_negative_results_use_short_ttl(self):
+        """Тест за кратък TTL на 'не е намерено' и за некешираните грешки"""
+        self.http.get.return_value = api_response(200, {'search-results': {'entry': []}})
+        self.assertFalse(self.client.search_journal('Missing Journal')['found'])
+        self.assertEqual(self.expires_in('search', {'title': 'Missing Journal', 'issn': ''}), 60)
+        
+        self.http.get.return_value = api_response(404)
+        self.client.get_journal_metrics('999')
+        self.client.get_journal_metrics('999')
+        self.assertEqual(self.http.get.call_count, 3)
+        self.assertEqual(self.cache.stats()['metrics'], {'hits': 0, 'misses': 2})
+    
+    def test_metrics_and_indexing_status(self):
+        """Тест за кеширането на метриките и статуса на индексиране"""
+        self.http.get.return_value = api_response(200, {'serial-metadata-response': {}})
+        self.client.get_journal_metrics('123')
+        self.client.get_journal_metrics('123')
+        self.assertEqual(self.expires_in('metrics', {'scopus_id': '123'}), 7200)
+        
+        self.http.get.return_value = api_response(200, {'search-results': {'entry': [
+            search_entry('Cached Journal', '1111-2222')]}})
+        self.client.check_indexing_status({'title': 'Cached Journal', 'issn': '1111-2222'})
+        status = self.client.check_indexing_status({'title': 'Cached Journal', 'issn': '1111-2222'})
+        
+        self.assertTrue(status['indexed'])
+        self.assertEqual(self.http.get.call_count, 2)
+        self.assertEqual(self.cache.stats()['indexing_status'], {'hits': 1, 'misses': 1})
+    
+    def test_bulk_lookup_shares_cache(self):
+        """Тест дали груповото търсене пропуска кешираните ISSN-и и записва новите"""
+        search = FakeScopusSearch(known={'1000-2000', '1001-2001'})
+        client = ScopusAPIClient(api_key='test-key', http_client=search, cache=self.cache,
+                                 rate_limiter=RateLimiter(rate=1000, burst=1000))
+        
+        client.search_issns(['1000-2000'])
+        results = client.search_issns(['1000-2000', '1001-2001'])
+        
+        self.assertTrue(results['1001-2001']['found'])
+        self.assertEqual(search.queries[-1], 'ISSN(1001-2001)')
+        self.assertTrue(client.search_journal('', '1001-2001')['found'])
+        self.assertEqual(len(search.queries), 2)
+
+SERIAL_TITLE = {'serial-metadata-response': {'entry': [{
+    'dc:title': 'Journal of Testing',
+    'prism:issn': '12345678',
+    'source-id': '12345',
+    'SJRList': {'SJR': [{'@year': '2022', '$': '0.612'}, {'@year': '2021', '$': '0.540'}]},
+    'SNIPList': {'SNIP': {'@year': '2022', '$': '1.105'}},
+    'citeScoreYearInfoList': {
+        'citeScoreCurrentMetric': '3.4', 'citeScoreCurrentMetricYear': '2022',
+        'citeScoreTracker': '3.9', 'citeScoreTrackerYear': '2023',
+        'citeScoreYearInfo': [
+            {'@year': '2023', '@status': 'In-Progress', 'citeScoreInformationList': [{'citeScoreInfo': [
+                {'docType': 'all', 'citeScore': '3.9', 'scholarlyOutput': '80', 'citationCount': '312'}]}]},
+            {'@year': '2022', '@status': 'Complete', 'citeScoreInformationList': [{'citeScoreInfo': [
+                {'docType': 'ar', 'citeScore': '4.0'},
+                {'docType': 'all', 'citeScore': '3.4', 'scholarlyOutput': '100', 'citationCount': '340',
+                 'percentCited': '71', 'citeScoreSubjectRank': [
+                     {'subjectCode': '1700', 'rank': '50', 'percentile': '80'},
+                     {'subjectCode': '2600', 'rank': '120', 'percentile': '64'}]}]}]},
+        ],
+    },
+}]}}
+
+class TestScopusMetrics(unittest.TestCase):
+    """Тестове за компактните метрики от Serial Title API"""
+    
+    def setUp(self):
+        self.http = Mock()
+        self.client = ScopusAPIClient(api_key='test-key', http_client=self.http, use_cache=False,
+                                      rate_limiter=RateLimiter(rate=1000, burst=1000))
+    
+    def test_parse_yearly_metrics(self):
+        """Тест за CiteScore, SJR и SNIP по години, местата и перцентилите"""
+        metrics = parse_serial_title(SERIAL_TITLE)[0]
+        
+        self.assertIsInstance(metrics, JournalMetrics)
+        self.assertEqual([item.year for item in metrics.citescore], [2023, 2022])
+        self.assertEqual(metrics.sjr, {2022: 0.612, 2021: 0.54})
+        self.assertEqual(metrics.snip, {2022: 1.105})
+        self.assertEqual(metrics.citescore_tracker, (2023, 3.9))
+        
+        latest = metrics.latest_citescore
+        self.assertEqual((latest.year, latest.value, latest.citations, latest.documents), (2022, 3.4, 340, 100))
+        self.assertEqual(latest.best_percentile, 80.0)
+        self.assertEqual(latest.subject_ranks[1].to_dict(), {
+            'subject_code': '2600', 'subject_area': 'Mathematics', 'rank': 120, 'percentile': 64.0})
+    
+    def test_standard_view_and_empty_response(self):
+        """Тест за отговор само с текущия CiteScore и за празен отговор"""
+        metrics = JournalMetrics.from_entry({'citeScoreYearInfoList': {
+            'citeScoreCurrentMetric': '1.2', 'citeScoreCurrentMetricYear': '2022'}})
+        self.assertEqual(metrics.to_dict()['citescore'], 1.2)
+        self.assertIsNone(metrics.to_dict()['sjr'])
+        self.assertEqual(parse_serial_title({'serial-metadata-response': {'entry': [{'error': 'Not found'}]}}), [])
+    
+    def test_metrics_are_compact_unless_raw_requested(self):
+        """Тест дали суровият отговор се връща само при include_raw"""
+        self.http.get.return_value = api_response(200, SERIAL_TITLE)
+        
+        result = self.client.get_journal_metrics('12345')
+        self.assertTrue(result['metrics_available'])
+        self.assertEqual(result['citescore'], 3.4)
+        self.assertEqual(result['citescore_percentile'], 80.0)
+        self.assertEqual(result['sjr'], {'year': 2022, 'value': 0.612})
+        self.assertNotIn('data', result)
+        self.assertEqual(json.loads(json.dumps(result)), result)
+        
+        raw = self.client.get_journal_metrics('12345', include_raw=True)
+        self.assertEqual(raw['data'], SERIAL_TITLE)
+    
+    def test_standard_view_fallback(self):
+        """Тест за повторна заявка със STANDARD, когато ключът няма достъп до ENHANCED"""
+        self.http.get.side_effect = [api_response(403), api_response(200, SERIAL_TITLE)]
+        
+        result = self.client.get_journal_metrics('12345')
+        
+        self.assertTrue(result['metrics_available'])
+        self.assertEqual([c.kwargs['params']['view'] for c in self.http.get.call_args_list], ['ENHANCED', 'STANDARD'])
+    
+    def test_search_matches_are_summaries(self):
+        """Тест дали останалите съвпадения от търсенето са без суровите записи"""
+        self.http.get.return_value = api_response(200, {'search-results': {'entry': [
+            search_entry('Journal of Testing', '1234-5678', '10'), search_entry('Testing Letters', '', '11')]}})
+        
+        result = self.client.search_journal('Journal of Testing')
+        self.assertEqual(result['all_matches'][1], {'scopus_id': '11', 'title': 'Testing Letters', 'issn': ''})
+        self.assertNotIn('raw_matches', result)
+        self.assertEqual(len(self.client.search_journal('Journal of Testing', include_raw=True)['raw_matches']), 2)
+    
+    def test_matches_use_source_id(self):
+        """Тест дали scopus_id е ID на списанието (source-id), а не на документа"""
+        self.http.get.return_value = api_response(200, {'search-results': {'entry': [
+            dict(search_entry('Journal of Testing', '1234-5678', '85012345678'), **{'source-id': '21100'})]}})
+        
+        result = self.client.search_journal('Journal of Testing')
+        
+        self.assertEqual(result['scopus_id'], '21100')
+        self.assertEqual(result['all_matches'][0]['scopus_id'], '21100')
+    
+    def test_documents_of_one_source_are_one_match(self):
+        """Тест дали няколко статии от едно списание са един кандидат"""
+        article = {'dc:title': 'On Testing Software', 'source-id': '21100'}
+        self.http.get.return_value = api_response(200, {'search-results': {'entry': [
+            dict(search_entry('Journal of Testing', '1234-5678', '85000000001'), **article),
+            dict(search_entry('Journal of Testing', '1234-5678', '85000000002'), **article)]}})
+        
+        result = self.client.search_journal('Journal of Testing')
+        
+        self.assertFalse(result['ambiguous'])
+        self.assertEqual(result['total_results'], 1)
+        self.assertEqual(len(result['all_matches']), 1)
+        self.assertEqual(result['title'], 'Journal of Testing')
+
+class TestScopusEnrichment(unittest.TestCase):
+    """Тестове за Scopus проверката успоредно с извличането"""
+    
+    def setUp(self):
+        self.lookups = []
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.api = Mock(api_key='test-key')
+        self.api.check_indexing_status.side_effect = self.lookup
+        self.enhancer = ScopusEnhancer(api_client=self.api, source_index=None)
+        self.executor = ThreadPoolExecutor(max_workers=2)
+    
+    def tearDown(self):
+        self.release.set()
+        self.executor.shutdown(wait=True)
+    
+    def lookup(self, journal_data):
+        self.lookups.append(dict(journal_data))
+        self.started.set()
+        self.release.wait(5)
+        if journal_data['issn']:
+            return {'indexed': True, 'scopus_data': {'scopus_id': '77', 'subject_areas': ['Mathematics']}}
+        return {'indexed': False}
+    
+    def test_lookup_overlaps_with_crawling(self):
+        """Тест дали проверката започва при първите данни, а не след края на извличането"""
+        enrichment = ScopusEnrichment(self.enhancer, executor=self.executor)
+        stages = []
+        report = enrichment.progress(lambda stage, data: stages.append(stage))
+        journal_data = {'title': 'Journal of Testing', 'issn': '1234-5678'}
+        
+        report('extracting')
+        self.assertFalse(self.started.is_set())
+        report('extracted', journal_data)
+        self.assertTrue(self.started.wait(5))
+        report('crawling')
+        report('crawled', journal_data)
+        self.release.set()
+        
+        status = enrichment.finish(journal_data)
+        
+        self.assertTrue(status['indexed'])
+        self.assertEqual(journal_data['scopus_id'], '77')
+        self.assertEqual(journal_data['scopus_subject_areas'], ['Mathematics'])
+        self.assertEqual(stages, ['extracting', 'extracted', 'crawling', 'crawled'])
+        self.assertEqual(len(self.lookups), 1)
+    
+    def test_repeats_lookup_with_later_issn(self):
+        """Тест за повторна проверка, когато обхождането е открило ISSN"""
+        enrichment = ScopusEnrichment(self.enhancer, executor=self.executor)
+        self.release.set()
+        enrichment.progress()('extracted', {'title': 'Journal of Testing'})
+        
+        journal_data = {'title': 'Journal of Testing', 'issn': '12345678'}
+        status = enrichment.finish(journal_data)
+        
+        self.assertTrue(status['indexed'])
+        self.assertEqual([lookup['issn'] for lookup in self.lookups], ['', '12345678'])
+        self.assertIsNone(ScopusEnrichment(self.enhancer, executor=self.executor).finish({'title': ''}))
+    
+    def test_repeated_lookup_is_bounded(self):
+        """Тест дали повторната проверка върви в pool-а и спира след timeout"""
+        enrichment = ScopusEnrichment(self.enhancer, executor=self.executor, timeout=0.05)
+        
+        status = enrichment.finish({'title': 'Journal of Testing', 'issn': '12345678'})
+        
+        self.assertIn('error', status)
+        self.assertEqual(len(self.lookups), 1)
+    
+    def test_no_repeat_after_timeout_with_same_query(self):
+        """Тест дали проверка, изтекла със същите данни, не се повтаря"""
+        enrichment = ScopusEnrichment(self.enhancer, executor=self.executor, timeout=0.05)
+        journal_data = {'title': 'Journal of Testing', 'issn': '12345678'}
+        enrichment.start(journal_data)
+        
+        status = enrichment.finish(journal_data)
+        
+        self.assertIn('error', status)
+        self.assertEqual(len(self.lookups), 1)
+    
+    def test_run_analysis_cancels_on_extraction_error(self):
+        """Тест дали неуспешното извличане отменя започналата проверка"""
+        def fake_extract(url, progress=None):
+            progress('extracted', {'title': 'Journal of Testing', 'issn': ''})
+            return {'error': 'Неуспешно извличане'}
+        
+        with patch('app.scopus_enhancer', self.enhancer), \
+                patch.object(app_module.analyzer, 'extract_journal_data', side_effect=fake_extract), \
+                patch.object(ScopusEnrichment, 'cancel', autospec=True) as cancel:
+            result = app_module.run_analysis('https://journal.example/')
+        
+        self.assertEqual(result, {'error': 'Неуспешно извличане'})
+        cancel.assert_called_once()
+    
+    def test_cancel_pending_lookup(self):
+        """Тест за отмяна на проверка, която още чака в pool-а"""
+        executor = ThreadPoolExecutor(max_workers=1)
+        self.addCleanup(executor.shutdown)
+        executor.submit(self.release.wait, 5)
+        enrichment = ScopusEnrichment(self.enhancer, executor=executor)
+        enrichment.start({'title': 'Journal of Testing', 'issn': ''})
+        
+        self.assertTrue(enrichment.cancel())
+        self.release.set()
+        executor.shutdown(wait=True)
+        self.assertEqual(self.lookups, [])
+    
+    def test_run_analysis_adds_scopus_status(self):
+        """Тест дали /analyze пътят добавя статуса от Scopus и етап 'scopus_checked'"""
+        def fake_extract(url, progress=None):
+            journal_data = {'url': url, 'title': 'Journal of Testing', 'issn': '1234-5678', 'editorial_board': []}
+            progress('extracted', journal_data)
+            # Проверката върви, докато извличането още не е приключило
+            self.assertTrue(self.started.wait(5))
+            self.release.set()
+            return journal_data
+        
+        stages = []
+        with patch('app.scopus_enhancer', self.enhancer), \
+                patch.object(app_module.analyzer, 'extract_journal_data', side_effect=fake_extract):
+            result = app_module.run_analysis('https://journal.example/', lambda stage, data: stages.append(stage))
+        
+        self.assertTrue(result['journal_data']['scopus_indexing_status']['indexed'])
+        self.assertEqual(stages, ['extracted', 'scopus_checked', 'scoring', 'scored'])
+
+class FakeCursorSearch:
+    """Scopus Search с cursor=* за total резултата; записва курсорите на заявките"""
+    
+    def __init__(self, total, fail_at=None):
+        self.total = total
+        self.fail_at = fail_at
+        self.cursors = []
+        self.lock = threading.Lock()
+    
+    def get(self, url, headers=None, params=None):
+        with self.lock:
+            self.cursors.append(params['cursor'])
+        start = 0 if params['cursor'] == '*' else int(params['cursor'])
+        if self.fail_at is not None and start >= self.fail_at:
+            return api_response(500)
+        count = int(params['count'])
+        entries = [dict(search_entry(f'Journal {i // 2}', f'{1000 + i // 2}-2000', str(i)), **{'source-id': str(i // 2)})
+                   for i in range(start, min(start + count, self.total))]
+        return api_response(200, {'search-results': {
+            'opensearch:totalResults': str(self.total),
+            'cursor': {'@current': params['cursor'], '@next': str(start + count)},
+            'entry': entries or [{'error': 'Result set was empty'}]
+        }})
+
+class TestScopusCursor(unittest.TestCase):
+    """Тестове за обхождането на резултатите с cursor=*"""
+    
+    def client(self, search):
+        return ScopusAPIClient(api_key='test-key', http_client=search, use_cache=False, max_retries=0,
+                               rate_limiter=RateLimiter(rate=1000, burst=1000))
+    
+    def test_iterates_all_pages(self):
+        """Тест дали всички страници се обхождат с курсора от предишния отговор"""
+        search = FakeCursorSearch(total=23)
+        entries = list(self.client(search).iter_search('SUBJAREA(MATH)', page_size=10))
+        
+        self.assertEqual([entry['dc:identifier'] for entry in entries], [f'SCOPUS_ID:{i}' for i in range(23)])
+        self.assertEqual(search.cursors, ['*', '10', '20'])
+    
+    def test_prefetches_next_page(self):
+        """Тест дали следващата страница се изтегля, докато се обработва текущата"""
+        search = FakeCursorSearch(total=30)
+        iterator = self.client(search).iter_search('SUBJAREA(MATH)', page_size=10)
+        next(iterator)
+        
+        deadline = time.monotonic() + 5
+        while len(search.cursors) < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(search.cursors, ['*', '10'])
+        
+        iterator.close()
+        time.sleep(0.05)
+        self.assertEqual(len(search.cursors), 2)
+    
+    def test_max_results_and_errors(self):
+        """Тест за max_results и за грешка от API по средата на обхождането"""
+        search = FakeCursorSearch(total=100)
+        self.assertEqual(len(list(self.client(search).iter_search('q', page_size=10, max_results=15))), 15)
+        self.assertEqual(search.cursors, ['*', '10'])
+        
+        results = []
+        with self.assertRaises(RuntimeError):
+            for entry in self.client(FakeCursorSearch(total=100, fail_at=20)).iter_search('q', page_size=10):
+                results.append(entry)
+        self.assertEqual(len(results), 20)
+    
+    def test_iter_sources_deduplicates(self):
+        """Тест дали всяко списание се връща веднъж"""
+        sources = list(self.client(FakeCursorSearch(total=9)).iter_sources('SUBJAREA(MATH) AND SRCTYPE(j)'))
+        
+        self.assertEqual([source['source_id'] for source in sources], ['0', '1', '2', '3', '4'])
+        self.assertTrue(all(source['found'] for source in sources))
+
+class TestScopusKeyPool(unittest.TestCase):
+    """Тестове за набора от Scopus API ключове"""
+    
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = KeyUsageStore(os.path.join(self.tmp.name, 'keys.sqlite3'))
+        self.sleep_patch = patch('scopus_api.time.sleep')
+        self.sleep_patch.start()
+    
+    def tearDown(self):
+        self.sleep_patch.stop()
+        self.tmp.cleanup()
+    
+    def pool(self, keys=('key-a', 'key-b'), **kwargs):
+        limiters = {key: RateLimiter(rate=1000, burst=1000) for key in keys}
+        return APIKeyPool(keys, store=self.store, limiters=limiters, **kwargs)
+    
+    def quota_headers(self, remaining, limit=20000):
+        return {'X-RateLimit-Limit': str(limit), 'X-RateLimit-Remaining': str(remaining),
+                'X-RateLimit-Reset': str(int(time.time() + 3600))}
+    
+    def test_selects_key_with_most_headroom(self):
+        """Тест за избора на ключа с най-много оставаща квота"""
+        pool = self.pool(('key-a', 'key-b', 'key-c'))
+        self.assertEqual(pool.select(), 'key-a')
+        
+        pool.limiters['key-a'].quota.update(self.quota_headers(100))
+        pool.limiters['key-b'].quota.update(self.quota_headers(500))
+        pool.limiters['key-c'].quota.update(self.quota_headers(0))
+        
+        self.assertEqual(pool.select(), 'key-b')
+        self.assertEqual(pool.quota()['remaining'], 600)
+    
+    def test_429_rotates_to_another_key(self):
+        """Тест дали след 429 ключът почива, а заявката се повтаря веднага с друг ключ"""
+        pool = self.pool(cooldown=45)
+        http = Mock()
+        http.get.side_effect = [api_response(429), api_response(200, SERIAL_TITLE, self.quota_headers(900))]
+        client = ScopusAPIClient(http_client=http, key_pool=pool, use_cache=False)
+        
+        result = client.get_journal_metrics('12345')
+        
+        self.assertTrue(result['metrics_available'])
+        self.assertEqual([c.kwargs['headers']['X-ELS-APIKey'] for c in http.get.call_args_list], ['key-a', 'key-b'])
+        self.assertAlmostEqual(pool.available_in('key-a'), 45, delta=1)
+        self.assertEqual(pool.select(), 'key-b')
+    
+    def test_usage_persists_across_restarts(self):
+        """Тест дали квотата и паузите се възстановяват от хранилището"""
+        pool = self.pool()
+        pool.limiters['key-a'].quota.update(self.quota_headers(0))
+        pool.record('key-a', 200, {})
+        pool.record('key-b', 429, {'Retry-After': '120'})
+        
+        restarted = self.pool()
+        
+        self.assertTrue(restarted.limiters['key-a'].quota.exhausted())
+        self.assertAlmostEqual(restarted.available_in('key-b'), 120, delta=2)
+        self.assertEqual(set(self.store.load()), {key_id('key-a'), key_id('key-b')})
+        with self.assertRaises(RuntimeError):
+            restarted.acquire(max_wait=10)
+
+@unittest.skipUnless(HAVE_NUMPY, 'NumPy не е инсталиран')
+class TestBatchScoring(unittest.TestCase):
+    """Тестове за векторизираната оценка срещу calculate_scopus_readiness"""
+    
+    def setUp(self):
+        self.analyzer = ScopusJournalAnalyzer()
+        self.journals = sample_journals(300, seed=7)
+    
+    def analyzed(self, journal_data):
+        journal_data = dict(journal_data)
+        journal_data.update(self.analyzer._analyze_content_quality(journal_data))
+        journal_data.update(self.analyzer._analyze_international_scope(journal_data))
+        journal_data.update(self.analyzer._analyze_accessibility(journal_data))
+        return journal_data
+    
+    def test_parity_with_scalar_path(self):
+        """Тест дали оценките съвпадат със скаларния път - и за записи без *_score полетата"""
+        journals = [self.analyzed(journal_data) if index % 2 else journal_data
+                    for index, journal_data in enumerate(self.journals)]
+        # Само част от оценките - и трите се изчисляват наново
+        journals[0] = dict(journals[0], content_quality_score=100)
+        results = BatchScorer(self.analyzer).results(journals)
+        
+        for journal_data, result in zip(journals, results):
+            if 'accessibility_score' in journal_data:
+                expected = self.analyzer.calculate_scopus_readiness(journal_data)
+                expected.pop('recommendations')
+                expected.pop('analysis_date')
+            else:
+                expected = self.analyzer.partial_scores(journal_data)
+            self.assertEqual(result, expected)
+        self.assertGreater(len({result['readiness_level'] for result in results}), 2)
+    
+    def test_missing_fields(self):
+        """Тест за записи с None вместо текст"""
+        journal_data = {'url': None, 'description': None, 'peer_review_info': None, 'title': None}
+        
+        result = BatchScorer(self.analyzer).results([journal_data])[0]
+        
+        self.assertEqual(result, self.analyzer.partial_scores({}))
+    
+    def test_rescoring_with_new_weights(self):
+        """Тест за преоценка на готова матрица с други тегла и за празна група"""
+        journals = [self.analyzed(journal_data) for journal_data in self.journals[:20]]
+        features = feature_matrix(journals)
+        weights = {criterion: 1 / 6 for criterion in self.analyzer.scopus_criteria}
+        
+        scored = BatchScorer(criteria=weights).score_features(features)
+        
+        self.analyzer.scopus_criteria = weights
+        expected = [self.analyzer.calculate_scopus_readiness(journal_data)['total_score'] for journal_data in journals]
+        self.assertEqual([round(float(total), 2) for total in scored['total_score']], expected)
+        self.assertEqual(BatchScorer(self.analyzer).results([]), [])
+
 def run_tests():
     """Стартира всички тестове"""
     print("Започвам тестовете на Scopus Journal Analyzer...")
@@ -228,6 +2412,29 @@ def run_tests():
     test_suite.addTest(unittest.makeSuite(TestScopusJournalAnalyzer))
     test_suite.addTest(unittest.makeSuite(TestScopusAPIClient))
     test_suite.addTest(unittest.makeSuite(TestScopusEnhancer))
+    test_suite.addTest(unittest.makeSuite(TestHTTPClient))
+    test_suite.addTest(unittest.makeSuite(TestHTTPCache))
+    test_suite.addTest(unittest.makeSuite(TestStreamingDownload))
+    test_suite.addTest(unittest.makeSuite(TestSiteCrawler))
+    test_suite.addTest(unittest.makeSuite(TestPageFeatures))
+    test_suite.addTest(unittest.makeSuite(TestParserBackends))
+    test_suite.addTest(unittest.makeSuite(TestKeywordMatcher))
+    test_suite.addTest(unittest.makeSuite(TestResultCache))
+    test_suite.addTest(unittest.makeSuite(TestSingleFlight))
+    test_suite.addTest(unittest.makeSuite(TestJobs))
+    test_suite.addTest(unittest.makeSuite(TestScopusRateLimit))
+    test_suite.addTest(unittest.makeSuite(TestScopusSources))
+    test_suite.addTest(unittest.makeSuite(TestTitleMatcher))
+    test_suite.addTest(unittest.makeSuite(TestBulkISSNLookup))
+    test_suite.addTest(unittest.makeSuite(TestScopusCache))
+    test_suite.addTest(unittest.makeSuite(TestScopusMetrics))
+    test_suite.addTest(unittest.makeSuite(TestScopusEnrichment))
+    test_suite.addTest(unittest.makeSuite(TestScopusCursor))
+    test_suite.addTest(unittest.makeSuite(TestScopusKeyPool))
+    test_suite.addTest(unittest.makeSuite(TestBatchScoring))
+    test_suite.addTest(unittest.makeSuite(TestBrowserPool))
+    test_suite.addTest(unittest.makeSuite(TestRenderPolicy))
+    test_suite.addTest(unittest.makeSuite(TestBatchAnalyzer))
     
     # Стартираме тестовете
     runner = unittest.TextTestRunner(verbosity=2)
@@ -0,0 +1,145 @@
+"""
+Приблизително сравнение на заглавия на списания (триграми) с транслитерация от кирилица
+"""
+
+from collections import Counter
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+from scopus_sources import normalize_issn, normalize_title
+
+# Обтекаема система (Закон за транслитерацията), плюс буквите от руската азбука
+CYRILLIC_TO_LATIN = {
+    'а': 'a', 'б': 'b', 'в': 'v', 'г': 'g', 'д': 'd', 'е': 'e', 'ж': 'zh', 'з': 'z',
+    'и': 'i', 'й': 'y', 'к': 'k', 'л': 'l', 'м': 'm', 'н': 'n', 'о': 'o', 'п': 'p',
+    'р': 'r', 'с': 's', 'т': 't', 'у': 'u', 'ф': 'f', 'х': 'h', 'ц': 'ts', 'ч': 'ch',
+    'ш': 'sh', 'щ': 'sht', 'ъ': 'a', 'ь': 'y', 'ю': 'yu', 'я': 'ya',
+    'ё': 'yo', 'ы': 'y', 'э': 'e', 'і': 'i', 'ї': 'yi', 'є': 'ye', 'ґ': 'g',
+}
+TRANSLITERATION = str.maketrans(CYRILLIC_TO_LATIN)
+
+# Думи, които не се включват в заявката към Scopus ('&' и 'and' дават едно и също)
+QUERY_STOPWORDS = frozenset(['a', 'an', 'and', 'the', 'of', 'for', 'in', 'on', 'i', 'na', 'za', 'v'])
+# Разлика в оценката, под която двата най-добри кандидата се смятат за равностойни
+AMBIGUITY_MARGIN = 0.05
+# Триграми, срещани в повече от този дял от заглавията, не се ползват за избор на кандидати
+COMMON_TRIGRAM_SHARE = 0.05
+MAX_CANDIDATES = 50
+
+
+def transliterate(text: str) -> str:
+    """Кирилица към латиница; останалите символи не се променят"""
+    return text.lower().translate(TRANSLITERATION)
+
+
+def title_key(title: str) -> str:
+    """Заглавие за сравнение - транслитерирано и нормализирано"""
+    return normalize_title(transliterate(title or ''))
+
+
+def query_terms(title: str) -> List[str]:
+    """Значимите думи от заглавието за заявка, независима от пунктуацията и азбуката"""
+    return [word for word in title_key(title).split() if word not in QUERY_STOPWORDS]
+
+
+def trigrams(title: str) -> FrozenSet[str]:
+    """Триграмите на всяка дума, допълнена с интервали (както pg_trgm)"""
+    grams = set()
+    for word in title_key(title).split():
+        padded = f'  {word} '
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return frozenset(grams)
+
+
+def similarity(first: Iterable[str], second: Iterable[str]) -> float:
+    """Коефициент на Dice между два набора триграми (0..1)"""
+    first, second = set(first), set(second)
+    if not first or not second:
+        return 0.0
+    return 2 * len(first & second) / (len(first) + len(second))
+
+
+class TitleMatch:
+    """Кандидат и увереността, че е търсеното списание"""
+
+    def __init__(self, title: str, score: float, item: Any = None):
+        self.title = title
+        self.score = score
+        self.item = item
+
+    def __repr__(self):
+        return f'TitleMatch({self.title!r}, {self.score:.3f})'
+
+
+class TitleIndex:
+    """Заглавия с обратен индекс по триграми за бързо подреждане на кандидати"""
+
+    def __init__(self, entries: Iterable[Tuple[str, Any]] = ()):
+        self._titles: List[str] = []
+        self._items: List[Any] = []
+        self._grams: List[FrozenSet[str]] = []
+        self._postings: Dict[str, List[int]] = {}
+        for title, item in entries:
+            self.add(title, item)
+
+    def __len__(self):
+        return len(self._titles)
+
+    def add(self, title: str, item: Any = None):
+        index = len(self._titles)
+        grams = trigrams(title)
+        self._titles.append(title)
+        self._items.append(item)
+        self._grams.append(grams)
+        for gram in grams:
+            self._postings.setdefault(gram, []).append(index)
+
+    def _candidates(self, grams: FrozenSet[str]) -> List[int]:
+        """Заглавията с най-много общи (не твърде чести) триграми"""
+        if len(self._titles) <= MAX_CANDIDATES:
+            return list(range(len(self._titles)))
+        common = max(MAX_CANDIDATES, len(self._titles) * COMMON_TRIGRAM_SHARE)
+        shared = Counter()
+        for gram in grams:
+            postings = self._postings.get(gram)
+            if postings and len(postings) <= common:
+                shared.update(postings)
+        if not shared:
+            # Само често срещани триграми (напр. 'journal of ...') - всички са кандидати
+            for gram in grams:
+                shared.update(self._postings.get(gram, ()))
+        return [index for index, _ in shared.most_common(MAX_CANDIDATES)]
+
+    def search(self, title: str, limit: int = 5, min_score: float = 0.0) -> List[TitleMatch]:
+        """Най-близките заглавия, подредени по увереност"""
+        grams = trigrams(title)
+        if not grams:
+            return []
+        matches = []
+        for index in self._candidates(grams):
+            score = similarity(grams, self._grams[index])
+            if score >= min_score:
+                matches.append(TitleMatch(self._titles[index], round(score, 3), self._items[index]))
+        matches.sort(key=lambda match: match.score, reverse=True)
+        return matches[:limit]
+
+
+def best_match(title: str, candidates: Iterable[Tuple[str, Any]], issn: str = None,
+               issns_of=None) -> Tuple[Optional[TitleMatch], bool]:
+    """Най-подходящият кандидат и дали изборът е двусмислен.
+
+    Кандидат със същия ISSN (issns_of(item) връща ISSN-ите му) печели с
+    увереност 1.0. При равностойни заглавия ISSN решава без нова заявка;
+    ако ISSN няма, резултатът се отбелязва като двусмислен.
+    """
+    candidates = list(candidates)
+    wanted = normalize_issn(issn) if issn and issns_of is not None else None
+    if wanted:
+        for candidate_title, item in candidates:
+            if wanted in {normalize_issn(value) for value in issns_of(item) if value}:
+                return TitleMatch(candidate_title, 1.0, item), False
+
+    matches = TitleIndex(candidates).search(title, limit=2)
+    if not matches:
+        return None, False
+    ambiguous = len(matches) > 1 and matches[0].score - matches[1].score < AMBIGUITY_MARGIN
+    return matches[0], ambiguous